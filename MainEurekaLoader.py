@@ -1,5 +1,6 @@
 import os
 import sys
+import multiprocessing
 import socket
 import logging
 import tkinter as tk
@@ -146,5 +147,6 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # worker ของ placement portfolio ใน build แบบ frozen
     main()
     logging.info("🔥 Application closed.")
\ No newline at end of file
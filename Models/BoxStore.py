@@ -0,0 +1,70 @@
+import numpy as np
+
+
+class BoxStore:
+    """
+    กล่องที่วางแล้วแบบ struct-of-arrays (NumPy คอลัมน์ละ field) คู่กับ Container.boxes
+    - แถวที่ i = กล่อง container.boxes[i] ณ ตอนวาง (กล่องที่วางแล้วไม่ขยับอีก)
+    - kernel ที่เป็น NumPy อ่านคอลัมน์ได้เลยโดยไม่ต้องไล่ getattr ทีละกล่อง
+    - ขยายความจุแบบเท่าตัว → append เฉลี่ย O(1)
+    """
+
+    FIELDS = ("x", "y", "z", "length", "width", "height")
+
+    def __init__(self, capacity: int = 64):
+        self._data = np.empty((len(self.FIELDS), max(1, capacity)), dtype=float)
+        self.count = 0
+        self._bounds = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, box) -> int:
+        if self.count == self._data.shape[1]:
+            grown = np.empty((self._data.shape[0], self._data.shape[1] * 2), dtype=float)
+            grown[:, :self.count] = self._data[:, :self.count]
+            self._data = grown
+        self._data[:, self.count] = (box.x, box.y, box.z, box.length, box.width, box.height)
+        self.count += 1
+        self._bounds = None
+        return self.count - 1
+
+    def truncate(self, count: int):
+        """ทิ้งแถวตั้งแต่ count เป็นต้นไป (ใช้ตอน Container.rollback)"""
+        self.count = min(self.count, count)
+        self._bounds = None
+
+    def column(self, name: str) -> np.ndarray:
+        """view (ไม่ copy) ของคอลัมน์ name สำหรับกล่องที่วางแล้วทั้งหมด"""
+        return self._data[self.FIELDS.index(name), :self.count]
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._data[0, :self.count]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._data[1, :self.count]
+
+    @property
+    def z(self) -> np.ndarray:
+        return self._data[2, :self.count]
+
+    @property
+    def length(self) -> np.ndarray:
+        return self._data[3, :self.count]
+
+    @property
+    def width(self) -> np.ndarray:
+        return self._data[4, :self.count]
+
+    @property
+    def height(self) -> np.ndarray:
+        return self._data[5, :self.count]
+
+    def bounds(self) -> np.ndarray:
+        """array shape (n, 6): คอลัมน์ x0, x1, y0, y1, z0, z1 (cache ไว้จนกว่าจะ append ครั้งถัดไป)"""
+        if self._bounds is None:
+            x, y, z = self.x, self.y, self.z
+            self._bounds = np.column_stack((x, x + self.length, y, y + self.width, z, z + self.height))
+        return self._bounds
@@ -1,9 +1,19 @@
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 import os
+import bisect
+import math
 import configparser
-from tkinter import messagebox, filedialog
-from Models.Box import Box
+from Models.Box import Box, REQUIRED_SUPPORT_RATIO
 from Models.Pallet import Pallet
+from Models.SpatialIndex import EdgeIndex, GridIndex, level_key
+from Models.BoxStore import BoxStore
+from Models.InfeasibilityMemo import InfeasibilityMemo
+from Models.EmptySpaces import EmptySpaces
+from Models.HeightMap import HeightMap
+from Models.PlacementHints import PlacementHints
+from Models.SupportGraph import SupportGraph
+from Service.traceHandler import TRACE_DEBUG, sampled, trace
+from Service.perfHandler import perf
 import numpy as np
 
 # โหลดค่า GAP จาก config.ini
@@ -19,6 +29,9 @@ GAP_START_X = int(config.get("Container", "GapStartX", fallback=5))
 GAP_END_X = int(config.get("Container", "GapEndX", fallback=5))
 GAP_START_Y = int(config.get("Container", "GapStartY", fallback=5))
 GAP_END_Y = int(config.get("Container", "GapEndY", fallback=5))
+EMS_MIN_SIZE = config.getfloat("PlaceMent", "EMS_MIN_SIZE", fallback=20.0)  # space ที่ด้านใดสั้นกว่านี้ทิ้งไป (มม.)
+HINT_SIZE = config.getint("PlaceMent", "HINT_SIZE", fallback=8)  # ตำแหน่งล่าสุดที่จำต่อขนาดกล่อง
+HINT_WARM_START = config.getboolean("PlaceMent", "HINT_WARM_START", fallback=False)  # ปิด → ไม่เก็บ hint เลย
 
 class Container:
     def __init__(self, length: int, width: int, height: int, color: str, pallet: Pallet, ContainerType: str):
@@ -27,7 +40,15 @@ class Container:
         self.height = height
         self.pallet = pallet  
         self.pallet_height = pallet.height
+        self.container_type = ContainerType
         self.boxes = []
+        self.box_index = GridIndex()  # ดัชนี footprint ของกล่องที่วางแล้ว (id = ลำดับใน self.boxes)
+        self.support = SupportGraph(pallet.height)  # ผิวสัมผัสพ่อ/ลูก + ดัชนีผิวบนต่อระดับ (support ratio / centroid)
+        self.level_edges: Dict[float, EdgeIndex] = {}  # ระดับผิวบน -> ขอบล่าง/ขอบขวาเรียงแล้ว (SNAP ของ hybrid2/hybrid3)
+        self.box_store = BoxStore()  # ตำแหน่ง/ขนาดของกล่องที่วางแล้วเป็นคอลัมน์ NumPy (แถวเดียวกับ self.boxes)
+        self.infeasible = InfeasibilityMemo()  # ตำแหน่งที่พิสูจน์แล้วว่านอกกรอบ/ชน (ใช้ซ้ำกับ SKU ขนาดเดิม)
+        # ตำแหน่งล่าสุดต่อขนาดกล่อง (warm start ของ hybrid2 — engine เดียวที่อ่าน); size 0 = record ไม่ทำอะไร snapshot ว่าง
+        self.hints = PlacementHints(HINT_SIZE if HINT_WARM_START else 0)
 
         # คัดลอกค่าตั้งต้นจาก config
         self.gap_start_x = GAP_START_X
@@ -62,13 +83,52 @@ class Container:
         self.container_dx = self.end_x - self.start_x
         self.container_dy = self.end_y - self.start_y
 
+        # 🔲 Empty Maximal Spaces ในกรอบวาง อัปเดตทีละกล่องใน place_box (ใช้กับ ALGORITHM = ems)
+        self.empty_spaces = EmptySpaces(self.start_x, self.end_x, self.start_y, self.end_y,
+                                        self.pallet_height, self.end_z, EMS_MIN_SIZE)
+        # ⬇ ผิวล่างสูงสุดต่อ cell ในกรอบวาง (conservative) → เช็กหลังคาโล่งได้ใน query เดียว
+        self.bottom_map = HeightMap(self.start_x, self.start_y, self.end_x, self.end_y, cell_size=10, fill=-math.inf)
+        # heightmap ผิวบนตามความละเอียดที่ engine ขอ (สร้างเมื่อถูกเรียกครั้งแรก): cell_size -> (จำนวนกล่องที่ลงแล้ว, map)
+        self._height_grids: Dict[float, Tuple[int, HeightMap]] = {}
+
+        # 🔰 extreme points (มุมกล่อง + มุม container) อัปเดตทีละกล่องใน place_box
+        self.container_corners = [
+            (int(self.start_x), int(self.start_y), self.pallet_height),
+            (int(self.end_x - 1), int(self.start_y), self.pallet_height),
+            (int(self.start_x), int(self.end_y - 1), self.pallet_height),
+            (int(self.end_x - 1), int(self.end_y - 1), self.pallet_height),
+        ]
+        self._extreme_zxy = sorted((z, x, y) for x, y, z in set(self.container_corners))  # เรียง Z → X → Y
+        self._covered_points = set()  # จุดที่อยู่ในเนื้อกล่องที่วางแล้ว (วางมุมกล่องตรงนั้นต้องชนแน่นอน)
+        # มุมขวา/ล่างที่ฐานของแต่ละกล่อง + มุมเริ่มต้น (ผู้สมัครของ hybrid3) เรียง Z → Y → X
+        self._edge_zyx = [(int(self.pallet_height), int(self.start_y), int(self.start_x))]
+        # extreme points + มุมขวา/ล่าง (ผู้สมัครของ hybrid2) เรียง Z → Y → X
+        self._extreme_edge_zyx = sorted((z, y, x) for x, y, z in set(self.container_corners))
+
+    def known_infeasible(self, box: Box, x: int, y: int, z: int, optional_check: str = "op2") -> bool:
+        """ตำแหน่งนี้เคยเช็กแล้วว่านอกกรอบ/ชน สำหรับกล่องขนาดนี้ (ข้ามได้โดยไม่ต้องเช็กซ้ำ)"""
+        self.infeasible.sync(len(self.boxes))
+        if self.infeasible.lookup((box.length, box.width, box.height, optional_check), (x, y, z)) is None:
+            return False
+        perf.memo_hits += 1
+        return True
+
     def can_place(self, box: Box, x: int, y: int, z: int, optional_check: str = "op2") -> Tuple[bool, str]:
+        perf.can_place_calls += 1
+        memo_key = (box.length, box.width, box.height, optional_check)
+        self.infeasible.sync(len(self.boxes))
+        known_reason = self.infeasible.lookup(memo_key, (x, y, z))
+        if known_reason is not None:
+            perf.memo_hits += 1
+            return False, known_reason
+
         box_end_x = x + box.length
         box_end_y = y + box.width
         box_end_z = z + box.height
-        print(f"[DEBUG] \U0001f4e6 SKU={box.sku} | x={x}, y={y}, z={z}")
-        print(f"        start_x={self.start_x}, start_y={self.start_y}, end_x={self.end_x}, end_y={self.end_y}")
-        print(f"        box_end_z={box_end_z}, end_z={self.end_z}")
+        if TRACE_DEBUG and sampled("can_place"):
+            trace(f"[DEBUG] \U0001f4e6 SKU={box.sku} | x={x}, y={y}, z={z}\n"
+                  f"        start_x={self.start_x}, start_y={self.start_y}, end_x={self.end_x}, end_y={self.end_y}\n"
+                  f"        box_end_z={box_end_z}, end_z={self.end_z}")
 
         out_of_bounds = (
             x < self.start_x or
@@ -80,24 +140,38 @@ class Container:
         if optional_check == "op2":
             out_of_bounds = out_of_bounds or (box_end_z > self.end_z)
             if out_of_bounds:
-                print(f"[op2 ❌ out_of_bounds] x={x}, y={y}, z={z}, end_y={box_end_y:.1f} > max={self.end_y:.1f}")
+                if TRACE_DEBUG and sampled("can_place.bounds"):
+                    trace(f"[op2 ❌ out_of_bounds] x={x}, y={y}, z={z}, end_y={box_end_y:.1f} > max={self.end_y:.1f}")
+                perf.bounds_pruned += 1
+                self.infeasible.record(memo_key, (x, y, z), "Out of container bounds")
                 return False, "Out of container bounds"
         elif optional_check == "op1":
             if out_of_bounds:
-                print(f"❌ Box {box.sku} out of bounds: x={x}, y={y}, z={z}, end_y={box_end_y:.1f} > max={self.end_y:.1f}")
+                if TRACE_DEBUG and sampled("can_place.bounds"):
+                    trace(f"❌ Box {box.sku} out of bounds: x={x}, y={y}, z={z}, end_y={box_end_y:.1f} > max={self.end_y:.1f}")
+                perf.bounds_pruned += 1
+                self.infeasible.record(memo_key, (x, y, z), "Out of container bounds")
                 return False, "Out of container bounds"
 
         old_pos = (box.x, box.y, box.z)
-        for placed in self.boxes:
+        # ไม่มีอะไรสูงเกิน z ใต้ footprint เลย → ไม่ต้องไล่เช็กชน
+        if self.pallet.occupancy_grid.is_free_above(x, y, box_end_x, box_end_y, z):
+            placed_nearby = []
+        else:
+            placed_nearby = self.boxes_overlapping(x, y, z, box_end_x, box_end_y, box_end_z)
+        for placed in placed_nearby:
+            perf.collision_pairs += 1
             box.set_position(x, y, z)
             if box.collides_with(placed):
                 box.set_position(*old_pos)
-                print(f"[❌ Collision] {box.sku} at ({x},{y},{z}) collides with {placed.sku} at ({placed.x},{placed.y},{placed.z})")
+                if TRACE_DEBUG and sampled("can_place.collision"):
+                    trace(f"[❌ Collision] {box.sku} at ({x},{y},{z}) collides with {placed.sku} at ({placed.x},{placed.y},{placed.z})")
+                self.infeasible.record(memo_key, (x, y, z), "Collision with another box")
                 return False, "Collision with another box"
         box.set_position(*old_pos)
 
         box.set_position(x, y, z)
-        supported = box.is_supported(self.boxes, self.pallet_height)
+        supported = self.is_supported(box)
         box.set_position(*old_pos)
         if not supported:
             return False, "Box not supported from below"
@@ -110,50 +184,238 @@ class Container:
 
     def place_box(self, box: Box):
         self.boxes.append(box)
+        box_id = len(self.boxes) - 1
+        self.box_index.insert(box_id, box.x, box.y, box.x + box.length, box.y + box.width)
+        self.support.add(box_id, box.x, box.y, box.z, box.length, box.width, box.height)
+        top = level_key(box.z + box.height)
+        if top not in self.level_edges:
+            self.level_edges[top] = EdgeIndex()
+        self.level_edges[top].insert(box_id, box.x, box.y, box.x + box.length, box.y + box.width)
+        self.box_store.append(box)
+        self.pallet.occupancy_grid.raise_to(box.x, box.y, box.x + box.length, box.y + box.width, box.z + box.height)
+        self.bottom_map.raise_to(box.x, box.y, box.x + box.length, box.y + box.width, box.z)
+        self.empty_spaces.subtract(box.x, box.x + box.length, box.y, box.y + box.width, box.z, box.z + box.height)
+        self._update_candidate_points(box)
+        self.hints.record(box.x, box.y, box.z, box.length, box.width, box.height)
+
+    def checkpoint(self) -> tuple:
+        """
+        จับสถานะปัจจุบัน (จำนวนกล่อง + สำเนา array/list ของดัชนีที่ไม่ใช่แบบเพิ่มอย่างเดียว) ไว้ rollback
+        ไม่ copy กล่องที่วางแล้ว: กล่องหลัง checkpoint จะถูกถอดออกจากดัชนีทีละใบตอน rollback
+        """
+        return (
+            len(self.boxes),
+            self.pallet.occupancy_grid.snapshot(),
+            list(self._extreme_zxy),
+            set(self._covered_points),
+            list(self._edge_zyx),
+            list(self._extreme_edge_zyx),
+            self.empty_spaces.snapshot(),
+            self.bottom_map.snapshot(),
+            self.hints.snapshot(),
+        )
 
-    def generate_candidate_positions(self) -> List[Tuple[int, int, int]]:
-        def distance_to_edge(x: int, y: int) -> float:
-            dx = min(x - self.start_x, self.end_x - x)
-            dy = min(y - self.start_y, self.end_y - y)
-            return min(dx, dy)
-        positions = set()
+    def rollback(self, token: tuple):
+        """ย้อน container กลับไปสถานะตอน checkpoint (กล่องที่วางหลังจากนั้นถูกเอาออก)"""
+        count, grid, extreme_zxy, covered, edge_zyx, extreme_edge_zyx, spaces, bottoms, hints = token
+        while len(self.boxes) > count:
+            box_id = len(self.boxes) - 1
+            box = self.boxes.pop()
+            self.box_index.remove(box_id)
+            self.support.remove_last()
+            top = level_key(box.z + box.height)
+            edges = self.level_edges[top]
+            edges.remove(box_id)
+            if not len(edges):
+                del self.level_edges[top]
+        self.box_store.truncate(count)
+        self.pallet.occupancy_grid.restore(grid)
+        self._extreme_zxy = list(extreme_zxy)
+        self._covered_points = set(covered)
+        self._edge_zyx = list(edge_zyx)
+        self._extreme_edge_zyx = list(extreme_edge_zyx)
+        self.empty_spaces.restore(spaces)
+        self.bottom_map.restore(bottoms)
+        self.hints.restore(hints)
+        self._height_grids.clear()
+        self.infeasible.sync(len(self.boxes))
 
-        # 🔰 เพิ่ม corner positions สำหรับวางที่ขอบ container
-        positions.update([
-            (int(self.start_x), int(self.start_y), self.pallet_height),
-            (int(self.end_x - 1), int(self.start_y), self.pallet_height),
-            (int(self.start_x), int(self.end_y - 1), self.pallet_height),
-            (int(self.end_x - 1), int(self.end_y - 1), self.pallet_height),
-        ])
+    def restore(self, placements):
+        """วางกล่องตามตำแหน่งที่คำนวณไว้แล้ว: placements = [(box, x, y, z, length, width), ...] ตามลำดับที่วาง"""
+        for box, x, y, z, length, width in placements:
+            box.length, box.width = length, width
+            box.set_position(x, y, z)
+            self.place_box(box)
+
+    def _insort_unique(self, points: list, key: tuple) -> bool:
+        i = bisect.bisect_left(points, key)
+        if i < len(points) and points[i] == key:
+            return False
+        points.insert(i, key)
+        return True
+
+    def _point_covered(self, x, y, z) -> bool:
+        """จุด (x, y, z) อยู่ในเนื้อกล่องที่วางแล้ว (x0 <= x < x1 ทุกแกน)"""
+        return bool(self.boxes_overlapping(x, y, z, x + 1e-6, y + 1e-6, z + 1e-6))
+
+    def _update_candidate_points(self, box: Box):
+        """อัปเดต extreme points / edge points หลังวาง box (ไม่ต้องสร้างใหม่ทั้งชุดทุกครั้ง)"""
+        x0, x1 = box.x, box.x + box.length
+        y0, y1 = box.y, box.y + box.width
+        z0, z1 = box.z, box.z + box.height
 
+        # จุดเดิมที่ถูกกล่องใหม่ครอบ
+        lo = bisect.bisect_left(self._extreme_zxy, (z0,))
+        for z, x, y in self._extreme_zxy[lo:]:
+            if z >= z1:
+                break
+            if x0 <= x < x1 and y0 <= y < y1:
+                self._covered_points.add((x, y, z))
+
+        # มุมทั้ง 8 ของกล่องใหม่
+        for dx in [0, box.length]:
+            for dy in [0, box.width]:
+                for dz in [0, box.height]:
+                    x, y, z = box.x + dx, box.y + dy, box.z + dz
+                    if self.start_x <= x < self.end_x and self.start_y <= y < self.end_y:
+                        point = (int(x), int(y), int(z))
+                        if self._insort_unique(self._extreme_zxy, (point[2], point[0], point[1])):
+                            self._insort_unique(self._extreme_edge_zyx, (point[2], point[1], point[0]))
+                            if self._point_covered(*point):
+                                self._covered_points.add(point)
+
+        # ขอบขวา และขอบล่าง ที่ฐานของกล่อง
+        for x, y in [(x1, y0), (x0, y1)]:
+            key = (int(z0), int(y), int(x))
+            self._insort_unique(self._edge_zyx, key)
+            self._insort_unique(self._extreme_edge_zyx, key)
+
+    def placed_arrays(self) -> np.ndarray:
+        """กล่องที่วางแล้วเป็น NumPy array shape (n, 6): คอลัมน์ x0, x1, y0, y1, z0, z1"""
+        return self.box_store.bounds()
+
+    def boxes_overlapping(self, x0, y0, z0, x1, y1, z1) -> List[Box]:
+        """กล่องที่วางแล้วซึ่ง bounding box ทับช่วง (x0..x1, y0..y1, z0..z1) เรียงตามลำดับที่วาง"""
+        out = []
+        for i in self.box_index.query(x0, y0, x1, y1):
+            b = self.boxes[i]
+            if not (z1 <= b.z or z0 >= b.z + b.height):
+                out.append(b)
+        return out
+
+    def floor_under(self, x0, y0, x1, y1) -> float:
+        """ระดับที่กล่อง footprint (x0..x1, y0..y1) จะวางลงได้: ผิวบนสูงสุดของกล่องใต้ footprint (ไม่มี = pallet_height)"""
+        floor = self.pallet_height
+        for i in self.box_index.query(x0, y0, x1, y1):
+            b = self.boxes[i]
+            floor = max(floor, b.z + b.height)
+        return floor
+
+    def height_grid(self, cell_size: float) -> HeightMap:
+        """heightmap ผิวบนในกรอบวางที่ความละเอียด cell_size ลงกล่องที่วางแล้วครบทุกใบ (อัปเดตเพิ่มเฉพาะกล่องใหม่)"""
+        count, heightmap = self._height_grids.get(cell_size, (0, None))
+        if heightmap is None:
+            heightmap = HeightMap(self.start_x, self.start_y, self.end_x, self.end_y, cell_size=cell_size,
+                                  fill=self.pallet_height)
+        for b in self.boxes[count:]:
+            heightmap.raise_to(b.x, b.y, b.x + b.length, b.y + b.width, b.z + b.height)
+        self._height_grids[cell_size] = (len(self.boxes), heightmap)
+        return heightmap
+
+    def boxes_above(self, x0, y0, x1, y1, top) -> List[Box]:
+        """กล่องที่ผิวล่างอยู่ตั้งแต่ระดับ top ขึ้นไปและทับ footprint (x0..x1, y0..y1) เรียงตามลำดับที่วาง (แตะขอบไม่นับ)"""
+        if self.bottom_map.max_height(x0, y0, x1, y1) < top:
+            return []
+        return [b for b in (self.boxes[i] for i in self.box_index.query(x0, y0, x1, y1)) if b.z >= top]
+
+    def roof_is_clear(self, x0, y0, x1, y1, top) -> bool:
+        """ไม่มีกล่องใดอยู่เหนือ footprint (x0..x1, y0..y1) ที่ระดับ top ขึ้นไป (ด้านบนโล่ง 100%)"""
+        perf.roof_checks += 1
+        if self.bottom_map.max_height(x0, y0, x1, y1) < top:
+            return True
+        for i in self.box_index.query(x0, y0, x1, y1):
+            if self.boxes[i].z >= top:
+                return False
+        return True
+
+    def boxes_topping_at(self, z, x0=None, y0=None, x1=None, y1=None) -> List[Box]:
+        """
+        กล่องที่ผิวบนอยู่ที่ระดับ z เรียงตามลำดับที่วาง
+        ถ้าส่ง footprint (x0, y0, x1, y1) มาด้วย จะคืนเฉพาะกล่องที่ทับ footprint นั้น
+        """
+        return [self.boxes[i] for i in self.support.ids_at(z, x0, y0, x1, y1)]
+
+    def snap_y_target(self, z, x0, x1) -> float:
+        """ขอบล่าง (y+width) มากสุดของกล่องที่ผิวบนอยู่ที่ระดับ z และช่วง X ทับ (x0..x1) (ไม่มี = start_y)"""
+        edges = self.level_edges.get(level_key(z))
+        return self.start_y if edges is None else edges.max_bottom(x0, x1, self.start_y)
+
+    def snap_x_target(self, z, y0, y1) -> float:
+        """ขอบขวา (x+length) มากสุดของกล่องที่ผิวบนอยู่ที่ระดับ z และช่วง Y ทับ (y0..y1) (ไม่มี = start_x)"""
+        edges = self.level_edges.get(level_key(z))
+        return self.start_x if edges is None else edges.max_right(y0, y1, self.start_x)
+
+    def support_area(self, x, y, z, length, width) -> float:
+        """พื้นที่รองรับใต้ footprint (x, y, length, width) จากผิวบนของกล่องที่ระดับ z"""
+        perf.support_scans += 1
+        return self.support.area(x, y, z, length, width)
+
+    def support_ratio(self, x, y, z, length, width) -> float:
+        """support ratio ของ footprint ที่ระดับ z (อยู่บนพาเลท = 1.0)"""
+        if z <= self.pallet_height:
+            return 1.0
+        total_area = length * width
+        if total_area <= 0:
+            return 0.0
+        return self.support_area(x, y, z, length, width) / total_area
+
+    def support_ratio_and_centroid(self, x, y, z, length, width) -> Tuple[float, Tuple[float, float]]:
+        """
+        support ratio (รวมพาเลทเมื่ออยู่ที่พื้น) + centroid ของพื้นที่รองรับ
+        ไม่มีพื้นที่รองรับ → (0.0, กึ่งกลาง footprint)
+        """
+        perf.support_scans += 1
+        total_area = length * width
+        area, centroid = self.support.area_and_centroid(x, y, z, length, width)
+        if area <= 0 or total_area <= 0:
+            return 0.0, (x + length * 0.5, y + width * 0.5)
+        return area / total_area, centroid
+
+    def is_supported(self, box: Box, floor_z=None) -> bool:
+        """box มีผิวรองรับ >= REQUIRED_SUPPORT_RATIO จากกล่องที่จบที่ระดับ z ของ box (floor_z ค่าเริ่มต้น = pallet_height)"""
+        if floor_z is None:
+            floor_z = self.pallet_height
+        if box.z <= floor_z:
+            return True
+        required_support_area = (box.length * box.width) * REQUIRED_SUPPORT_RATIO
+        return self.support_area(box.x, box.y, box.z, box.length, box.width) >= required_support_area
+
+    def generate_candidate_positions(self, include_covered: bool = True) -> List[Tuple[int, int, int]]:
+        """
+        extreme points เรียง Z → X → Y (มุม container 4 จุด + มุมทั้ง 8 ของกล่องที่อยู่ในกรอบ X/Y)
+        include_covered=False: ตัดจุดที่อยู่ในเนื้อกล่องที่วางแล้วออก
+        (ใช้ได้กับ engine ที่เช็ก can_place ณ จุดนั้นตรง ๆ เพราะจุดพวกนี้ชนแน่นอน)
+        """
         if not self.boxes:
-            return list(positions)
-
-        print(f"\U0001f4cdGenerating candidate positions, box count = {len(self.boxes)}")       
-        for b in self.boxes:
-            for dx in [0, b.length]:
-                for dy in [0, b.width]:
-                    for dz in [0, b.height]:
-                        x, y, z = b.x + dx, b.y + dy, b.z + dz
-                        if (
-                            self.start_x <= x < self.end_x and
-                            self.start_y <= y < self.end_y
-                        ):
-                            positions.add((int(x), int(y), int(z)))
-
-        def min_distance_to_corner(x, y):
-            corners = [
-                (self.start_x, self.start_y),
-                (self.end_x, self.start_y),
-                (self.start_x, self.end_y),
-                (self.end_x, self.end_y),
-            ]
-            return min(((x - cx) ** 2 + (y - cy) ** 2) ** 0.5 for cx, cy in corners)
-        # return sorted(
-        #     positions,
-        #     key=lambda pos: (pos[2], distance_to_edge(pos[0], pos[1]), pos[0], pos[1])
-        # )
-        return sorted(
-                        positions,
-                        key=lambda pos: (pos[2], pos[0], pos[1])  # Z → X → Y
-                    )
+            perf.candidates_generated += len(set(self.container_corners))
+            return list(set(self.container_corners))
+
+        if TRACE_DEBUG:
+            trace(f"\U0001f4cdGenerating candidate positions, box count = {len(self.boxes)}")
+        if include_covered:
+            positions = [(x, y, z) for z, x, y in self._extreme_zxy]
+        else:
+            covered = self._covered_points
+            positions = [(x, y, z) for z, x, y in self._extreme_zxy if (x, y, z) not in covered]
+        perf.candidates_generated += len(positions)
+        return positions
+
+    def edge_candidate_positions(self, include_extreme_points: bool = False) -> List[Tuple[int, int, int]]:
+        """
+        มุมขวา (x+length, y, z) และมุมล่าง (x, y+width, z) ที่ฐานของกล่องที่วางแล้ว เรียง Z → Y → X
+        include_extreme_points=False: รวมมุมเริ่มต้นของ container (ผู้สมัครของ hybrid3)
+        include_extreme_points=True: รวม generate_candidate_positions() ทั้งหมด (ผู้สมัครของ hybrid2)
+        """
+        points = self._extreme_edge_zyx if include_extreme_points else self._edge_zyx
+        perf.candidates_generated += len(points)
+        return [(x, y, z) for z, y, x in points]
@@ -0,0 +1,85 @@
+import numpy as np
+
+
+class EmptySpaces:
+    """
+    Empty Maximal Spaces (EMS): ทรงสี่เหลี่ยมว่างที่ใหญ่ที่สุด (ขยายต่อไม่ได้) ภายในกรอบวางของ Container
+    - เก็บเป็น array (n, 6) คอลัมน์ x0, x1, y0, y1, z0, z1 (ลำดับเดียวกับ BoxStore.bounds())
+    - subtract(กล่อง): space ที่ทับกล่องถูกแตกเป็น ≤ 6 ส่วน (ซ้าย/ขวา/หน้า/หลัง/ล่าง/บน ของกล่อง)
+      แล้วทิ้งส่วนที่เล็กกว่า min_size หรืออยู่ในเนื้อ space อื่นทั้งก้อน (dominated)
+    - ทุก space ว่างจริงเสมอ → กล่องที่อยู่ในเนื้อ space ไม่ต้องเช็กชน
+    - array ไม่ถูกแก้ในที่ (subtract สร้าง array ใหม่) → snapshot คืน reference ได้เลย
+    """
+
+    def __init__(self, x0: float, x1: float, y0: float, y1: float, z0: float, z1: float, min_size: float = 0.0):
+        self.min_size = min_size
+        self.spaces = np.array([[x0, x1, y0, y1, z0, z1]], dtype=float)
+        if not self._large_enough(self.spaces).all():
+            self.spaces = self.spaces[:0]
+
+    def __len__(self) -> int:
+        return len(self.spaces)
+
+    def _large_enough(self, spaces: np.ndarray) -> np.ndarray:
+        dx = spaces[:, 1] - spaces[:, 0]
+        dy = spaces[:, 3] - spaces[:, 2]
+        dz = spaces[:, 5] - spaces[:, 4]
+        min_size = max(self.min_size, 1e-9)
+        return (dx >= min_size) & (dy >= min_size) & (dz >= min_size)
+
+    def subtract(self, x0: float, x1: float, y0: float, y1: float, z0: float, z1: float):
+        """ตัดทรง (x0..x1, y0..y1, z0..z1) ออกจากทุก space ที่ทับกัน"""
+        spaces = self.spaces
+        hit = (
+            (spaces[:, 0] < x1) & (spaces[:, 1] > x0) &
+            (spaces[:, 2] < y1) & (spaces[:, 3] > y0) &
+            (spaces[:, 4] < z1) & (spaces[:, 5] > z0)
+        )
+        if not hit.any():
+            return
+        kept = spaces[~hit]
+        cut = spaces[hit]
+
+        pieces = []
+        for lo_col, lo, hi in ((0, x0, x1), (2, y0, y1), (4, z0, z1)):
+            below = cut.copy()
+            below[:, lo_col + 1] = lo  # ส่วนที่อยู่ก่อนหน้ากล่องบนแกนนี้
+            above = cut.copy()
+            above[:, lo_col] = hi      # ส่วนที่อยู่หลังกล่องบนแกนนี้
+            pieces.append(below)
+            pieces.append(above)
+        pieces = np.concatenate(pieces)
+        pieces = pieces[self._large_enough(pieces)]
+        if len(pieces):
+            pieces = pieces[~self._dominated(pieces, kept)]
+        self.spaces = np.concatenate([kept, pieces]) if len(pieces) else kept
+
+    @staticmethod
+    def _dominated(pieces: np.ndarray, kept: np.ndarray) -> np.ndarray:
+        """
+        ส่วนใหม่ที่อยู่ในเนื้อ space อื่นทั้งก้อน
+        (space เดิมที่ไม่ถูกตัดไม่มีทางอยู่ในส่วนใหม่ เพราะส่วนใหม่อยู่ใน space เดิมที่เป็น maximal อยู่แล้ว)
+        ส่วนใหม่ที่ซ้ำกันเองเก็บไว้ตัวแรก
+        """
+        others = np.concatenate([kept, pieces])
+        p = pieces[:, None, :]
+        o = others[None, :, :]
+        contains = (
+            (o[..., 0] <= p[..., 0]) & (o[..., 1] >= p[..., 1]) &
+            (o[..., 2] <= p[..., 2]) & (o[..., 3] >= p[..., 3]) &
+            (o[..., 4] <= p[..., 4]) & (o[..., 5] >= p[..., 5])
+        )
+        n_kept, n = len(kept), len(pieces)
+        piece_ids = np.arange(n)
+        contains[piece_ids, n_kept + piece_ids] = False  # ไม่นับตัวเอง
+        # ส่วนใหม่ที่เท่ากันพอดี: ให้ตัว index น้อยกว่าอยู่รอด (ตัดเฉพาะตัวที่ถูกตัวก่อนหน้าครอบ)
+        equal = (pieces[:, None, :] == pieces[None, :, :]).all(axis=2)
+        later_equal = equal & (piece_ids[None, :] > piece_ids[:, None])
+        contains[:, n_kept:] &= ~later_equal
+        return contains.any(axis=1)
+
+    def snapshot(self) -> np.ndarray:
+        return self.spaces
+
+    def restore(self, snapshot: np.ndarray):
+        self.spaces = snapshot
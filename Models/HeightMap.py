@@ -0,0 +1,73 @@
+import math
+import numpy as np
+
+
+class HeightMap:
+    """
+    heightmap แบบ column: เก็บค่าสูงสุดต่อ cell ขนาด cell_size x cell_size (มม.)
+    - array ถูกจัดสรรตอนเขียนครั้งแรก (ยังไม่มีกล่อง = ไม่มีหน่วยความจำ)
+    - footprint ที่แตะ cell บางส่วนถือว่าครอบทั้ง cell → ค่าที่ query ได้เป็นขอบบนแบบ conservative
+    - พื้นที่นอกขอบ map ไม่รู้ค่า: query ที่เลยขอบคืน +inf
+    """
+
+    def __init__(self, x0: float, y0: float, x1: float, y1: float, cell_size: float = 10.0, fill: float = 0.0):
+        self.x0, self.y0 = float(x0), float(y0)
+        self.x1, self.y1 = float(x1), float(y1)
+        self.cell_size = float(cell_size)
+        self.fill = float(fill)
+        self.shape = (
+            max(1, math.ceil((self.x1 - self.x0) / self.cell_size)),
+            max(1, math.ceil((self.y1 - self.y0) / self.cell_size)),
+        )
+        self._grid = None
+
+    @property
+    def allocated(self) -> bool:
+        return self._grid is not None
+
+    @property
+    def grid(self) -> np.ndarray:
+        if self._grid is None:
+            self._grid = np.full(self.shape, self.fill, dtype=float)
+        return self._grid
+
+    def _cell_range(self, a0: float, a1: float, origin: float, size: int):
+        i0 = math.floor((a0 - origin) / self.cell_size)
+        i1 = math.ceil((a1 - origin) / self.cell_size)
+        return max(0, i0), min(size, max(i0 + 1, i1))
+
+    def cell_window(self, x0: float, y0: float, x1: float, y1: float) -> np.ndarray:
+        """view ของ cell ที่ทับ (x0..x1, y0..y1) ตัดตามขอบ map (เช่น พื้นที่วางของ container ทั้งใบ)"""
+        i0, i1 = self._cell_range(x0, x1, self.x0, self.shape[0])
+        j0, j1 = self._cell_range(y0, y1, self.y0, self.shape[1])
+        return self.grid[i0:i1, j0:j1]
+
+    def raise_to(self, x0: float, y0: float, x1: float, y1: float, value: float):
+        """ยกค่าใน cell ที่ทับ (x0..x1, y0..y1) ขึ้นเป็นอย่างน้อย value"""
+        i0, i1 = self._cell_range(x0, x1, self.x0, self.shape[0])
+        j0, j1 = self._cell_range(y0, y1, self.y0, self.shape[1])
+        if i0 >= i1 or j0 >= j1:
+            return
+        cells = self.grid[i0:i1, j0:j1]
+        np.maximum(cells, value, out=cells)
+
+    def max_height(self, x0: float, y0: float, x1: float, y1: float) -> float:
+        """ค่าสูงสุดใต้ footprint (x0..x1, y0..y1)"""
+        if x0 < self.x0 or y0 < self.y0 or x1 > self.x1 or y1 > self.y1:
+            return math.inf
+        if self._grid is None:
+            return self.fill
+        i0, i1 = self._cell_range(x0, x1, self.x0, self.shape[0])
+        j0, j1 = self._cell_range(y0, y1, self.y0, self.shape[1])
+        return float(self._grid[i0:i1, j0:j1].max())
+
+    def is_free_above(self, x0: float, y0: float, x1: float, y1: float, z: float) -> bool:
+        """footprint นี้ไม่มีอะไรสูงเกิน z เลย (วางที่ระดับ z แล้วไม่ชนแน่นอน)"""
+        return self.max_height(x0, y0, x1, y1) <= z
+
+    def snapshot(self):
+        """สำเนาค่าใน map (None = ยังไม่จัดสรร) สำหรับ restore"""
+        return None if self._grid is None else self._grid.copy()
+
+    def restore(self, snapshot):
+        self._grid = None if snapshot is None else snapshot.copy()
@@ -0,0 +1,41 @@
+from typing import Dict, Optional, Tuple
+
+
+class InfeasibilityMemo:
+    """
+    จำตำแหน่งที่พิสูจน์แล้วว่าวางไม่ได้ด้วยเหตุถาวร (นอกกรอบ / ชนกล่องที่วางแล้ว)
+    - กล่องที่วางแล้วไม่ถูกเอาออก → ตำแหน่งที่ชนวันนี้ก็ยังชนกับกล่องขนาดเดียวกันในรอบถัดไป
+    - key = (length, width, height, optional_check) ของกล่อง ณ ตอนเช็ก (หลังหมุนแล้ว)
+      กล่องที่หมุนเป็นขนาดเดียวกันจึงใช้ memo ร่วมกันได้
+    - valid_box_count = จำนวนกล่องใน container ตอนที่ memo ยังใช้ได้ล่าสุด
+      ถ้าจำนวนกล่องลดลง (container ถูกสร้างใหม่ / ย้อนสถานะ) memo จะถูกทิ้งทั้งหมด
+    """
+
+    def __init__(self):
+        self.entries: Dict[Tuple, Dict[Tuple, str]] = {}
+        self.valid_box_count = 0
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return sum(len(positions) for positions in self.entries.values())
+
+    def clear(self):
+        self.entries.clear()
+        self.valid_box_count = 0
+
+    def sync(self, box_count: int):
+        if box_count < self.valid_box_count:
+            self.clear()
+        self.valid_box_count = box_count
+
+    def lookup(self, dims_key: Tuple, position: Tuple) -> Optional[str]:
+        positions = self.entries.get(dims_key)
+        if positions is None:
+            return None
+        reason = positions.get(position)
+        if reason is not None:
+            self.hits += 1
+        return reason
+
+    def record(self, dims_key: Tuple, position: Tuple, reason: str):
+        self.entries.setdefault(dims_key, {})[position] = reason
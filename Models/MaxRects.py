@@ -0,0 +1,71 @@
+from typing import List, Tuple
+
+Rect = Tuple[float, float, float, float]  # (x0, y0, x1, y1)
+
+
+class MaxRectsSheet:
+    """
+    2D MaxRects bin (พื้นที่ว่างเก็บเป็นสี่เหลี่ยมที่ใหญ่ที่สุดที่ทับกันได้)
+    - candidates(): ตำแหน่งที่วาง (length, width) ได้ เรียงตาม Best Short Side Fit แล้วชิดมุม (y, x) ต่ำสุด
+    - place(): ตัดพื้นที่ที่ใช้ออกจาก free rects ทุกอันที่ทับ แล้วทิ้งอันที่ถูกอันอื่นครอบ
+    """
+
+    def __init__(self, x0: float, y0: float, x1: float, y1: float):
+        self.bounds = (x0, y0, x1, y1)
+        self.free: List[Rect] = [(x0, y0, x1, y1)] if x1 > x0 and y1 > y0 else []
+        self.used: List[Rect] = []
+
+    def candidates(self, length: float, width: float, allow_rotation: bool = True) -> List[Tuple[float, float, bool]]:
+        """(x, y, rotated) ที่วางได้ เรียงจากดีที่สุด (rotated=True → ใช้ width เป็นความยาวแกน X)"""
+        scored = []
+        orientations = [(length, width, False)]
+        if allow_rotation and length != width:
+            orientations.append((width, length, True))
+        for fx0, fy0, fx1, fy1 in self.free:
+            free_w, free_h = fx1 - fx0, fy1 - fy0
+            for dx, dy, rotated in orientations:
+                if dx <= free_w and dy <= free_h:
+                    leftover_x, leftover_y = free_w - dx, free_h - dy
+                    short_side = min(leftover_x, leftover_y)
+                    long_side = max(leftover_x, leftover_y)
+                    scored.append(((short_side, long_side, fy0, fx0, rotated), (fx0, fy0, rotated)))
+        scored.sort(key=lambda item: item[0])
+        seen = set()
+        out = []
+        for _, cand in scored:
+            if cand not in seen:
+                seen.add(cand)
+                out.append(cand)
+        return out
+
+    def fits(self, x: float, y: float, length: float, width: float) -> bool:
+        """footprint (x, y, length, width) อยู่ใน free rect อันใดอันหนึ่งทั้งหมด"""
+        x1, y1 = x + length, y + width
+        return any(fx0 <= x and fy0 <= y and x1 <= fx1 and y1 <= fy1 for fx0, fy0, fx1, fy1 in self.free)
+
+    def place(self, x0: float, y0: float, x1: float, y1: float):
+        self.used.append((x0, y0, x1, y1))
+        split = []
+        for rect in self.free:
+            fx0, fy0, fx1, fy1 = rect
+            if x1 <= fx0 or x0 >= fx1 or y1 <= fy0 or y0 >= fy1:
+                split.append(rect)
+                continue
+            if x0 > fx0:
+                split.append((fx0, fy0, x0, fy1))
+            if x1 < fx1:
+                split.append((x1, fy0, fx1, fy1))
+            if y0 > fy0:
+                split.append((fx0, fy0, fx1, y0))
+            if y1 < fy1:
+                split.append((fx0, y1, fx1, fy1))
+        self.free = self._prune(split)
+
+    @staticmethod
+    def _prune(rects: List[Rect]) -> List[Rect]:
+        rects = sorted(set(rects), key=lambda r: (r[2] - r[0]) * (r[3] - r[1]), reverse=True)
+        kept: List[Rect] = []
+        for r in rects:
+            if not any(k[0] <= r[0] and k[1] <= r[1] and k[2] >= r[2] and k[3] >= r[3] for k in kept):
+                kept.append(r)
+        return kept
@@ -1,24 +1,22 @@
 import numpy as np
-from mpl_toolkits.mplot3d.art3d import Line3DCollection
-from tkinter import messagebox, filedialog
+from Models.HeightMap import HeightMap
+from Service.traceHandler import TRACE_DEBUG, trace
 
 class Pallet:
     def __init__(self, width, length, height, frame_height=None, gap=0.2):
-        w = type(width)
-        l = type(length)
-        h = type(height)
-        print(f"width={w}, length={l}, height={h}")
+        if TRACE_DEBUG:
+            trace(f"width={type(width)}, length={type(length)}, height={type(height)}")
         self.width = int(width)
         self.length = int(length)
         self.height = int(height)
         self.frame_height = frame_height if frame_height is not None else height
         self.gap = gap
         self.boxes = []
-        self.occupancy_grid = np.zeros(
-            (self.width, self.length, self.height), dtype=bool
-        )
+        # heightmap ความสูงผิวบนต่อ column (cell 10 มม.) จัดสรรเมื่อมีกล่องแรกถูกวาง
+        self.occupancy_grid = HeightMap(0, 0, self.width, self.length, cell_size=10, fill=self.height)
 
     def draw_pallet_frame(self, ax):
+        from mpl_toolkits.mplot3d.art3d import Line3DCollection  # import เฉพาะตอนวาด (engine แบบ headless ไม่ต้องโหลด matplotlib)
         # messagebox.showinfo(
         #     "Pallet Frame",
         #     f"Width: {self.width}, Length: {self.length}, Height: {self.height}",
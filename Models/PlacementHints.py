@@ -0,0 +1,49 @@
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+
+class PlacementHints:
+    """
+    ตำแหน่งล่าสุดของกล่องขนาดเดียวกันใน container (มีขนาดจำกัด ไม่โตตามจำนวนกล่องที่วาง)
+    - key = (ด้านสั้น, ด้านยาว, สูง) → กล่องที่หมุนเป็นขนาดเดียวกันใช้ hint ร่วมกัน
+    - แต่ละ key เก็บเป็น ring buffer ไม่เกิน size ตำแหน่ง (ใหม่สุดอยู่ท้าย) → หน่วยความจำคงที่ต่อ SKU
+    - near(): จุดข้างกล่องใบล่าสุด ๆ ในระดับเดียวกัน (ขวา X+ / ล่าง Y+) ให้ engine ลองก่อนค้นหาเต็ม
+    """
+
+    def __init__(self, size: int = 8):
+        self.size = size
+        self._hints: Dict[Tuple, Deque[Tuple]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(ring) for ring in self._hints.values())
+
+    @staticmethod
+    def key(length, width, height) -> Tuple:
+        return min(length, width), max(length, width), height
+
+    def record(self, x, y, z, length, width, height):
+        if self.size <= 0:
+            return
+        k = self.key(length, width, height)
+        ring = self._hints.get(k)
+        if ring is None:
+            ring = self._hints[k] = deque(maxlen=self.size)
+        ring.append((x, y, z, length, width))
+
+    def near(self, length, width, height, limit: int = 2) -> List[Tuple]:
+        """จุด (x, y, z) ข้างกล่องขนาดเดียวกัน limit ใบที่วางล่าสุด (ใหม่สุดก่อน ไม่ซ้ำกัน)"""
+        ring = self._hints.get(self.key(length, width, height))
+        if not ring:
+            return []
+        points = []
+        for x, y, z, l, w in list(ring)[:-limit - 1:-1]:
+            for point in ((x + l, y, z), (x, y + w, z)):
+                if point not in points:
+                    points.append(point)
+        return points
+
+    def snapshot(self) -> Dict[Tuple, Tuple]:
+        return {k: tuple(ring) for k, ring in self._hints.items()}
+
+    def restore(self, snapshot: Dict[Tuple, Tuple]):
+        self._hints = {k: deque(ring, maxlen=self.size) for k, ring in snapshot.items()}
@@ -0,0 +1,106 @@
+import math
+import bisect
+from typing import Dict, List, Tuple
+
+
+class GridIndex:
+    """
+    ดัชนีกริด 2D แบบ uniform grid สำหรับหา item ที่ footprint ทับกับสี่เหลี่ยมที่ถาม
+    - แต่ละ item ถูกลงทะเบียนในทุก cell ที่ footprint ครอบ
+    - query คืน id เรียงตามลำดับที่ insert (ให้ผลเหมือนวนลูปตาม list เดิม)
+    """
+
+    def __init__(self, cell_size: float = 100.0):
+        self.cell_size = float(cell_size)
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        self.rects: Dict[int, Tuple[float, float, float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.rects)
+
+    def _span(self, a0: float, a1: float) -> range:
+        i0 = math.floor(a0 / self.cell_size)
+        i1 = max(i0, math.ceil(a1 / self.cell_size) - 1)
+        return range(i0, i1 + 1)
+
+    def insert(self, item_id: int, x0: float, y0: float, x1: float, y1: float):
+        self.rects[item_id] = (x0, y0, x1, y1)
+        for i in self._span(x0, x1):
+            for j in self._span(y0, y1):
+                self.cells.setdefault((i, j), []).append(item_id)
+
+    def remove(self, item_id: int):
+        x0, y0, x1, y1 = self.rects.pop(item_id)
+        for i in self._span(x0, x1):
+            for j in self._span(y0, y1):
+                bucket = self.cells[(i, j)]
+                bucket.remove(item_id)
+                if not bucket:
+                    del self.cells[(i, j)]
+
+    def query(self, x0: float, y0: float, x1: float, y1: float) -> List[int]:
+        """คืน id ที่ footprint ทับ (x0..x1, y0..y1) แบบ open interval (แตะขอบไม่นับ)"""
+        found = set()
+        for i in self._span(x0, x1):
+            for j in self._span(y0, y1):
+                bucket = self.cells.get((i, j))
+                if bucket:
+                    found.update(bucket)
+        out = []
+        for item_id in found:
+            rx0, ry0, rx1, ry1 = self.rects[item_id]
+            if not (x1 <= rx0 or x0 >= rx1 or y1 <= ry0 or y0 >= ry1):
+                out.append(item_id)
+        out.sort()
+        return out
+
+
+class EdgeIndex:
+    """
+    ขอบปลายของ footprint (ขอบล่าง y1 / ขอบขวา x1) เรียงจากมากไปน้อย สำหรับ SNAP ภายในระดับเดียวกัน
+    - max_bottom / max_right ไล่จากขอบที่ไกลสุดลงมา หยุดที่ตัวแรกที่ทับช่วงที่ถาม หรือเมื่อขอบไม่เกิน floor
+      → ผลเท่ากับ max(floor, ขอบของทุกตัวที่ทับ) แต่ปกติจบในไม่กี่ตัว
+    """
+
+    def __init__(self):
+        self.rects: Dict[int, Tuple[float, float, float, float]] = {}
+        self.bottoms: List[Tuple[float, int]] = []  # (-y1, id) เรียงน้อยไปมาก = y1 มากไปน้อย
+        self.rights: List[Tuple[float, int]] = []   # (-x1, id)
+
+    def __len__(self) -> int:
+        return len(self.rects)
+
+    def insert(self, item_id: int, x0: float, y0: float, x1: float, y1: float):
+        self.rects[item_id] = (x0, y0, x1, y1)
+        bisect.insort(self.bottoms, (-y1, item_id))
+        bisect.insort(self.rights, (-x1, item_id))
+
+    def remove(self, item_id: int):
+        x0, y0, x1, y1 = self.rects.pop(item_id)
+        del self.bottoms[bisect.bisect_left(self.bottoms, (-y1, item_id))]
+        del self.rights[bisect.bisect_left(self.rights, (-x1, item_id))]
+
+    def max_bottom(self, x0: float, x1: float, floor: float) -> float:
+        """y1 มากสุดของ item ที่ช่วง X ทับ (x0..x1) แบบ open interval (ไม่มี / ไม่เกิน floor = floor)"""
+        for neg_y1, item_id in self.bottoms:
+            if -neg_y1 <= floor:
+                break
+            rx0, _, rx1, _ = self.rects[item_id]
+            if not (x1 <= rx0 or x0 >= rx1):
+                return -neg_y1
+        return floor
+
+    def max_right(self, y0: float, y1: float, floor: float) -> float:
+        """x1 มากสุดของ item ที่ช่วง Y ทับ (y0..y1) แบบ open interval (ไม่มี / ไม่เกิน floor = floor)"""
+        for neg_x1, item_id in self.rights:
+            if -neg_x1 <= floor:
+                break
+            _, ry0, _, ry1 = self.rects[item_id]
+            if not (y1 <= ry0 or y0 >= ry1):
+                return -neg_x1
+        return floor
+
+
+def level_key(z: float) -> float:
+    """คีย์ของระดับผิวบน (ปัด 6 ตำแหน่ง แทนการเทียบ abs(a - b) < 1e-6 ทุกจุด)"""
+    return round(float(z), 6)
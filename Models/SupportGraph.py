@@ -0,0 +1,107 @@
+from typing import Dict, List, Tuple
+from Models.SpatialIndex import GridIndex, level_key
+
+
+class SupportGraph:
+    """
+    ผิวสัมผัสรองรับระหว่างกล่องใน Container (พ่อ = กล่องที่รองรับ, ลูก = กล่องที่วางทับ)
+    - levels: ระดับผิวบน (z+height) → ดัชนี footprint ของกล่องที่จบที่ระดับนั้น
+      contacts() ดูเฉพาะระดับเดียว ไม่ต้องไล่กล่องทั้ง container
+    - กล่องที่วางแล้ว (id = ลำดับใน container.boxes) เก็บ parents [(id พ่อ, พื้นที่สัมผัส)],
+      children, พื้นที่รองรับรวม และ centroid ของพื้นที่รองรับ (บนพาเลท = ทั้ง footprint)
+    - add / remove_last อัปเดตทีละกล่องตาม Container.place_box / rollback
+    """
+
+    def __init__(self, floor_z: float):
+        self.floor_z = floor_z
+        self.levels: Dict[float, GridIndex] = {}
+        self.parents: List[List[Tuple[int, float]]] = []
+        self.children: List[List[int]] = []
+        self.areas: List[float] = []
+        self.centroids: List[Tuple[float, float]] = []
+        self._tops: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def ids_at(self, z, x0=None, y0=None, x1=None, y1=None) -> List[int]:
+        """id ของกล่องที่ผิวบนอยู่ที่ระดับ z (ทับ footprint ถ้าส่งมา) เรียงตามลำดับที่วาง"""
+        level = self.levels.get(level_key(z))
+        if level is None:
+            return []
+        if x0 is None:
+            return list(level.rects)
+        return level.query(x0, y0, x1, y1)
+
+    def contacts(self, x, y, z, length, width) -> List[Tuple[int, float, float, float]]:
+        """[(id, พื้นที่สัมผัส, cx, cy), ...] ของผิวบนที่ระดับ z ใต้ footprint (x, y, length, width)"""
+        level = self.levels.get(level_key(z))
+        if level is None:
+            return []
+        x0, y0, x1, y1 = x, y, x + length, y + width
+        out = []
+        for i in level.query(x0, y0, x1, y1):
+            bx0, by0, bx1, by1 = level.rects[i]
+            ox0, ox1 = max(x0, bx0), min(x1, bx1)
+            oy0, oy1 = max(y0, by0), min(y1, by1)
+            area = max(0, ox1 - ox0) * max(0, oy1 - oy0)
+            if area > 0:
+                out.append((i, area, (ox0 + ox1) * 0.5, (oy0 + oy1) * 0.5))
+        return out
+
+    def area(self, x, y, z, length, width) -> float:
+        """พื้นที่รองรับรวมใต้ footprint จากผิวบนที่ระดับ z (ไม่นับพาเลท)"""
+        level = self.levels.get(level_key(z))
+        if level is None:
+            return 0
+        x0, y0, x1, y1 = x, y, x + length, y + width
+        total = 0
+        for i in level.query(x0, y0, x1, y1):
+            bx0, by0, bx1, by1 = level.rects[i]
+            total += max(0, min(x1, bx1) - max(x0, bx0)) * max(0, min(y1, by1) - max(y0, by0))
+        return total
+
+    def area_and_centroid(self, x, y, z, length, width, cons=None) -> Tuple[float, Tuple[float, float]]:
+        """พื้นที่รองรับรวม + centroid (ถ่วงด้วยพื้นที่) รวมพาเลทเมื่อ z อยู่ที่พื้น; ไม่มีพื้นที่ = centroid ของ footprint"""
+        cons = list(self.contacts(x, y, z, length, width) if cons is None else cons)
+        if z <= self.floor_z:
+            cons.append((-1, length * width, x + length * 0.5, y + width * 0.5))
+        total = sum(a for _, a, _, _ in cons)
+        if total <= 0:
+            return 0.0, (x + length * 0.5, y + width * 0.5)
+        cx = sum(a * cx for _, a, cx, _ in cons) / total
+        cy = sum(a * cy for _, a, _, cy in cons) / total
+        return total, (cx, cy)
+
+    def add(self, box_id: int, x, y, z, length, width, height):
+        """ลงทะเบียนกล่องที่เพิ่งวาง (box_id ต้องเท่ากับ len(self))"""
+        cons = self.contacts(x, y, z, length, width)
+        area, centroid = self.area_and_centroid(x, y, z, length, width, cons)
+        self.parents.append([(i, a) for i, a, _, _ in cons])
+        self.children.append([])
+        for i, _, _, _ in cons:
+            self.children[i].append(box_id)
+        self.areas.append(area)
+        self.centroids.append(centroid)
+        top = level_key(z + height)
+        self._tops.append(top)
+        if top not in self.levels:
+            self.levels[top] = GridIndex()
+        self.levels[top].insert(box_id, x, y, x + length, y + width)
+
+    def remove_last(self):
+        box_id = len(self.parents) - 1
+        top = self._tops.pop()
+        level = self.levels[top]
+        level.remove(box_id)
+        if not len(level):
+            del self.levels[top]
+        for i, _ in self.parents.pop():
+            self.children[i].remove(box_id)
+        self.children.pop()
+        self.areas.pop()
+        self.centroids.pop()
+
+    def support_ratio(self, box_id: int, footprint_area: float) -> float:
+        """support ratio ของกล่องที่วางแล้ว (อ่านจากที่เก็บไว้ตอน add)"""
+        return self.areas[box_id] / footprint_area if footprint_area > 0 else 0.0
@@ -7,6 +7,8 @@ import logging
 from Models.Box import Box
 from Models.Container import Container
 from Service.config_manager import load_config
+from Service.orderHandler import OrderFileError, read_order_file, write_sample_order, write_export_file
+from Service.perfHandler import perf
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 def load_csvFile(fileForimportPath: str):
@@ -16,101 +18,18 @@ def load_csvFile(fileForimportPath: str):
     # filepath = os.path.join(data_path, "forimport.csv")
 
     try:
-        logging.info(f"Attempting to load CSV file from: {fileForimportPath}")
         if not os.path.exists(fileForimportPath):
             logging.warning(f"CSV file not found. Creating a sample file at: {fileForimportPath}")
             # Create a sample file if it doesn't exist
-            sample_data = (
-                "Container,,C_Width,C_Length,C_Height\n"
-                "F15,,1060,1060,920\n"
-                "Priority,BoxTypes,Width,Length,Height,CV,Wgt\n"
-                "1,TEST1,100,200,150,1,0\n"
-                "2,TEST2,120,220,160,2,0\n"
-                "3,TEST3,140,240,170,3,0\n"
-            )
-            with open(fileForimportPath, "w", encoding="utf-8") as f:
-                f.write(sample_data)
+            write_sample_order(fileForimportPath)
             messagebox.showinfo("Info", f"Sample file created: {fileForimportPath}. Please edit it and reload.")
             return None, None
 
-        # Load CSV file
-        with open(fileForimportPath, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-
-        if not lines:
-            messagebox.showerror("Error", "CSV file is empty.")
-            return None, None
-
-        # ----- อ่านข้อมูล Container -----
-        container_line_index = next((i for i, line in enumerate(lines) if line.strip().startswith("Container")), None)
-        if container_line_index is None or container_line_index + 1 >= len(lines):
-            messagebox.showerror("Error", "Container data not found.")
-            return None, None
-
-        container_data = lines[container_line_index + 1].strip().split(",")
-        if len(container_data) < 5:
-            messagebox.showerror("Error", "Invalid container data format.")
-            return None, None
-
-        try:
-            container_type = container_data[0].strip()
-            container_width = int(container_data[2])
-            container_length = int(container_data[3])
-            container_height = int(container_data[4])
-            print(f"Container dimensions: Width={container_width}, Length={container_length}, Height={container_height}")
-        except (IndexError, ValueError):
-            logging.error("Error parsing container dimensions.")
-            messagebox.showerror("Error", "Invalid container dimensions.")
-            return None, None
-
-        logging.debug(f"Container dimensions loaded: Width={container_width}, Length={container_length}, Height={container_height}")
-        # messagebox.showerror("Error", f"Container data: {container_data}")
-
-        # ----- อ่านข้อมูล Box -----
-        box_start_index = next((i for i, line in enumerate(lines) if line.strip().startswith("Priority")), None)
-        if box_start_index is None:
-            messagebox.showerror("Error", "Box data header not found.")
-            return None, None
-
-        # อ่านข้อมูลกล่องตั้งแต่แถวที่มี Priority เป็นต้นไป
-        temp_path = fileForimportPath + "_temp_box_only.csv"
-        with open(temp_path, "w", encoding="utf-8") as temp_f:
-            temp_f.writelines(lines[box_start_index:])
-
-        # เพิ่มการตรวจสอบข้อมูลในไฟล์ CSV
-        df = pd.read_csv(temp_path, delimiter=",")  # ระบุ delimiter
-        logging.debug(f"DataFrame loaded: \n{df.to_string()}")
-        df.columns = [col.lower() for col in df.columns]  # เปลี่ยนชื่อคอลัมน์เป็นตัวพิมพ์เล็ก
-        required_columns = ["priority", "boxtypes", "width", "length", "height"]
-        if df.empty:
-            logging.warning("Box data is empty. No boxes to load.")
-            return (container_type, container_width, container_length, container_height), []
-        if not all(col in df.columns for col in required_columns):
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            logging.error(f"CSV file missing required columns: {missing_columns}")
-            messagebox.showerror("Error", f"CSV file missing required columns: {missing_columns}")
-            return None, None
-
-        boxes_to_place = []
-        for _, row in df.iterrows():
-            row_dict = row.to_dict()
-            box = Box(
-                length=row_dict.pop("length"),
-                width=row_dict.pop("width"),
-                height=row_dict.pop("height"),
-                sku=row_dict.pop("boxtypes"),
-                priority=int(row_dict.pop("priority")),
-                cv=str(row_dict.pop("cv")),
-                wgt=row_dict.pop("wgt"),
-                **row_dict  # ที่เหลือส่งเข้าไปเป็น extra_fields
-            )
-            print(f"Loaded box: {box.sku}, extras: {box.extra_fields}")
-            boxes_to_place.append(box)
-
-        logging.info(f"Loaded {len(boxes_to_place)} boxes from CSV.")
-
-        return (container_type, container_width, container_length, container_height), boxes_to_place
+        return read_order_file(fileForimportPath)
 
+    except OrderFileError as e:
+        messagebox.showerror("Error", str(e))
+        return None, None
     except Exception as e:
         logging.error(f"Error loading CSV: {e}")
         messagebox.showerror("Error", f"Error loading CSV: {e}")
@@ -123,25 +42,14 @@ def export_results(placed_df):
     placed_file_export_path = os.path.join(data_path, "forexport.txt")
 
     try:
-        export_lines = []
-        for _, row in placed_df.iterrows():
-            out = row.get("Out")
-            if pd.notna(out) and str(out).strip() == "1":
-                export_lines.append(
-                    f"{row['SKU']},{row['Y (mm)']},{row['X (mm)']},{row['Z (mm)']},{row['Rotate']},{row['% Cube']},{row['Wgt']},{row['Width']},{row['Length']},{row['Height']},{row['Priority']},{row.get('CV', '')},{row['Out']}"
-                )
-            else:
-                export_lines.append(
-                    f"{row['SKU']},,,,,,{row['Wgt']},{row['Width']},{row['Length']},{row['Height']},{row['Priority']},{row.get('CV', '')},{row['Out']}"
-                )
-
-        with open(placed_file_export_path, "w", encoding="utf-8") as f:
-            f.write("SKU,Y (mm),X (mm),Z (mm),Rotate,% Cube,Wgt,Width,Length,Height,Priority,CV,Out\n")
-            for line in export_lines:
-                f.write(line + "\n")
+        row_count = write_export_file(placed_file_export_path, placed_df.to_dict("records"))
+        perf_path = perf.write_sidecar(placed_file_export_path)  # สถิติของรอบการวางล่าสุด
+        if perf_path:
+            logging.info(f"Perf report written to {perf_path}")
 
         show_temporary_message("Success", f"Results exported successfully!\nPlaced: {placed_file_export_path}", duration=3000)
-        logging.info(f"Exported {len(export_lines)} rows to {placed_file_export_path}")
+        trucks = sum(str(sku).startswith("Truck #") for sku in placed_df["SKU"])  # แถวหัวของแต่ละคัน
+        logging.info(f"Exported {row_count} rows ({trucks} trucks) to {placed_file_export_path}")
 
     except Exception as e:
         messagebox.showerror("Error", f"Error exporting results: {e}")
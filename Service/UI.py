@@ -6,6 +6,7 @@ from tkinter import font as tkfont
 from tkinter import ttk 
 from threading import Thread
 import math
+import itertools
 import configparser
 from tkinter import messagebox, filedialog
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
@@ -22,6 +23,11 @@ import time
 import tkinter.simpledialog as simpledialog
 from Service.Visualization import  draw_3d_boxes_with_summary,  draw_box, draw_container
 from Service.placeFeature import place_box_hybrid, place_box_in_container, place_box_human_like,place_box_hybrid2,place_box_hybrid3
+from Service.packingEngine import call_placement, apply_step, plan_step, run_portfolio, pack_order, pack_multi, container_utilization, is_order_planner, PORTFOLIO_ENABLED, MULTI_CONTAINER, MAX_CONTAINERS
+from Service.replanHandler import PrefixCache, box_signature, log_reuse
+from Service.planCacheHandler import PlanCache, plan_key
+from Service.perfHandler import perf
+from Service.deadlineHandler import deadline
 
 class TextHandler(logging.Handler):
     """Custom logging handler to redirect logs to a Tkinter Text widget."""
@@ -65,6 +71,12 @@ class PackingApp:
         self.base_dir = config.get("Paths", "base_dir")
         self.placement_algo = config.get("PlaceMent", "ALGORITHM", fallback="hybrid2").strip().lower()
         logging.info(f"🧩 Placement algorithm (op2): {self.placement_algo}")
+        self.use_portfolio = PORTFOLIO_ENABLED
+        if self.use_portfolio:
+            logging.info("🧩 Placement portfolio enabled (op2): best plan of all configured algorithms")
+        self.multi_container = MULTI_CONTAINER
+        if self.multi_container:
+            logging.info(f"🚚 Multi-container enabled (op2): overflow spills into up to {MAX_CONTAINERS} trucks")
         default_mode = config.get("AppSettings", "default_mode", fallback="op1")  # โหลดจาก config.ini
         self.less_utilization = float(config.get("AppSettings", "utilization", fallback="80.0"))# โหลดจาก config.ini
         VERSION = str(config.get("AppSettings", "Version"))# โหลดจาก config.ini
@@ -108,7 +120,10 @@ class PackingApp:
         
         self.boxes_to_place = []
         self.container = None
+        self.containers = []  # op2 หลายคัน: Truck #1, #2, ... (self.container = คันที่แสดงผล)
         self.pallet = None
+        self.prefix_cache = PrefixCache()  # ผลรอบก่อน: โหลด order ที่แก้แล้ววางต่อจากแถวแรกที่ต่าง
+        self.plan_cache = PlanCache()  # order + config เดิม → replay แผนเดิม (หน่วยความจำ + ดิสก์)
         
         # Input Frame
         input_frame = tk.LabelFrame(master, text="Input Settings", padx=10, pady=10)  # ใช้ LabelFrame เพื่อเพิ่มหัวข้อ
@@ -502,7 +517,12 @@ class PackingApp:
         self.summary_text.insert(tk.END, f" 📊  Total boxes: {len(self.boxes_to_place)}\n")
         self.summary_text.insert(tk.END, f" ✅  Placed boxes: {placed_count}\n")
         self.summary_text.insert(tk.END, f" ❌ Failed to place: {len(failed_boxes)}\n")
-        self.summary_text.insert(tk.END, f" 📦 Utilization: {utilization:.2f}%\n\n")
+        self.summary_text.insert(tk.END, f" 📦 Utilization: {utilization:.2f}%\n")
+        if perf.deadline_hits:
+            self.summary_text.insert(
+                tk.END, f" ⏰ Deadline hit: {perf.deadline_hits} boxes ({perf.deadline_fallbacks} by fallback engine)\n"
+            )
+        self.summary_text.insert(tk.END, f" ⏱ {perf.summary_text()}\n\n")
         if len(failed_boxes) > 0:  
             start_idx = self.summary_text.index("end-1c")
             self.summary_text.insert(tk.END, f"    ❌ {len(failed_boxes)} NG Free Roller ❌ \n")
@@ -560,6 +580,9 @@ class PackingApp:
                 logging.warning("Priorities are not sequential. Proceeding with the given priorities.")
 
             self.boxes_to_place.sort(key=lambda box: box.priority)
+            # cv / wgt ต้องอยู่ในรูปสุดท้ายก่อนคำนวณ key ของ cache (wgt มีผลต่อตำแหน่ง: กล่องหนักต้องรองรับเต็ม)
+            for box in self.boxes_to_place:
+                PackingApp.prepare_box_fields(box)
             self.container = Container(
                 container_length,
                 container_width,
@@ -570,9 +593,95 @@ class PackingApp:
             )
             
             start_time = time.time()
+            perf.reset()
+            deadline.start()
             self.summary_text.delete("1.0", tk.END)
             self.summary_text.insert(tk.END, "Process : Starting box placement (OP2 mode).\n")
 
+            # ⚡ Plan cache: order และ config เดียวกับที่เคยแพ็ก → replay แผนเดิมเลย
+            cache_key = plan_key(
+                self.boxes_to_place,
+                (container_type, container_width, container_length, container_height),
+                self.placement_algo,
+                "op2",
+                self.use_portfolio,
+            )
+            plan = self.plan_cache.get(cache_key)
+            cached = plan is not None
+            portfolio_cut_off = False  # portfolio ไม่มี worker ไหนเสร็จทันเวลา → แผนที่ได้ขึ้นกับเวลา
+            if cached:
+                self.summary_text.insert(
+                    tk.END,
+                    f"Process : Plan cache hit = {plan['algorithm']} (placed {plan['placed_count']}/{total_boxes})\n",
+                )
+                logging.info(f"[OP2]⚡ Plan cache hit {cache_key[:12]}: replaying {plan['algorithm']} plan")
+
+            # 🚚 หลายคัน: แบ่งกล่องให้แต่ละคันแล้วแพ็กทุกคันพร้อมกันใน process แยก (ไม่ใช้ portfolio)
+            if plan is None and self.multi_container:
+                self.summary_text.insert(tk.END, "Process : Packing into multiple trucks...\n")
+                self.master.update_idletasks()
+                plan = pack_multi(
+                    self.boxes_to_place,
+                    (container_length, container_width, container_height),
+                    (self.pallet.width, self.pallet.length, self.pallet.height),
+                    container_type,
+                    self.placement_algo,
+                    optional_check="op2",
+                )
+
+            # 🧩 Portfolio: แพ็กด้วยทุกอัลกอริทึมใน process แยก แล้ว replay เฉพาะแผนที่ชนะ
+            if plan is None and self.use_portfolio:
+                self.summary_text.insert(tk.END, "Process : Running placement portfolio...\n")
+                self.master.update_idletasks()
+                plan = run_portfolio(
+                    self.boxes_to_place,
+                    (container_length, container_width, container_height),
+                    (self.pallet.width, self.pallet.length, self.pallet.height),
+                    container_type,
+                    optional_check="op2",
+                )
+                if plan is None:
+                    portfolio_cut_off = True
+                    logging.warning(f"[OP2]⚠️ Portfolio produced no plan in time, falling back to {self.placement_algo}")
+                else:
+                    self.summary_text.insert(
+                        tk.END,
+                        f"Process : Portfolio winner = {plan['algorithm']} (placed {plan['placed_count']}/{total_boxes})\n",
+                    )
+                    if plan["cut_off"]:
+                        self.summary_text.insert(
+                            tk.END, f"Process : Portfolio cut off at time budget: {', '.join(plan['cut_off'])}\n"
+                        )
+            if plan is None and is_order_planner(self.placement_algo):
+                # อัลกอริทึมแบบวางแผนทั้ง order (เช่น layer) → คำนวณครั้งเดียวแล้ว replay ทีละกล่อง
+                plan = pack_order(
+                    self.placement_algo,
+                    self.boxes_to_place,
+                    (container_length, container_width, container_height),
+                    (self.pallet.width, self.pallet.length, self.pallet.height),
+                    container_type,
+                    optional_check="op2",
+                )
+
+            # แผนทีละกล่องของอัลกอริทึมที่ตั้งไว้ (คำนวณเองหรือได้จาก cache / portfolio) → เก็บไว้ให้ prefix reuse
+            per_box = plan is None or (plan["algorithm"] == self.placement_algo and "trucks" not in plan
+                                       and not is_order_planner(plan["algorithm"]))
+            if per_box:
+                run_key = ("op2", self.placement_algo, container_length, container_width, container_height,
+                           str(container_type), self.pallet.width, self.pallet.length, self.pallet.height)
+                signatures = [box_signature(box) for box in self.boxes_to_place]
+            reused = 0
+            if plan is not None:
+                # ลำดับการวางตามแผน (beam อาจสลับกล่อง priority ใกล้กัน, layer วางทีละชั้น)
+                self.boxes_to_place = [self.boxes_to_place[i] for i in plan["order"]]
+            else:
+                reused = self.prefix_cache.reusable(run_key, signatures)
+                log_reuse("OP2", reused, total_boxes)
+            steps = []
+            # แผนหลายคัน: index ของกล่องแรกของ Truck #2, #3, ...
+            truck_starts = set(itertools.accumulate(plan["trucks"][:-1])) if plan is not None and "trucks" in plan else set()
+            self.containers = [self.container]
+
             placed_boxes_info = []
             failed_boxes = []
             cube_utilizations_list = []
@@ -584,13 +693,37 @@ class PackingApp:
                     logging.warning("🚫 Packing stopped by user (ESC).")
                     break
                 self.progress["value"] = i + 1
+                if i in truck_starts:
+                    # แต่ละคันมีพาเลทของตัวเอง (occupancy_grid ของพาเลทถูกเขียนตอน place_box)
+                    self.container = Container(
+                        container_length,
+                        container_width,
+                        container_height,
+                        "blue",
+                        Pallet(width=self.pallet.width, length=self.pallet.length, height=self.pallet.height),
+                        ContainerType=container_type
+                    )
+                    self.containers.append(self.container)
+                    placed_boxes_info.append(
+                        [f"Truck #{len(self.containers)}", "", "", "", "", "", "", "", "", "", "", "", ""]
+                    )
                 PackingApp.prepare_box_fields(box)
                 form_conveyor = box.cv
                 box_wgt = box.wgt
                 ogw = box.width
                 ogl = box.length
                 # result = place_box_hybrid2(self.container, box)
-                result = self._call_placement(self.placement_algo, self.container, box, optional_check="op2")
+                if plan is not None:
+                    result = apply_step(self.container, box, plan["steps"][i])
+                elif i < reused:
+                    steps.append(self.prefix_cache.step(i))
+                    result = apply_step(self.container, box, steps[-1])
+                else:
+                    before = len(self.container.boxes)
+                    perf.begin_box()
+                    result = self._call_placement(self.placement_algo, self.container, box, optional_check="op2")
+                    perf.end_box(box.sku, result["status"])
+                    steps.append(plan_step(result, box, len(self.container.boxes) > before))
 
                 # result = Try_place_Layer_base(self.container, box, optional_check="op2")
                 # result = place_box_human_like(self.container, box)
@@ -646,13 +779,37 @@ class PackingApp:
                 ])
 
             end_time = time.time()
+            # ผลที่ขึ้นกับเวลา (ชน deadline / fallback, planner หมดงบเวลา, portfolio ตัด worker) มักแย่กว่าปกติ
+            # → ไม่เก็บลง plan cache / prefix cache (ไม่งั้นจะ replay แผนที่แย่กว่าตลอดไปสำหรับ order + config นี้)
+            timed_out = bool(perf.deadline_hits or perf.time_budget_hits or portfolio_cut_off or (
+                plan is not None and (plan.get("timed_out") or plan.get("cut_off"))))
+            if timed_out:
+                logging.warning("[OP2]⏱ Plan hit a time budget: not stored in plan / prefix cache")
+            if per_box and not timed_out:
+                self.prefix_cache.store(run_key, signatures, steps if plan is None else plan["steps"])
+            if not cached and not self.stop_requested and not timed_out:
+                self.plan_cache.put(cache_key, plan if plan is not None else {
+                    "algorithm": self.placement_algo,
+                    "order": list(range(len(steps))),
+                    "steps": steps,
+                    "placed_count": placed_count,
+                    "utilization": round(sum(cube_utilizations_list), 2),
+                })
             if self.stop_requested :
                 return
             else:
 # คำนวน utilization ของ Container
                 utilization = round(sum(cube_utilizations_list), 2)
+                if len(self.containers) > 1:
+                    # หลายคัน: utilization ต่อคันแบบเดียวกับ pack_multi / CLI → เฉลี่ยต่อคัน / แสดงคันแรก
+                    truck_utilizations = [round(container_utilization(c), 2) for c in self.containers]
+                    utilization = round(sum(truck_utilizations) / len(truck_utilizations), 2)
+                    self.container = self.containers[0]
 # แสดงผลสรุปการวางกล่องใน Container
                 self.insert_summary_text(placed_count, failed_boxes, utilization)
+                if len(self.containers) > 1:
+                    for n, truck_utilization in enumerate(truck_utilizations, start=1):
+                        self.summary_text.insert(tk.END, f" 🚚 Truck #{n}: {truck_utilization:.2f}%\n")
                 # for box_info in failed_boxes:
                 #     self.summary_text.insert(
                 #         tk.END, f"  🚫   SKU: {box_info[0]} failed due to: {box_info[-1]}\n"
@@ -776,6 +933,8 @@ class PackingApp:
                 self.pallet,
             )
             start_time = time.time()
+            perf.reset()
+            deadline.start()
             self.summary_text.delete("1.0", tk.END)
             
 # เริ่มคำนวนหาพื้นที่วางกล่องใน Container
@@ -803,7 +962,9 @@ class PackingApp:
                 box_wgt = box.wgt
                 ogw = box.width
                 ogl = box.length
+                perf.begin_box()
                 result = place_box_in_container(self.container, box, optional_check="op1")
+                perf.end_box(box.sku, result["status"])
                 # out = 1 if result["exceeds_end_z"] else (0 if result["status"] == "Confirmed" else 1)
                 logging.info(f"[OP1]📦 Result for {box.sku}: {result['status']} | R={result['rotation']} | Exceeds height? {result.get('exceeds_end_z', False)} | Reason: {result['message']}")
                 out = 2
@@ -956,23 +1117,5 @@ class PackingApp:
             logging.error(f"[OP1] An error occurred: {e}")
 
     def _call_placement(self, algo_name: str, container: Container, box: Box, optional_check: str = "op2"):
-        # map ชื่อแบบสั้น และรองรับชื่อเต็มด้วย
-        mapping = {
-            "hybrid2": place_box_hybrid2,
-            "place_box_hybrid2": place_box_hybrid2,
-            "hybrid3": place_box_hybrid3,
-            "place_box_hybrid3": place_box_hybrid3,
-            "hybrid": place_box_hybrid,
-            "place_box_hybrid": place_box_hybrid,
-            "human": place_box_human_like,
-            "place_box_human_like": place_box_human_like,
-            "basic": place_box_in_container,
-            "place_box_in_container": place_box_in_container,
-        }
-        fn = mapping.get((algo_name or "").lower(), place_box_hybrid)
-        try:
-            # ฟังก์ชันทั้งหมดรองรับพารามิเตอร์แบบเดียวกัน (container, box, optional_check)
-            return fn(container, box, optional_check=optional_check)
-        except TypeError:
-            # กันกรณีฟังก์ชันเก่าที่ไม่ได้รับ optional_check
-            return fn(container, box)
+        # map ชื่อแบบสั้น/ชื่อเต็ม อยู่ที่ Service.packingEngine.PLACEMENT_FUNCTIONS
+        return call_placement(algo_name, container, box, optional_check=optional_check)
@@ -9,7 +9,6 @@ import matplotlib.pyplot as plt
 from matplotlib.patches import Patch
 from typing import List, Tuple
 # from Service.UI import run_packing_op1
-from Service.shared_state import last_success_positions
 from Service.placeFeature import place_box_in_container,place_box_human_like,place_box_hybrid
 import logging
 
@@ -27,7 +26,6 @@ support_priority_levels = [
 ]
 support_priority_levels.append(min_support_ratio)
 support_priority_levels = sorted(support_priority_levels, reverse=True)  # เรียงจากมากไปน้อย
-# last_success_positions = []  # global memory for previously successful placements
 
 def draw_3d_boxes(container: Container, ax):
     """Draw all boxes in the container in 3D."""
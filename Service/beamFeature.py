@@ -0,0 +1,314 @@
+import os
+import copy
+import time
+import logging
+import configparser
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from Models.Box import Box
+from Models.Container import Container
+from Models.Pallet import Pallet
+from Service.placeFeature import PLACEMENT_FUNCTIONS
+from Service.traceHandler import TRACE_INFO, trace
+from Service.perfHandler import perf
+
+# ==============================
+#  Beam search บนลำดับการวาง: [PlaceMent] ALGORITHM = beam
+#  - เก็บ BEAM_WIDTH สถานะบางส่วนที่ดีที่สุดในแต่ละขั้น (ขั้นละ 1 กล่อง)
+#  - กล่องถัดไปเลือกได้จากกล่องที่ priority ห่างจาก priority ต่ำสุดที่เหลือไม่เกิน BEAM_PRIORITY_WINDOW
+#    (0 = สลับได้เฉพาะ priority เท่ากัน) สูงสุด BEAM_BRANCHING ขนาดกล่องที่ต่างกัน
+#  - แต่ละกิ่งวางด้วย BEAM_BASE_ALGORITHM (อัลกอริทึมทีละกล่องเดิม)
+#  - score = utilization - BEAM_FRAGMENTATION_WEIGHT × ความขรุขระของ heightmap
+#  - สถานะเก็บเป็น tuple ของ step (ไม่ copy Box) ใน process หลัก
+#  - แต่ละ worker มี container เดียว (BeamCursor): ย้ายไปสถานะที่จะขยายด้วย rollback ถึง prefix ร่วม
+#    แล้ววางเฉพาะ step ที่ต่าง (ตำแหน่งรู้แล้ว ไม่ค้นหา) → ขยายกิ่งด้วย checkpoint/rollback
+#    process หลักจำเส้นทางของแต่ละ worker ไว้ จึงส่งไปแค่ step ที่ต่าง ไม่ต้องส่ง step ทั้งสถานะ
+#  - ขยาย beam ขนานใน process แยก (BEAM_WORKERS) จนถึง BEAM_TIME_BUDGET แล้วเติมที่เหลือแบบ greedy
+# ==============================
+config = configparser.ConfigParser()
+config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config.ini")
+config.read(config_path, encoding="utf-8")
+
+BEAM_BASE_ALGORITHM = config.get("PlaceMent", "BEAM_BASE_ALGORITHM", fallback="hybrid2").strip().lower()
+BEAM_WIDTH = config.getint("PlaceMent", "BEAM_WIDTH", fallback=4)
+BEAM_BRANCHING = config.getint("PlaceMent", "BEAM_BRANCHING", fallback=3)
+BEAM_PRIORITY_WINDOW = config.getint("PlaceMent", "BEAM_PRIORITY_WINDOW", fallback=2)
+BEAM_FRAGMENTATION_WEIGHT = config.getfloat("PlaceMent", "BEAM_FRAGMENTATION_WEIGHT", fallback=0.1)
+BEAM_TIME_BUDGET = config.getfloat("PlaceMent", "BEAM_TIME_BUDGET", fallback=30.0)  # วินาที
+BEAM_WORKERS = config.getint("PlaceMent", "BEAM_WORKERS", fallback=0)  # 0 = ตามจำนวน CPU, 1 = ไม่แยก process
+
+# step = (status, rotation, support, exceeds_end_z, message, placed, x, y, z, length, width)
+BeamStep = Tuple[str, int, float, bool, str, bool, float, float, float, int, int]
+# state = (order, steps, placed_volume, score)
+BeamState = Tuple[Tuple[int, ...], Tuple[BeamStep, ...], float, float]
+
+BEAM_CHECKPOINTS = 32  # checkpoint ล่าสุดที่ BeamCursor เก็บไว้ (แต่ละอันมีสำเนา heightmap → ไม่เก็บทุกระดับ)
+
+_worker: Dict = {}
+
+
+def _init_worker(boxes: List[Box], container_dims: Tuple[int, int, int], pallet_dims: Tuple[int, int, int],
+                 container_type: str, place_fn: Callable, optional_check: str, fragmentation_weight: float):
+    _worker.update(
+        boxes=boxes, container_dims=container_dims, pallet_dims=pallet_dims, container_type=container_type,
+        place_fn=place_fn, optional_check=optional_check, fragmentation_weight=fragmentation_weight,
+    )
+    _worker["cursor"] = BeamCursor(_new_container(), boxes)
+
+
+def _new_container() -> Container:
+    p_width, p_length, p_height = _worker["pallet_dims"]
+    c_length, c_width, c_height = _worker["container_dims"]
+    pallet = Pallet(width=p_width, length=p_length, height=p_height)
+    return Container(c_length, c_width, c_height, "blue", pallet, ContainerType=_worker["container_type"])
+
+
+def fragmentation(container: Container) -> float:
+    """ความขรุขระของผิวบน: ค่าเฉลี่ยผลต่างความสูงระหว่าง cell ข้างเคียงในพื้นที่ container / ความสูง container"""
+    heightmap = container.pallet.occupancy_grid
+    if not heightmap.allocated or container.height <= 0:
+        return 0.0
+    grid = heightmap.cell_window(container.start_x, container.start_y, container.end_x, container.end_y)
+    rough = 0.0
+    if grid.shape[0] > 1:
+        rough += float(abs(grid[1:, :] - grid[:-1, :]).mean())
+    if grid.shape[1] > 1:
+        rough += float(abs(grid[:, 1:] - grid[:, :-1]).mean())
+    return rough / container.height
+
+
+def _score(container: Container, placed_volume: float) -> float:
+    usable_volume = container.container_dx * container.container_dy * container.height
+    utilization = placed_volume / usable_volume if usable_volume > 0 else 0.0
+    return utilization - _worker["fragmentation_weight"] * fragmentation(container)
+
+
+def _step_from_result(result: Dict, box: Box, placed: bool) -> BeamStep:
+    return (
+        result["status"], result["rotation"], float(result.get("support", 0.0)),
+        bool(result.get("exceeds_end_z", False)), result.get("message", ""), placed,
+        box.x, box.y, box.z, box.length, box.width,
+    )
+
+
+def _common_prefix(path: List[Tuple[int, BeamStep]], order: Tuple[int, ...], steps: Tuple[BeamStep, ...]) -> int:
+    """จำนวน step ต้นทางที่ path (เส้นทางของ cursor) ตรงกับสถานะ (order, steps)"""
+    n = 0
+    for (i, step), j, other in zip(path, order, steps):
+        if i != j or step != other:
+            break
+        n += 1
+    return n
+
+
+class BeamCursor:
+    """
+    container เดียวที่ย้ายไปยังสถานะใดก็ได้ของ beam
+    - path = [(box index, step)] ที่วางอยู่ใน container ตอนนี้
+    - tokens[d] = checkpoint ตอน path ยาว d (เก็บ d = 0 และ keep ระดับล่าสุด)
+    - goto(lcp, suffix): rollback ไปที่ prefix ร่วม lcp (checkpoint ใกล้สุดที่ไม่เกิน lcp + วางที่ขาด)
+      แล้ววาง suffix ต่อ
+    """
+
+    def __init__(self, container: Container, boxes: List[Box], keep: int = BEAM_CHECKPOINTS):
+        self.container = container
+        self.boxes = boxes
+        self.keep = keep
+        self.path: List[Tuple[int, BeamStep]] = []
+        self.tokens = {0: container.checkpoint()}
+
+    def _push(self, i: int, step: BeamStep):
+        if step[5]:
+            box = copy.copy(self.boxes[i])
+            box.length, box.width = step[9], step[10]
+            box.set_position(step[6], step[7], step[8])
+            self.container.place_box(box)
+        self.path.append((i, step))
+        depth = len(self.path)
+        self.tokens[depth] = self.container.checkpoint()
+        for d in [d for d in self.tokens if 0 < d <= depth - self.keep]:
+            del self.tokens[d]
+
+    def goto(self, lcp: int, suffix: Tuple[Tuple[int, BeamStep], ...] = ()):
+        if lcp < len(self.path):
+            base = max(d for d in self.tokens if d <= lcp)
+            self.container.rollback(self.tokens[base])
+            for d in [d for d in self.tokens if d > base]:
+                del self.tokens[d]
+            replay = self.path[base:lcp]
+            del self.path[base:]
+            for i, step in replay:
+                self._push(i, step)
+        for i, step in suffix:
+            self._push(i, step)
+
+    def expand(self, choices: List[int], placed_volume: float) -> List[Tuple[int, BeamStep, float, float]]:
+        """ลองวางกล่องแต่ละใบใน choices ต่อจากสถานะปัจจุบัน คืน [(i, step, ปริมาตรรวม, score)]"""
+        token = self.tokens[len(self.path)]
+        children = []
+        for i in choices:
+            box = copy.copy(self.boxes[i])
+            before = len(self.container.boxes)
+            result = _worker["place_fn"](self.container, box, optional_check=_worker["optional_check"])
+            step = _step_from_result(result, box, len(self.container.boxes) > before)
+            volume = placed_volume + (box.get_volume() if result["status"] == "Confirmed" else 0)
+            children.append((i, step, volume, _score(self.container, volume)))
+            self.container.rollback(token)
+        return children
+
+    def complete_greedy(self, placed_volume: float) -> Tuple[List[Tuple[int, BeamStep]], float, float]:
+        """วางกล่องที่ยังไม่ได้วางต่อท้ายตามลำดับ priority (ไม่แตกกิ่ง) คืน (ส่วนที่เติม, ปริมาตรรวม, score) แล้วย้อนกลับ"""
+        token = self.tokens[len(self.path)]
+        placed_ids = {i for i, _ in self.path}
+        tail = []
+        for i in range(len(self.boxes)):
+            if i in placed_ids:
+                continue
+            box = copy.copy(self.boxes[i])
+            before = len(self.container.boxes)
+            result = _worker["place_fn"](self.container, box, optional_check=_worker["optional_check"])
+            tail.append((i, _step_from_result(result, box, len(self.container.boxes) > before)))
+            if result["status"] == "Confirmed":
+                placed_volume += box.get_volume()
+        score = _score(self.container, placed_volume)
+        self.container.rollback(token)
+        return tail, placed_volume, score
+
+
+def _job(lcp: int, state: BeamState, choices: List[int]):
+    """job ของสถานะ state: ส่งเฉพาะ step หลัง prefix ร่วม lcp กับเส้นทางของ cursor"""
+    order, steps, placed_volume, _ = state
+    return lcp, tuple(zip(order[lcp:], steps[lcp:])), choices, placed_volume
+
+
+def _run_jobs(jobs: List[Tuple[int, tuple, List[int], float]]) -> List[List[Tuple[int, BeamStep, float, float]]]:
+    """jobs ของ worker เดียวตามลำดับ: (prefix ร่วมกับเส้นทางก่อนหน้า, step ที่ต่าง, choices, ปริมาตรของสถานะ)"""
+    cursor = _worker["cursor"]
+    results = []
+    for lcp, suffix, choices, placed_volume in jobs:
+        cursor.goto(lcp, suffix)
+        results.append(cursor.expand(choices, placed_volume))
+    return results
+
+
+def _branch_choices(boxes: List[Box], remaining: List[int], window: int, branching: int) -> List[int]:
+    """กล่องที่เลือกวางถัดไปได้: priority ไม่เกิน priority ต่ำสุด + window, ขนาดไม่ซ้ำกัน, ไม่เกิน branching ใบ"""
+    lowest = boxes[remaining[0]].priority
+    choices, seen = [], set()
+    for i in remaining:
+        box = boxes[i]
+        if box.priority > lowest + window:
+            break
+        dims = (box.length, box.width, box.height)
+        if dims in seen:
+            continue
+        seen.add(dims)
+        choices.append(i)
+        if len(choices) >= branching:
+            break
+    return choices
+
+
+def _state_key(state: BeamState):
+    order, steps, _, _ = state
+    return frozenset(order), tuple(sorted((s[6], s[7], s[8], s[9], s[10]) for s in steps if s[5]))
+
+
+def plan_beam(container: Container, boxes: List[Box], optional_check: str = "op2",
+              base_algorithm: str = BEAM_BASE_ALGORITHM, beam_width: int = BEAM_WIDTH,
+              branching: int = BEAM_BRANCHING, priority_window: int = BEAM_PRIORITY_WINDOW,
+              fragmentation_weight: float = BEAM_FRAGMENTATION_WEIGHT, time_budget: float = BEAM_TIME_BUDGET,
+              max_workers: Optional[int] = None) -> Tuple[List[int], List[BeamStep]]:
+    """
+    beam search บนลำดับการวางของ boxes (เรียงตาม priority แล้ว)
+    คืน (order, steps): order = index ของ boxes ตามลำดับที่วาง, steps[k] = ผลของ boxes[order[k]]
+    container ใช้เป็นต้นแบบขนาด และจบด้วยสถานะของแผนที่ดีที่สุด
+    """
+    start = time.perf_counter()
+    place_fn = PLACEMENT_FUNCTIONS.get(base_algorithm, PLACEMENT_FUNCTIONS["hybrid2"])
+    pallet = container.pallet
+    init_args = (
+        list(boxes), (container.length, container.width, container.height),
+        (pallet.width, pallet.length, pallet.height), container.container_type, place_fn,
+        optional_check, fragmentation_weight,
+    )
+    _init_worker(*init_args)
+    cursor = _worker["cursor"]
+    max_workers = max_workers or BEAM_WORKERS or min(beam_width, os.cpu_count() or 1)
+    # worker ละ process (executor ละ 1 process) → สถานะที่ส่งไปแต่ละครั้งไปถึง cursor ตัวเดิมเสมอ
+    executors = [ProcessPoolExecutor(max_workers=1, initializer=_init_worker, initargs=init_args)
+                 for _ in range(max_workers)] if max_workers > 1 else []
+    lanes: List[List[Tuple[int, BeamStep]]] = [[] for _ in executors]  # เส้นทางของ cursor ในแต่ละ worker
+
+    beam: List[BeamState] = [((), (), 0.0, 0.0)]
+    try:
+        for depth in range(len(boxes)):
+            if time.perf_counter() - start > time_budget:
+                logging.warning(f"[Beam] ⏱ time budget {time_budget:.1f}s reached at box {depth}/{len(boxes)}, "
+                                f"finishing greedily")
+                perf.time_budget_hits += 1
+                break
+            jobs = []
+            for state in beam:
+                placed = set(state[0])
+                remaining = [i for i in range(len(boxes)) if i not in placed]
+                jobs.append((state, _branch_choices(boxes, remaining, priority_window, branching)))
+
+            if executors and len(jobs) > 1:
+                # ส่งแต่ละสถานะไป worker ที่เส้นทางปัจจุบันมี prefix ร่วมยาวสุด (จำกัดงานต่อ worker ให้เท่า ๆ กัน)
+                quota = -(-len(jobs) // len(executors))
+                batches: List[list] = [[] for _ in executors]
+                owners = []
+                for state, choices in jobs:
+                    best_lane, best_lcp = 0, -1
+                    for lane, path in enumerate(lanes):
+                        if len(batches[lane]) < quota:
+                            lcp = _common_prefix(path, state[0], state[1])
+                            if lcp > best_lcp:
+                                best_lane, best_lcp = lane, lcp
+                    batches[best_lane].append(_job(best_lcp, state, choices))
+                    owners.append((best_lane, len(batches[best_lane]) - 1))
+                    lanes[best_lane] = list(zip(state[0], state[1]))
+                futures = [executors[lane].submit(_run_jobs, batch) if batch else None
+                           for lane, batch in enumerate(batches)]
+                results = [future.result() if future is not None else [] for future in futures]
+                expanded = [results[lane][k] for lane, k in owners]
+            else:
+                expanded = []
+                for state, choices in jobs:
+                    lcp = _common_prefix(cursor.path, state[0], state[1])
+                    expanded.extend(_run_jobs([_job(lcp, state, choices)]))
+
+            children, seen = [], set()
+            for (order, steps, _, _), group in zip(beam, expanded):
+                for i, step, volume, score in group:
+                    child = (order + (i,), steps + (step,), volume, score)
+                    key = _state_key(child)
+                    if key not in seen:
+                        seen.add(key)
+                        children.append(child)
+            children.sort(key=lambda child: -child[3])
+            beam = children[:beam_width]
+            if TRACE_INFO:
+                trace(f"[Beam] depth={depth + 1} states={len(children)} best score={beam[0][3]:.4f}")
+    finally:
+        for executor in executors:
+            executor.shutdown(wait=True)
+
+    # เติมกล่องที่เหลือตามลำดับ priority (กรณีหมดเวลา) แล้วเลือกแผนที่วางได้มากสุด → ปริมาตรมากสุด
+    # แผน greedy ตามลำดับเดิมอยู่ในตัวเลือกเสมอ → beam ไม่มีทางแย่กว่า BEAM_BASE_ALGORITHM ตรง ๆ
+    finished = []
+    for order, steps, placed_volume, _ in beam + [((), (), 0.0, 0.0)]:
+        lcp = _common_prefix(cursor.path, order, steps)
+        cursor.goto(lcp, tuple(zip(order, steps))[lcp:])
+        tail, volume, score = cursor.complete_greedy(placed_volume)
+        finished.append((order + tuple(i for i, _ in tail), steps + tuple(step for _, step in tail), volume, score))
+    best = max(finished, key=lambda s: (sum(1 for step in s[1] if step[0] == "Confirmed"), s[2], s[3]))
+
+    order, steps = list(best[0]), list(best[1])
+    container.restore(
+        (boxes[i], s[6], s[7], s[8], s[9], s[10]) for i, s in zip(order, steps) if s[5]
+    )
+    logging.info(f"[Beam] planned {len(boxes)} boxes in {time.perf_counter() - start:.2f}s "
+                 f"(width={beam_width}, branching={branching}, window={priority_window})")
+    return order, steps
@@ -0,0 +1,61 @@
+import os
+import time
+import configparser
+from typing import Optional
+
+# ==============================
+#  Deadline ของการวางกล่อง (anytime placement)
+#  - [Deadline] BOX_TIME_BUDGET   = วินาทีต่อกล่อง (0 = ไม่จำกัด)
+#    [Deadline] ORDER_TIME_BUDGET = วินาทีต่อ order (0 = ไม่จำกัด) นับจาก start() ตอนเริ่มรอบการวาง
+#  - call_placement เปิด deadline ของกล่องด้วย begin_box() → engine เช็ก deadline.expired() ในลูปผู้สมัคร
+#    หมดเวลา: คืนตำแหน่งที่ดีที่สุดที่เจอแล้ว (result["deadline"] = True)
+#             ยังไม่เจอเลย: คืน Failed + deadline → call_placement ลอง FALLBACK_ALGORITHM (ถูกกว่า) แทน
+#  - เช็กทีละผู้สมัคร → เกินงบได้ไม่เกินเวลาประเมินผู้สมัคร 1 ตัว (+ เวลาของ fallback)
+#  - order หมดเวลาแล้ว → กล่องที่เหลือใช้ FALLBACK_ALGORITHM เลย (ไม่เริ่ม engine หลัก)
+#  - เวลาเป็น time.time() → ส่งเวลาสิ้นสุดของ order ให้ worker process ใช้ต่อได้ (portfolio / หลายคัน)
+#  - จำนวนกล่องที่ชน deadline นับใน perf (deadline_hits / deadline_fallbacks)
+# ==============================
+config = configparser.ConfigParser()
+config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config.ini")
+config.read(config_path, encoding="utf-8")
+
+BOX_TIME_BUDGET = config.getfloat("Deadline", "BOX_TIME_BUDGET", fallback=0.0)  # วินาที
+ORDER_TIME_BUDGET = config.getfloat("Deadline", "ORDER_TIME_BUDGET", fallback=0.0)  # วินาที
+FALLBACK_ALGORITHM = config.get("Deadline", "FALLBACK_ALGORITHM", fallback="ems").strip().lower()
+
+
+class Deadline:
+    __slots__ = ("box_budget", "order_budget", "order_until", "_box_until")
+
+    def __init__(self, box_budget: float = BOX_TIME_BUDGET, order_budget: float = ORDER_TIME_BUDGET):
+        self.box_budget = box_budget
+        self.order_budget = order_budget
+        self.order_until: Optional[float] = None
+        self._box_until: Optional[float] = None
+
+    def start(self, until: Optional[float] = None):
+        """เริ่มรอบการวางใหม่ (until = เวลาสิ้นสุดของ order ที่ process แม่ส่งมา; None = นับ ORDER_TIME_BUDGET จากตอนนี้)"""
+        if until is None and self.order_budget > 0:
+            until = time.time() + self.order_budget
+        self.order_until = until
+        self._box_until = None
+
+    def begin_box(self):
+        until = self.order_until
+        if self.box_budget > 0:
+            box_until = time.time() + self.box_budget
+            until = box_until if until is None else min(until, box_until)
+        self._box_until = until
+
+    def end_box(self):
+        self._box_until = None
+
+    def expired(self) -> bool:
+        """เวลาของกล่องปัจจุบันหมดแล้ว (นอก begin_box / end_box = ไม่จำกัด)"""
+        return self._box_until is not None and time.time() >= self._box_until
+
+    def order_expired(self) -> bool:
+        return self.order_until is not None and time.time() >= self.order_until
+
+
+deadline = Deadline()
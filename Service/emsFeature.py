@@ -0,0 +1,88 @@
+import os
+import configparser
+import numpy as np
+from Models.Box import Box
+from Models.Container import Container
+from Service.perfHandler import perf
+from Service.traceHandler import TRACE_DEBUG, sampled, trace
+
+# ==============================
+#  EMS engine: [PlaceMent] ALGORITHM = ems
+#  - เลือกตำแหน่งจาก Empty Maximal Spaces ของ Container (container.empty_spaces)
+#  - กล่องวางที่มุมล่างทั้ง 4 ของ space ที่ใส่ได้ → อยู่ในที่ว่างแน่นอน ไม่ต้องเช็กชน / กรอบ
+#  - เหลือเช็กเฉพาะ support ratio ≥ required_support_ratio ที่ผิวล่างของ space
+#  - EMS_REQUIRE_ROOF_CLEAR: ใช้เฉพาะ space ที่สูงถึง end_z (ด้านบนโล่ง 100% เหมือน hybrid2/hybrid3)
+#  - ผู้ชนะ: (Z, Y, X, rotation_pref) น้อยสุด
+# ==============================
+config = configparser.ConfigParser()
+config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config.ini")
+config.read(config_path, encoding="utf-8")
+
+prefer_rotation_first = config.getboolean("PlaceMent", "PREFER_ROTATION_FIRST", fallback=True)
+min_support_ratio = float(config.get("Container", "required_support_ratio", fallback="0.8"))
+EMS_REQUIRE_ROOF_CLEAR = config.getboolean("PlaceMent", "EMS_REQUIRE_ROOF_CLEAR", fallback=True)
+
+
+def place_box_ems(container: Container, box: Box, optional_check: str = "op2"):
+    """
+    วางกล่องลงใน Empty Maximal Space ที่ต่ำสุด → ชิดบน (Y−) → ชิดซ้าย (X−)
+    op1: space ที่สูงถึง end_z รับกล่องที่สูงเกินได้ (วางได้แต่คืน OutOfContainer เหมือน basic)
+    """
+    spaces = container.empty_spaces.spaces
+    rotation_order = [True, False] if prefer_rotation_first else [False, True]
+    open_top = spaces[:, 5] >= container.end_z
+    best = None  # ((z, y, x, rot_sort), x, y, z, rot, support)
+
+    for rot in rotation_order:
+        L, W = (box.width, box.length) if rot else (box.length, box.width)
+        H = box.height
+        height_ok = spaces[:, 5] - spaces[:, 4] >= H
+        if optional_check == "op1":
+            height_ok |= open_top
+        fit = (spaces[:, 1] - spaces[:, 0] >= L) & (spaces[:, 3] - spaces[:, 2] >= W) & height_ok
+        if EMS_REQUIRE_ROOF_CLEAR:
+            fit &= open_top
+        candidates = spaces[fit]
+        perf.candidates_generated += len(candidates)
+        candidates = candidates[np.lexsort((candidates[:, 0], candidates[:, 2], candidates[:, 4]))]  # Z → Y → X
+
+        rot_sort = 0 if rot else 1
+        if prefer_rotation_first:
+            rot_sort = 1 - rot_sort
+        for idx, (x0, x1, y0, y1, z0, z1) in enumerate(candidates.tolist()):
+            if best is not None and z0 > best[0][0]:
+                perf.candidates_skipped += len(candidates) - idx
+                break  # space เรียง Z แล้ว: ที่เหลือสูงกว่าผู้ชนะ
+            for x, y in ((x0, y0), (x1 - L, y0), (x0, y1 - W), (x1 - L, y1 - W)):
+                key = (z0, y, x, rot_sort)
+                if best is not None and key >= best[0]:
+                    continue
+                support = container.support_ratio(x, y, z0, L, W)
+                if support + 1e-9 < min_support_ratio:
+                    continue
+                best = (key, x, y, z0, rot, support)
+                if TRACE_DEBUG and sampled("ems.candidate"):
+                    trace(f"[EMS] {box.sku} candidate ({x},{y},{z0}) rot={rot} support={support:.2f}")
+
+    if best is None:
+        return {
+            "status": "Failed",
+            "rotation": -1,
+            "support": 0.0,
+            "exceeds_end_z": False,
+            "message": "[EMS] No suitable space"
+        }
+
+    _, x, y, z, rot, support = best
+    if rot:
+        box.length, box.width = box.width, box.length
+    box.set_position(x, y, z)
+    exceeds = box.z + box.height > container.end_z
+    container.place_box(box)
+    return {
+        "status": "OutOfContainer" if exceeds else "Confirmed",
+        "rotation": 0 if rot else 1,  # 0 = หมุน, 1 = ไม่หมุน
+        "support": support,
+        "exceeds_end_z": exceeds,
+        "message": f"Support: {support:.2f}" + (" (⚠ exceeds container height)" if exceeds else ""),
+    }
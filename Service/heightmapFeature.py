@@ -0,0 +1,291 @@
+import os
+import math
+import bisect
+import weakref
+import configparser
+from typing import List
+import numpy as np
+from Models.Box import Box
+from Models.Container import Container
+from Models.SpatialIndex import level_key
+from Service.perfHandler import perf
+from Service.traceHandler import TRACE_DEBUG, sampled, trace
+
+# ==============================
+#  Heightmap engine: [PlaceMent] ALGORITHM = heightmap
+#  - พื้นที่วาง (start_x..end_x × start_y..end_y) เป็น grid ความสูงผิวบน ความละเอียด HEIGHTMAP_CELL มม.
+#    (container.height_grid: cell ที่กล่องแตะบางส่วนถือว่าครอบทั้ง cell → ไม่มีทางชน)
+#  - ทุกตำแหน่งที่ชิดเส้น grid × ทั้ง 2 rotation: Z ที่วางลงได้ (z_rest) = ค่าสูงสุดของ grid ใต้ footprint
+#    ไม่คำนวณ z_rest ทั้ง grid แต่ไล่ระดับผิวบนที่มีจริง (pallet + ผิวบนกล่อง) จากต่ำขึ้นไป:
+#      หน้าต่างที่ทุก cell <= z (sliding-window บน bool) และไม่ fit ที่ระดับก่อน → z_rest == z
+#      สแกนทีละแถบตามแกน Y (SCAN_STRIP) เจอตำแหน่งแล้วหยุด
+#  - ผู้ชนะ: (Z, Y, X, rotation_pref) น้อยสุด — ระดับแรกที่มีตำแหน่งผ่าน support จบ rotation นั้น
+#    ตำแหน่งในระดับไล่ตาม (Y, X) ทีละชุดเล็ก ๆ นับ support จาก grid (integral image เฉพาะกรอบของชุด)
+#    แล้วยืนยันแบบ exact ด้วย container.support_ratio
+#  - grid มีแต่สูงขึ้น → z_rest ต่ำสุดของแต่ละขนาด footprint ในแต่ละแถบไม่ลดลง: จำระดับสูงสุดที่แถบนั้นยังไม่มี
+#    หน้าต่างว่างไว้ต่อขนาด แล้วข้ามแถบ / ระดับที่รู้ว่าว่างเปล่า (ไม่ต้องสแกนทุกระดับทั้ง grid ทุกกล่อง)
+#  - support ที่ระดับ z มาจากผิวบนของกล่องที่จบที่ z เท่านั้น → ข้ามทั้งระดับเมื่อพื้นที่ผิวบนรวมของระดับ
+#    < ratio × footprint; ข้ามแถบที่เคยสแกนไม่เจอถ้ายังไม่มีกล่องใหม่จบที่ระดับนั้น (_LevelScan)
+#  - ราคาที่จ่าย (discretization loss): กล่องเริ่มที่เส้น grid เท่านั้น → ช่องว่างเกินจริงได้ไม่เกิน
+#    HEIGHTMAP_CELL มม. ต่อด้าน (X / Y) ต่อกล่อง และเห็นกล่องที่ไม่ชิด grid ใหญ่ขึ้นไม่เกิน 1 cell ต่อด้าน
+#  - คุณภาพการแพ็ก: ขอบเขตข้างบนเป็นของกล่องแต่ละใบ ไม่ใช่ของทั้ง order — บนพาเลท 1100 × 1100 วางได้น้อยกว่า
+#    ems / hybrid2 (เช่น 21 เทียบ 31-32 กล่องจาก 60) ไม่ใช่เพราะ grid: กล่องที่ heightmap วางไม่ได้ ems / hybrid2
+#    ก็วางไม่ได้ในสถานะเดียวกัน แต่ heightmap เห็นทุกจุดบน grid → รับกล่องใหญ่ซ้อนสูงในจุดที่ ems ไม่เห็น
+#    ความสูงจึงหมดเร็วและกล่องท้าย order ไม่มีที่ (greedy ต่อกล่อง ไม่มองกล่องถัดไป)
+# ==============================
+config = configparser.ConfigParser()
+config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config.ini")
+config.read(config_path, encoding="utf-8")
+
+prefer_rotation_first = config.getboolean("PlaceMent", "PREFER_ROTATION_FIRST", fallback=True)
+min_support_ratio = float(config.get("Container", "required_support_ratio", fallback="0.8"))
+HEIGHTMAP_CELL = config.getfloat("PlaceMent", "HEIGHTMAP_CELL", fallback=5.0)  # มม.
+SCAN_STRIP = 128  # จำนวนแถว cell ตามแกน Y ต่อรอบสแกนระดับ (ตำแหน่งมักอยู่แถบแรก ๆ → ไม่ต้องสแกนทั้ง grid)
+SUPPORT_CHUNK = 256  # จำนวนตำแหน่งที่นับ support จาก grid พร้อมกัน (ตามลำดับ Y → X)
+
+# container -> (heightmap, จำนวนกล่อง, {ขนาดที่วางไม่ได้}) : grid เดิมและยังไม่มีกล่องใหม่ = ผลเดิม
+# (rollback สร้าง heightmap ใหม่ → ทิ้งผลเก่าอัตโนมัติ)
+_failed_dims = weakref.WeakKeyDictionary()
+# heightmap -> _LevelScan
+_scans = weakref.WeakKeyDictionary()
+
+
+def discretization_note(cell_size: float = HEIGHTMAP_CELL) -> str:
+    return (f"heightmap grid {cell_size:g} mm: positions snap to the grid, "
+            f"up to {cell_size:g} mm extra gap per side (X/Y) per box")
+
+
+def _sliding_all(mask: np.ndarray, window: int, axis: int) -> np.ndarray:
+    """ทุกช่วงยาว window ตามแกน axis ที่ True ทุกตัว (ยาวลดลง window-1) ด้วยการพับครึ่ง log2(window) ครั้ง"""
+    def cut(lo, hi):
+        return (slice(lo, hi),) if axis == 0 else (slice(None), slice(lo, hi))
+
+    n = mask.shape[axis]
+    out, span = mask, 1
+    while span * 2 <= window:
+        m = out.shape[axis]
+        out = out[cut(0, m - span)] & out[cut(span, m)]  # out[i] = ทุกตัวใน mask[i : i + 2·span]
+        span *= 2
+    count = n - window + 1
+    return out[cut(0, count)] & out[cut(window - span, window - span + count)]
+
+
+def window_all(mask: np.ndarray, a: int, b: int) -> np.ndarray:
+    """หน้าต่าง a × b ที่ mask เป็น True ทุก cell: shape (nx - a + 1, ny - b + 1)"""
+    return _sliding_all(_sliding_all(mask, a, 0), b, 1)
+
+
+def window_sum(mask: np.ndarray, a: int, b: int) -> np.ndarray:
+    """จำนวน True ใต้หน้าต่าง a × b ทุกตำแหน่ง (integral image)"""
+    nx, ny = mask.shape
+    total = np.zeros((nx + 1, ny + 1), dtype=np.int64)
+    total[1:, 1:] = mask.cumsum(axis=0).cumsum(axis=1)
+    return total[a:, b:] - total[:-a, b:] - total[a:, :-b] + total[:-a, :-b]
+
+
+class _LevelScan:
+    """
+    สถานะการไล่ระดับของ heightmap หนึ่งอัน (อัปเดตเพิ่มทีละกล่อง; grid มีแต่สูงขึ้น)
+    - levels: ระดับผิวบนทั้งหมดใน grid (pallet + ผิวบนกล่อง) เรียงน้อย → มาก
+    - tops: level_key → [พื้นที่ผิวบนรวม, จำนวนกล่อง] ของกล่องที่จบที่ระดับนั้น
+    - bounds: (L, W) → ต่อแถบ Y ระดับสูงสุดที่รู้ว่าแถบนั้นยังไม่มีหน้าต่างว่าง
+    - failed: (L, W) → {level_key: (จำนวนกล่องของระดับ, {แถบที่สแกนแล้วไม่เจอ})}
+      ตำแหน่งที่ z_rest == z และ cell ที่สูง z เพิ่มได้เฉพาะเมื่อมีกล่องใหม่จบที่ z → จำนวนเท่าเดิม = แถบเดิมยังไม่เจอ
+    """
+    __slots__ = ("count", "levels", "tops", "bounds", "failed")
+
+    def __init__(self, fill: float):
+        self.count = 0
+        self.levels = [fill]
+        self.tops = {}
+        self.bounds = {}
+        self.failed = {}
+
+    def sync(self, boxes: List[Box]):
+        for placed in boxes[self.count:]:
+            top = placed.z + placed.height
+            area_count = self.tops.setdefault(level_key(top), [0.0, 0])
+            area_count[0] += placed.length * placed.width
+            area_count[1] += 1
+            k = bisect.bisect_left(self.levels, top)
+            if k == len(self.levels) or self.levels[k] != top:
+                self.levels.insert(k, top)
+        self.count = len(boxes)
+
+
+def _level_scan(container: Container, heightmap) -> _LevelScan:
+    scan = _scans.get(heightmap)
+    if scan is None or scan.count > len(container.boxes):
+        scan = _scans[heightmap] = _LevelScan(heightmap.fill)
+    scan.sync(container.boxes)
+    return scan
+
+
+def _first_supported(container: Container, grid: np.ndarray, candidates: np.ndarray, z: float,
+                     a: int, b: int, xs: np.ndarray, ys: np.ndarray, L: int, W: int):
+    """ตำแหน่งแรกตาม (Y, X) ใน candidates (วางที่ระดับ z) ที่ผ่าน support (grid แล้ว exact) → (x, y, support) หรือ None"""
+    n0 = candidates.shape[0]
+    flat = np.flatnonzero(candidates.T)  # index = j·n0 + i → เรียง Y แล้ว X
+    for start in range(0, len(flat), SUPPORT_CHUNK):
+        chunk = flat[start:start + SUPPORT_CHUNK]
+        j, i = np.divmod(chunk, n0)
+        # นับ support เฉพาะกรอบที่ครอบตำแหน่งในชุดนี้ (ปกติคือผิวบนของไม่กี่กล่อง)
+        i0, j0 = i.min(), j.min()
+        level = grid[i0:i.max() + a, j0:j.max() + b] == z
+        supported = window_sum(level, a, b)[i - i0, j - j0]
+        for n in np.flatnonzero(supported + 1e-9 >= min_support_ratio * a * b).tolist():
+            x, y = float(xs[i[n]]), float(ys[j[n]])
+            support = container.support_ratio(x, y, z, L, W)  # grid ประมาณ support เกินได้ → ยืนยันแบบ exact
+            if support + 1e-9 >= min_support_ratio:
+                return x, y, support
+    return None
+
+
+def _highest_empty(strip: np.ndarray, levels: List[float], k: int, k_limit: int, a: int, b: int) -> float:
+    """levels[k] ไม่มีหน้าต่างว่างในแถบ → ระดับสูงสุด (ก่อน k_limit) ที่ยังไม่มี (มีหน้าต่างว่าง = จริงตลอดเมื่อ z สูงขึ้น)"""
+    lo, hi, step = k, k_limit, 1
+    while lo + step < hi:  # galloping: ปกติระดับว่างติดกันไม่กี่ระดับ
+        if window_all(strip <= levels[lo + step], a, b).any():
+            hi = lo + step
+            break
+        lo += step
+        step *= 2
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if window_all(strip <= levels[mid], a, b).any():
+            hi = mid
+        else:
+            lo = mid
+    return levels[lo]
+
+
+def _first_at_level(container: Container, grid: np.ndarray, levels: List[float], k: int, k_limit: int,
+                    bounds: list, failed: set, a: int, b: int, ni: int, xs: np.ndarray, ys: np.ndarray,
+                    L: int, W: int):
+    """
+    ตำแหน่งแรกตาม (Y, X) ที่ z_rest == levels[k] และผ่าน support → (x, y, support) หรือ None
+    ไล่ทีละแถบตามแกน Y เจอแล้วหยุด
+    bounds[แถบ] = ระดับสูงสุดที่รู้ว่าแถบนั้นยังไม่มีหน้าต่างว่าง (ข้ามแถบได้ และอัปเดตเมื่อสแกนแล้วไม่เจอ)
+    failed = แถบที่ระดับนี้สแกนแล้วไม่มีตำแหน่งผ่าน (ข้าม และเพิ่มแถบที่ไม่เจอรอบนี้)
+    """
+    z = levels[k]
+    below = levels[k - 1] if k > 0 else None
+    step = _strip_cells(b)
+    for s, bound in enumerate(bounds):
+        if z <= bound or s in failed:
+            continue
+        j0 = s * step
+        strip = grid[:ni + a - 1, j0:j0 + step + b - 1]
+        fits = window_all(strip <= z, a, b)  # z_rest <= z
+        if not fits.any():
+            # grid มีแต่สูงขึ้น → แถบนี้ไม่มีวันวางขนาดนี้ได้ที่ระดับ <= bounds[แถบ] อีก
+            bounds[s] = _highest_empty(strip, levels, k, k_limit, a, b)
+            continue
+        if below is not None and below > bound:
+            fits &= ~window_all(strip <= below, a, b)  # ตัดตำแหน่งที่วางได้ต่ำกว่า → เหลือ z_rest == z
+        found = _first_supported(container, strip, fits, z, a, b, xs, ys[j0:], L, W)
+        if found is not None:
+            return found
+        failed.add(s)
+    return None
+
+
+def _strip_cells(b: int) -> int:
+    return max(SCAN_STRIP, 4 * b)
+
+
+def place_box_heightmap(container: Container, box: Box, optional_check: str = "op2",
+                        cell_size: float = HEIGHTMAP_CELL):
+    """
+    วางกล่องบน heightmap ที่ตำแหน่งต่ำสุด → ชิดบน (Y−) → ชิดซ้าย (X−)
+    op1: ยอมให้สูงเกิน end_z ได้ (วางได้แต่คืน OutOfContainer เหมือน basic)
+    """
+    heightmap = container.height_grid(cell_size)
+    dims_key = (box.length, box.width, box.height, optional_check, cell_size)
+    known_map, count, failed = _failed_dims.get(container, (None, -1, None))
+    if known_map is not heightmap or count != len(container.boxes):
+        failed = set()
+        _failed_dims[container] = (heightmap, len(container.boxes), failed)
+    elif dims_key in failed:
+        return _failed()
+
+    grid = heightmap.grid
+    nx, ny = grid.shape
+    rotation_order = [True, False] if prefer_rotation_first else [False, True]
+    scan = _level_scan(container, heightmap)
+    levels = scan.levels
+    z_limit = container.end_z - box.height if optional_check == "op2" else math.inf
+
+    # ต่อ rotation: ตำแหน่งที่อยู่ในกรอบ X / Y เป็นสี่เหลี่ยมมุมบนซ้ายของ z_rest (ตัดด้วย slice ไม่ต้องใช้ mask)
+    best = None  # ((z, y, x, rot_sort), rot, L, W, support)
+    for rot in rotation_order:
+        L, W = (box.width, box.length) if rot else (box.length, box.width)
+        a, b = math.ceil(L / cell_size - 1e-9), math.ceil(W / cell_size - 1e-9)
+        if a > nx or b > ny:
+            continue
+        xs = heightmap.x0 + np.arange(nx - a + 1) * cell_size
+        ys = heightmap.y0 + np.arange(ny - b + 1) * cell_size
+        ni = int(np.searchsorted(xs + L, container.end_x, side="right"))
+        nj = int(np.searchsorted(ys + W, container.end_y, side="right"))
+        if ni == 0 or nj == 0:
+            continue
+        perf.candidates_generated += ni * nj
+        rot_sort = 0 if rot else 1
+        if prefer_rotation_first:
+            rot_sort = 1 - rot_sort
+
+        # ผู้ชนะเรียง Z ก่อน → ไล่ระดับผิวบนจากต่ำขึ้นไป หยุดที่ระดับแรกที่มีตำแหน่งผ่าน
+        bounds = scan.bounds.get((L, W))
+        if bounds is None:
+            bounds = scan.bounds[(L, W)] = [-math.inf] * math.ceil(nj / _strip_cells(b))
+        failed_levels = scan.failed.setdefault((L, W), {})
+        k = bisect.bisect_right(levels, min(bounds))
+        k_limit = bisect.bisect_right(levels, z_limit)
+        while k < k_limit:
+            z = levels[k]
+            if best is not None and z > best[0][0]:
+                break
+            area, count = scan.tops.get(level_key(z), (0.0, 0))
+            if z > container.pallet_height and area + 1e-9 < min_support_ratio * L * W:
+                k += 1  # ผิวบนทั้งระดับรวมกันยังไม่พอ support → ไม่มีตำแหน่งไหนผ่านแน่นอน
+                continue
+            memo = failed_levels.get(level_key(z))
+            if memo is None or memo[0] != count:
+                memo = failed_levels[level_key(z)] = (count, set())
+            found = _first_at_level(container, grid, levels, k, k_limit, bounds, memo[1], a, b, ni, xs, ys, L, W)
+            if found is not None:
+                x, y, support = found
+                key = (z, y, x, rot_sort)
+                if best is None or key < best[0]:
+                    best = (key, rot, L, W, support)
+                break
+            k += 1
+
+    if best is None:
+        failed.add(dims_key)
+        return _failed()
+    (z, y, x, _), rot, L, W, support = best
+    if TRACE_DEBUG and sampled("heightmap.accept"):
+        trace(f"[Heightmap] {box.sku} at ({x},{y},{z}) rot={rot} support={support:.2f}")
+    if rot:
+        box.length, box.width = box.width, box.length
+    box.set_position(x, y, z)
+    exceeds = box.z + box.height > container.end_z
+    container.place_box(box)
+    return {
+        "status": "OutOfContainer" if exceeds else "Confirmed",
+        "rotation": 0 if rot else 1,  # 0 = หมุน, 1 = ไม่หมุน
+        "support": support,
+        "exceeds_end_z": exceeds,
+        "message": f"Support: {support:.2f}" + (" (⚠ exceeds container height)" if exceeds else ""),
+    }
+
+
+def _failed():
+    return {
+        "status": "Failed",
+        "rotation": -1,
+        "support": 0.0,
+        "exceeds_end_z": False,
+        "message": "[Heightmap] No suitable position"
+    }
@@ -0,0 +1,131 @@
+import os
+import math
+import configparser
+from typing import List, Optional, Tuple
+from Models.Box import Box
+from Models.Container import Container
+from Models.MaxRects import MaxRectsSheet
+from Service.traceHandler import TRACE_INFO, trace
+
+# ==============================
+#  Layer (wall/shelf) engine: [PlaceMent] ALGORITHM = layer
+#  - จัดกลุ่มกล่องตามความสูง (ต่างกันไม่เกิน LAYER_HEIGHT_TOLERANCE มม.) เรียงกลุ่มตาม priority แรกของกลุ่ม
+#  - แต่ละชั้นแก้เป็นปัญหา 2D MaxRects บนพื้นที่ start_x..end_x × start_y..end_y ของ Container
+#  - กล่องวางลงบนผิวบนสูงสุดใต้ footprint แล้วตรวจด้วย can_place (กรอบ / ชน / รองรับ) + roof_is_clear เหมือนอัลกอริทึมอื่น
+#  - กล่องที่ชั้นนี้วางไม่พอ ยกไปชั้นถัดไปของกลุ่มเดิม (ซ้อนด้านบน)
+#  - ชั้นถัดไปเป็นของกลุ่มที่มีกล่อง priority ต่ำสุดค้างอยู่ (เสมอกัน → กลุ่มที่เจอก่อน)
+#    → ชั้นของแต่ละกลุ่มสลับกันตาม priority ไม่วางกลุ่มเดียวจนหมดก่อน (กล่อง priority สูงไม่ลงก่อน priority ต่ำของกลุ่มอื่น)
+#  วางแผนทั้ง order ในครั้งเดียว (ไม่ใช่ทีละกล่อง) → ใช้ผ่าน Service.packingEngine (ORDER_PLANNERS)
+# ==============================
+config = configparser.ConfigParser()
+config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config.ini")
+config.read(config_path, encoding="utf-8")
+
+LAYER_HEIGHT_TOLERANCE = config.getfloat("PlaceMent", "LAYER_HEIGHT_TOLERANCE", fallback=20.0)
+LAYER_ALLOW_ROTATION = config.getboolean("PlaceMent", "LAYER_ALLOW_ROTATION", fallback=True)
+
+# step = (status, rotation, support, exceeds_end_z, message, placed, x, y, z, length, width)
+LayerStep = Tuple[str, int, float, bool, str, bool, float, float, float, int, int]
+
+
+def group_by_height(boxes: List[Box], tolerance: float = LAYER_HEIGHT_TOLERANCE) -> List[List[int]]:
+    """index ของกล่องแบ่งเป็นกลุ่มความสูง (เทียบกับกล่องแรกของกลุ่ม) คงลำดับ priority ภายในกลุ่ม"""
+    groups: List[List[int]] = []
+    ref_heights: List[float] = []
+    for i, box in enumerate(boxes):
+        for g, ref in enumerate(ref_heights):
+            if abs(box.height - ref) <= tolerance:
+                groups[g].append(i)
+                break
+        else:
+            groups.append([i])
+            ref_heights.append(box.height)
+    return groups
+
+
+def _place_on_sheet(container: Container, sheet: MaxRectsSheet, box: Box, optional_check: str,
+                    allow_rotation: bool, origins: List[Tuple[float, float]]) -> Optional[LayerStep]:
+    """ลองตำแหน่งจาก MaxRects (ระดับวางต่ำสุดก่อน) วางลง container ที่ตำแหน่งแรกที่ผ่าน can_place + หลังคาโล่ง"""
+    L0, W0 = box.length, box.width
+    candidates = sheet.candidates(L0, W0, allow_rotation)
+    # มุมของกล่องชั้นล่าง: วางซ้อนตรงแนวกล่องเดิม (ผิวบนเรียบ รองรับเต็ม) แม้ชั้นใหม่ยังไม่มี free rect แตกย่อย
+    orientations = [(L0, W0, False), (W0, L0, True)] if allow_rotation and L0 != W0 else [(L0, W0, False)]
+    for ox, oy in origins:
+        for L, W, rotated in orientations:
+            if sheet.fits(ox, oy, L, W):
+                candidates.append((ox, oy, rotated))
+    ranked = []
+    seen = set()
+    for rank, (x, y, rotated) in enumerate(candidates):
+        if (x, y, rotated) in seen:
+            continue
+        seen.add((x, y, rotated))
+        L, W = (W0, L0) if rotated else (L0, W0)
+        z = container.floor_under(x, y, x + L, y + W)
+        if z + box.height <= container.end_z:
+            ranked.append((z, rank, x, y, rotated, L, W))
+    ranked.sort()  # ระดับต่ำสุดก่อน (เติมชั้นล่างให้เต็ม) แล้วตามลำดับ MaxRects
+    for z, _, x, y, rotated, L, W in ranked:
+        box.length, box.width = L, W
+        ok, _ = container.can_place(box, x, y, z, optional_check)
+        if not ok or not container.roof_is_clear(x, y, x + L, y + W, z + box.height):
+            box.length, box.width = L0, W0
+            continue
+        support = container.support_ratio(x, y, z, L, W)
+        box.set_position(x, y, z)
+        container.place_box(box)
+        sheet.place(x, y, x + L, y + W)
+        return ("Confirmed", 0 if rotated else 1, support, False, f"Support: {support:.2f}", True,
+                box.x, box.y, box.z, box.length, box.width)
+    return None
+
+
+def plan_layers(container: Container, boxes: List[Box], optional_check: str = "op2",
+                tolerance: float = LAYER_HEIGHT_TOLERANCE,
+                allow_rotation: bool = LAYER_ALLOW_ROTATION) -> Tuple[List[int], List[LayerStep]]:
+    """
+    แพ็ก boxes (เรียงตาม priority แล้ว) เป็นชั้น ๆ ลง container (วางจริง)
+    คืน (order, steps): order = index ของ boxes ตามลำดับที่วางลง container จริง (ลำดับโหลด)
+    ตามด้วยกล่องที่วางไม่ได้ (ลำดับเดิม), steps[k] = ผลของ boxes[order[k]]
+    """
+    x0, y0 = math.ceil(container.start_x), math.ceil(container.start_y)
+    x1, y1 = math.floor(container.end_x), math.floor(container.end_y)
+    steps: List[Optional[LayerStep]] = [None] * len(boxes)
+    order: List[int] = []  # ลำดับที่ _place_on_sheet วางลง container จริง
+
+    pending = dict(enumerate(group_by_height(boxes, tolerance)))  # กลุ่ม -> กล่องที่ยังไม่ได้วาง (ตามลำดับ priority)
+    layers = dict.fromkeys(pending, 0)
+    while pending:
+        g = min(pending, key=lambda g: (boxes[pending[g][0]].priority, g))
+        sheet = MaxRectsSheet(x0, y0, x1, y1)
+        leftover = []
+        origins = sorted({(b.x, b.y) for b in container.boxes}, key=lambda p: (p[1], p[0]))
+        failed_at = {}  # (length, width, height) -> จำนวนกล่องใน container ตอนที่วางขนาดนี้ไม่ได้
+        for i in pending[g]:
+            box = boxes[i]
+            dims = (box.length, box.width, box.height)
+            if failed_at.get(dims) == len(container.boxes):
+                leftover.append(i)  # ไม่มีอะไรเปลี่ยนตั้งแต่กล่องขนาดเดียวกันวางไม่ได้
+                continue
+            step = _place_on_sheet(container, sheet, box, optional_check, allow_rotation, origins)
+            if step is None:
+                failed_at[dims] = len(container.boxes)
+                leftover.append(i)
+            else:
+                steps[i] = step
+                order.append(i)
+        if TRACE_INFO:
+            trace(f"[layer] h≈{boxes[pending[g][0]].height} layer#{layers[g]}: "
+                  f"placed {len(pending[g]) - len(leftover)}, left {len(leftover)}")
+        if not leftover or len(leftover) == len(pending[g]):
+            del pending[g]  # วางครบแล้ว หรือชั้นใหม่ของกลุ่มนี้วางเพิ่มไม่ได้แล้ว
+        else:
+            pending[g] = leftover
+            layers[g] += 1
+
+    for i, box in enumerate(boxes):
+        if steps[i] is None:
+            steps[i] = ("Failed", -1, 0.0, False, "No suitable position found", False,
+                        box.x, box.y, box.z, box.length, box.width)
+            order.append(i)
+    return order, [steps[i] for i in order]
@@ -0,0 +1,138 @@
+import os
+import logging
+from io import StringIO
+import pandas as pd
+from typing import List, Tuple
+from Models.Box import Box
+
+# ==============================
+#  อ่าน order (forimport.csv) / เขียนผล (forexport.txt) แบบไม่มี UI
+#  - ใช้ได้ทั้งจาก PackingApp (ผ่าน DataHandler) และจาก CLI / batch job
+#  - ข้อผิดพลาดส่งออกเป็น OrderFileError ให้ฝั่งที่เรียกเลือกวิธีแจ้งผู้ใช้เอง
+# ==============================
+SAMPLE_ORDER = (
+    "Container,,C_Width,C_Length,C_Height\n"
+    "F15,,1060,1060,920\n"
+    "Priority,BoxTypes,Width,Length,Height,CV,Wgt\n"
+    "1,TEST1,100,200,150,1,0\n"
+    "2,TEST2,120,220,160,2,0\n"
+    "3,TEST3,140,240,170,3,0\n"
+)
+
+EXPORT_HEADER = "SKU,Y (mm),X (mm),Z (mm),Rotate,% Cube,Wgt,Width,Length,Height,Priority,CV,Out"
+EXPORT_COLUMNS = ["SKU", "Y (mm)", "X (mm)", "Z (mm)", "Rotate", "% Cube", "Wgt", "Width", "Length", "Height", "Priority", "CV", "Out"]
+
+ContainerSpec = Tuple[str, int, int, int]  # (container_type, width, length, height)
+
+
+class OrderFileError(ValueError):
+    """ไฟล์ order อ่านไม่ได้ / รูปแบบไม่ถูกต้อง (message ใช้แสดงผู้ใช้ได้ตรง ๆ)"""
+
+
+def write_sample_order(path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(SAMPLE_ORDER)
+
+
+def parse_order_lines(lines: List[str]) -> Tuple[ContainerSpec, List[Box]]:
+    """แปลงบรรทัดของ forimport.csv เป็น (container_type, width, length, height) และรายการ Box"""
+    if not lines:
+        raise OrderFileError("CSV file is empty.")
+
+    # ----- อ่านข้อมูล Container -----
+    container_line_index = next((i for i, line in enumerate(lines) if line.strip().startswith("Container")), None)
+    if container_line_index is None or container_line_index + 1 >= len(lines):
+        raise OrderFileError("Container data not found.")
+
+    container_data = lines[container_line_index + 1].strip().split(",")
+    if len(container_data) < 5:
+        raise OrderFileError("Invalid container data format.")
+
+    try:
+        container_type = container_data[0].strip()
+        container_width = int(container_data[2])
+        container_length = int(container_data[3])
+        container_height = int(container_data[4])
+    except (IndexError, ValueError):
+        logging.error("Error parsing container dimensions.")
+        raise OrderFileError("Invalid container dimensions.")
+
+    logging.debug(f"Container dimensions loaded: Width={container_width}, Length={container_length}, Height={container_height}")
+    container = (container_type, container_width, container_length, container_height)
+
+    # ----- อ่านข้อมูล Box -----
+    box_start_index = next((i for i, line in enumerate(lines) if line.strip().startswith("Priority")), None)
+    if box_start_index is None:
+        raise OrderFileError("Box data header not found.")
+
+    # อ่านข้อมูลกล่องตั้งแต่แถวที่มี Priority เป็นต้นไป
+    df = pd.read_csv(StringIO("".join(lines[box_start_index:])), delimiter=",")
+    logging.debug(f"DataFrame loaded: \n{df.to_string()}")
+    df.columns = [col.lower() for col in df.columns]  # เปลี่ยนชื่อคอลัมน์เป็นตัวพิมพ์เล็ก
+    required_columns = ["priority", "boxtypes", "width", "length", "height"]
+    if df.empty:
+        logging.warning("Box data is empty. No boxes to load.")
+        return container, []
+    if not all(col in df.columns for col in required_columns):
+        missing_columns = [col for col in required_columns if col not in df.columns]
+        logging.error(f"CSV file missing required columns: {missing_columns}")
+        raise OrderFileError(f"CSV file missing required columns: {missing_columns}")
+
+    boxes_to_place = []
+    for _, row in df.iterrows():
+        row_dict = row.to_dict()
+        missing_fields = [col for col in ("cv", "wgt") if col not in row_dict]
+        if missing_fields:
+            raise OrderFileError(f"CSV file missing required columns: {missing_fields}")
+        box = Box(
+            length=row_dict.pop("length"),
+            width=row_dict.pop("width"),
+            height=row_dict.pop("height"),
+            sku=row_dict.pop("boxtypes"),
+            priority=int(row_dict.pop("priority")),
+            cv=str(row_dict.pop("cv")),
+            wgt=row_dict.pop("wgt"),
+            **row_dict  # ที่เหลือส่งเข้าไปเป็น extra_fields
+        )
+        logging.debug(f"Loaded box: {box.sku}, extras: {box.extra_fields}")
+        boxes_to_place.append(box)
+
+    logging.info(f"Loaded {len(boxes_to_place)} boxes from CSV.")
+    return container, boxes_to_place
+
+
+def read_order_file(path: str) -> Tuple[ContainerSpec, List[Box]]:
+    """อ่าน forimport.csv จาก path (ไฟล์ไม่มี → OrderFileError)"""
+    logging.info(f"Attempting to load CSV file from: {path}")
+    if not os.path.exists(path):
+        raise OrderFileError(f"CSV file not found: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    return parse_order_lines(lines)
+
+
+def export_lines(rows: List[list]) -> List[str]:
+    """แปลงแถวผลลัพธ์ (ตาม EXPORT_COLUMNS) เป็นบรรทัดของ forexport.txt"""
+    lines = []
+    for row in rows:
+        row = dict(zip(EXPORT_COLUMNS, row)) if not isinstance(row, dict) else row
+        out = row.get("Out")
+        if pd.notna(out) and str(out).strip() == "1":
+            lines.append(
+                f"{row['SKU']},{row['Y (mm)']},{row['X (mm)']},{row['Z (mm)']},{row['Rotate']},{row['% Cube']},{row['Wgt']},{row['Width']},{row['Length']},{row['Height']},{row['Priority']},{row.get('CV', '')},{row['Out']}"
+            )
+        else:
+            lines.append(
+                f"{row['SKU']},,,,,,{row['Wgt']},{row['Width']},{row['Length']},{row['Height']},{row['Priority']},{row.get('CV', '')},{row['Out']}"
+            )
+    return lines
+
+
+def write_export_file(path: str, rows: List[list]) -> int:
+    """เขียน forexport.txt คืนจำนวนแถวที่เขียน"""
+    lines = export_lines(rows)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(EXPORT_HEADER + "\n")
+        for line in lines:
+            f.write(line + "\n")
+    return len(lines)
@@ -0,0 +1,612 @@
+import os
+import sys
+import copy
+import time
+import queue
+import logging
+import argparse
+import configparser
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from Models.Box import Box
+from Models.Container import Container
+from Models.Pallet import Pallet
+from Service.orderHandler import ContainerSpec, OrderFileError, read_order_file, write_export_file
+from Service.layerFeature import plan_layers
+from Service.beamFeature import plan_beam
+from Service.placeFeature import PLACEMENT_FUNCTIONS, place_box_hybrid
+from Service.perfHandler import perf
+from Service.deadlineHandler import deadline, FALLBACK_ALGORITHM
+
+# ==============================
+#  Packing engine (ไม่ขึ้นกับ UI: ห้าม import tkinter / matplotlib / screeninfo ในโมดูลนี้)
+#  - pack / pack_file: แพ็ก order ทั้งชุด คืนผลลัพธ์ + แถวสำหรับ forexport.txt
+#  - CLI: python -m Service.packingEngine [forimport.csv] [--out forexport.txt]
+#  - call_placement: เรียกอัลกอริทึมวางกล่องตามชื่อ (ใช้ร่วมกับ PackingApp) ภายใต้ deadline ต่อกล่อง / ต่อ order
+#    หมดเวลาโดยยังไม่มีตำแหน่ง → FALLBACK_ALGORITHM (Service.deadlineHandler)
+#  - run_portfolio: แพ็ก order เดียวกันด้วยหลายอัลกอริทึมพร้อมกัน (ProcessPoolExecutor)
+#    worker ส่งกลับแค่ tuple ตำแหน่ง แล้ว UI ค่อย replay เฉพาะแผนที่ชนะด้วย apply_step
+#  - pack_multi: order ใหญ่เกิน 1 คัน → ล้นไป Truck #2, #3, ... (แพ็กแต่ละคันพร้อมกันใน process แยก)
+#  - perf (Service.perfHandler) นับงานเฉพาะที่ทำใน process นี้ (งานใน worker ของ portfolio / pack_multi ไม่ถูกรวม)
+# ==============================
+config = configparser.ConfigParser()
+config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config.ini")
+config.read(config_path, encoding="utf-8")
+
+PLACEMENT_ALGORITHM = config.get("PlaceMent", "ALGORITHM", fallback="hybrid2").strip().lower()
+PORTFOLIO_ENABLED = config.getboolean("PlaceMent", "PORTFOLIO", fallback=False)
+PORTFOLIO_ALGORITHMS = [
+    a.strip().lower()
+    for a in config.get("PlaceMent", "PORTFOLIO_ALGORITHMS", fallback="hybrid2, hybrid3, hybrid, human, basic, layer, ems").split(",")
+    if a.strip()
+]
+PORTFOLIO_TIME_BUDGET = config.getfloat("PlaceMent", "PORTFOLIO_TIME_BUDGET", fallback=60.0)  # วินาที
+PORTFOLIO_WORKERS = config.getint("PlaceMent", "PORTFOLIO_WORKERS", fallback=0)  # 0 = ตามจำนวน CPU
+MULTI_CONTAINER = config.getboolean("PlaceMent", "MULTI_CONTAINER", fallback=False)
+MAX_CONTAINERS = config.getint("PlaceMent", "MAX_CONTAINERS", fallback=3)
+SPILL_ASSIGN_ALGORITHM = config.get("PlaceMent", "SPILL_ASSIGN_ALGORITHM", fallback="ems").strip().lower()
+SPILL_WORKERS = config.getint("PlaceMent", "SPILL_WORKERS", fallback=0)  # 0 = ตามจำนวน CPU
+
+CONTAINER_TYPE_NAMES = {"1": "F15", "2": "F5", "3": "Pallet"}
+GAP_START_X = int(config.get("Container", "GapStartX", fallback=5))
+GAP_END_X = int(config.get("Container", "GapEndX", fallback=5))
+GAP_START_Y = int(config.get("Container", "GapStartY", fallback=5))
+GAP_END_Y = int(config.get("Container", "GapEndY", fallback=5))
+
+# step = (status, rotation, support, exceeds_end_z, message, placed, x, y, z, length, width)
+PlanStep = Tuple[str, int, float, bool, str, bool, float, float, float, int, int]
+
+
+# อัลกอริทึมที่วางแผนทั้ง order ในครั้งเดียว:
+#   planner(container, boxes, optional_check) -> (order, steps)
+#   order = index ของ boxes ตามลำดับที่วาง, steps[k] = PlanStep ของ boxes[order[k]]
+ORDER_PLANNERS = {
+    "layer": plan_layers,
+    "plan_layers": plan_layers,
+    "beam": plan_beam,
+    "plan_beam": plan_beam,
+}
+
+
+def _invoke(fn, container: Container, box: Box, optional_check: str):
+    try:
+        # ฟังก์ชันทั้งหมดรองรับพารามิเตอร์แบบเดียวกัน (container, box, optional_check)
+        return fn(container, box, optional_check=optional_check)
+    except TypeError:
+        # กันกรณีฟังก์ชันเก่าที่ไม่ได้รับ optional_check
+        return fn(container, box)
+
+
+def call_placement(algo_name: str, container: Container, box: Box, optional_check: str = "op2"):
+    fn = PLACEMENT_FUNCTIONS.get((algo_name or "").lower(), place_box_hybrid)
+    fallback = PLACEMENT_FUNCTIONS.get(FALLBACK_ALGORITHM)
+    if fallback is fn:
+        fallback = None
+    if fallback is not None and deadline.order_expired():
+        # order หมดเวลาแล้ว → ไม่เริ่ม engine หลัก
+        perf.deadline_hits += 1
+        return _fallback(fallback, container, box, optional_check, "order time budget")
+    deadline.begin_box()
+    try:
+        result = _invoke(fn, container, box, optional_check)
+    finally:
+        deadline.end_box()
+    if result.get("deadline"):
+        perf.deadline_hits += 1
+        if result["status"] == "Failed" and fallback is not None:
+            return _fallback(fallback, container, box, optional_check, "box time budget")
+    return result
+
+
+def _fallback(fn, container: Container, box: Box, optional_check: str, reason: str) -> Dict:
+    perf.deadline_fallbacks += 1
+    result = _invoke(fn, container, box, optional_check)
+    result["deadline"] = True
+    result["message"] = f"[Deadline] {reason} → {FALLBACK_ALGORITHM}" + (f": {result['message']}" if result.get("message") else "")
+    return result
+
+
+def is_order_planner(algo_name: str) -> bool:
+    return (algo_name or "").lower() in ORDER_PLANNERS
+
+
+def _new_container(container_dims: Tuple[int, int, int], pallet_dims: Tuple[int, int, int],
+                   container_type: str) -> Container:
+    p_width, p_length, p_height = pallet_dims
+    pallet = Pallet(width=p_width, length=p_length, height=p_height)
+    c_length, c_width, c_height = container_dims
+    return Container(c_length, c_width, c_height, "blue", pallet, ContainerType=container_type)
+
+
+def pack_order(algo_name: str, boxes: List[Box], container_dims: Tuple[int, int, int],
+               pallet_dims: Tuple[int, int, int], container_type: str, optional_check: str = "op2",
+               order_until: Optional[float] = None) -> Dict:
+    """
+    แพ็ก boxes (เรียงตาม priority แล้ว) ลง container ใหม่ด้วยอัลกอริทึมเดียว
+    container_dims = (length, width, height), pallet_dims = (width, length, height)
+    order_until = เวลาสิ้นสุดของ order (deadline.order_until ของ process แม่) → worker ใช้ deadline เดียวกัน
+    คืน dict: algorithm, order (ลำดับการวางเป็น index ของ boxes), steps (PlanStep ตามลำดับ order),
+              placed_count, utilization (% ของปริมาตรใช้งาน), elapsed,
+              timed_out (ชน deadline / งบเวลาของ planner → ผลขึ้นกับเวลา ไม่ควร cache)
+    """
+    start = time.perf_counter()
+    timeouts_before = timeouts()
+    if order_until is not None:
+        deadline.start(order_until)
+    container = _new_container(container_dims, pallet_dims, container_type)
+
+    # ทำงานกับสำเนา: กล่องของผู้เรียกคงขนาด/ตำแหน่งเดิมไว้ให้ apply_step replay
+    boxes = [copy.copy(box) for box in boxes]
+    planner = ORDER_PLANNERS.get((algo_name or "").lower())
+    if planner is not None:
+        order, steps = planner(container, boxes, optional_check)
+    else:
+        order, steps = list(range(len(boxes))), []
+        for box in boxes:
+            before = len(container.boxes)
+            perf.begin_box()
+            result = call_placement(algo_name, container, box, optional_check=optional_check)
+            perf.end_box(box.sku, result["status"])
+            steps.append(plan_step(result, box, len(container.boxes) > before))
+    placed_count = 0
+    placed_volume = 0
+    for i, step in zip(order, steps):
+        if step[0] == "Confirmed":
+            placed_count += 1
+            placed_volume += step[9] * step[10] * boxes[i].height
+
+    usable_volume = container.container_dx * container.container_dy * container.height
+    utilization = (placed_volume / usable_volume) * 100 if usable_volume > 0 else 0.0
+    return {
+        "algorithm": algo_name,
+        "order": list(order),
+        "steps": list(steps),
+        "placed_count": placed_count,
+        "utilization": utilization,
+        "elapsed": time.perf_counter() - start,
+        "timed_out": timeouts() > timeouts_before,
+    }
+
+
+def timeouts() -> int:
+    """จำนวนครั้งที่ชน deadline / งบเวลาของ planner ใน process นี้ (ต่างจากก่อนแพ็ก = ผลขึ้นกับเวลา)"""
+    return perf.deadline_hits + perf.time_budget_hits
+
+
+def plan_step(result: Dict, box: Box, placed: bool) -> PlanStep:
+    """ผลของกล่อง 1 ใบหลังวาง (placed = ลง container จริง) ในรูปที่ apply_step replay ได้"""
+    return (
+        result["status"], result["rotation"], float(result.get("support", 0.0)),
+        bool(result.get("exceeds_end_z", False)), result.get("message", ""), placed,
+        box.x, box.y, box.z, box.length, box.width,
+    )
+
+
+def apply_step(container: Container, box: Box, step: PlanStep) -> Dict:
+    """replay ผลของกล่อง 1 ใบจากแผนที่ worker คำนวณไว้ คืน result dict แบบเดียวกับฟังก์ชันวางกล่อง"""
+    status, rotation, support, exceeds_end_z, message, placed, x, y, z, length, width = step
+    box.length, box.width = length, width
+    box.set_position(x, y, z)
+    if placed:
+        container.place_box(box)
+    return {
+        "status": status,
+        "rotation": rotation,
+        "support": support,
+        "exceeds_end_z": exceeds_end_z,
+        "message": message,
+    }
+
+
+def _portfolio_worker(results, rank: int, args: tuple):
+    """process ลูกของ run_portfolio: แพ็กแล้วส่ง (rank, แผน, error) กลับทาง queue"""
+    try:
+        results.put((rank, pack_order(*args), None))
+    except Exception as e:
+        results.put((rank, None, str(e)))
+
+
+def run_portfolio(boxes: List[Box], container_dims: Tuple[int, int, int], pallet_dims: Tuple[int, int, int],
+                  container_type: str, algorithms: Optional[List[str]] = None, optional_check: str = "op2",
+                  time_budget: Optional[float] = None, max_workers: Optional[int] = None) -> Optional[Dict]:
+    """
+    แพ็ก order เดียวกันด้วยหลายอัลกอริทึมพร้อมกันใน process แยก แล้วเลือกแผนที่ดีที่สุด
+    - ผู้ชนะ: วางได้มากสุด → utilization สูงสุด → ลำดับใน algorithms (ตัวแรกชนะเมื่อเสมอ)
+    - รอไม่เกิน time_budget วินาที; worker ที่ยังไม่เสร็จจะถูก terminate (ไม่ปล่อยให้กิน CPU ต่อ)
+    คืน dict ของผู้ชนะ (ดู pack_order) + "cut_off" = อัลกอริทึมที่ถูกตัดเพราะหมดเวลา
+    หรือ None ถ้าไม่มี worker ไหนเสร็จทันเวลา
+    """
+    algorithms = algorithms or PORTFOLIO_ALGORITHMS
+    time_budget = PORTFOLIO_TIME_BUDGET if time_budget is None else time_budget
+    max_workers = max_workers or PORTFOLIO_WORKERS or min(len(algorithms), os.cpu_count() or 1)
+
+    # ใช้ Process เองแทน pool: รู้ว่า process ไหนรันอัลกอริทึมไหน → terminate เฉพาะตัวที่ค้างได้ตรง ๆ
+    start = time.perf_counter()
+    results = multiprocessing.Queue()
+    pending = list(range(len(algorithms)))
+    running: Dict[int, multiprocessing.Process] = {}
+    plans: Dict[int, Dict] = {}
+    try:
+        while pending or running:
+            while pending and len(running) < max_workers:
+                rank = pending.pop(0)
+                args = (algorithms[rank], boxes, container_dims, pallet_dims, container_type, optional_check,
+                        deadline.order_until)
+                running[rank] = multiprocessing.Process(target=_portfolio_worker, args=(results, rank, args),
+                                                        daemon=True)
+                running[rank].start()
+            remaining = start + time_budget - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                rank, plan, error = results.get(timeout=min(remaining, 0.5))
+            except queue.Empty:
+                # worker ที่ตายโดยไม่ส่งผล (เช่น ถูก kill) → นับเป็นล้ม ไม่ต้องรอจนหมดเวลา
+                for dead in [r for r, process in running.items() if process.exitcode not in (None, 0)]:
+                    logging.error(f"[Portfolio] ❌ {algorithms[dead]} exited with code {running.pop(dead).exitcode}")
+                continue
+            process = running.pop(rank, None)
+            if process is not None:
+                process.join()
+            if error is not None:
+                logging.error(f"[Portfolio] ❌ {algorithms[rank]} failed: {error}")
+                continue
+            logging.info(f"[Portfolio] {plan['algorithm']}: placed={plan['placed_count']} "
+                         f"utilization={plan['utilization']:.2f}% in {plan['elapsed']:.2f}s")
+            plans[rank] = plan
+    finally:
+        # worker ที่ยังวางอยู่ (หมดเวลา / ถูกขัดจังหวะ) → terminate process ของเราเอง
+        for process in running.values():
+            process.terminate()
+        for process in running.values():
+            process.join(timeout=1.0)
+
+    cut_off = sorted(list(running) + pending)
+    for rank in cut_off:
+        logging.warning(f"[Portfolio] ⏱ {algorithms[rank]} did not finish within {time_budget:.1f}s")
+    if not plans:
+        return None
+    winner = min(plans, key=lambda r: (-plans[r]["placed_count"], -plans[r]["utilization"], r))
+    best = plans[winner]
+    best["cut_off"] = [algorithms[rank] for rank in cut_off]
+    logging.info(f"[Portfolio] 🏆 Winner: {best['algorithm']} ({time.perf_counter() - start:.2f}s total)")
+    return best
+
+
+def container_utilization(container: Container) -> float:
+    """เปอร์เซ็นต์ปริมาตรกล่องที่วางแล้วเทียบกับพื้นที่ใช้งานของ container (utilization ต่อคันของ pack_multi / UI)"""
+    usable_volume = container.container_dx * container.container_dy * container.height
+    placed_volume = sum(box.length * box.width * box.height for box in container.boxes)
+    return (placed_volume / usable_volume) * 100 if usable_volume > 0 else 0.0
+
+
+def _pack_trucks(algo_name: str, groups: List[List[Box]], container_dims: Tuple[int, int, int],
+                 pallet_dims: Tuple[int, int, int], container_type: str, optional_check: str,
+                 max_workers: Optional[int] = None) -> List[Dict]:
+    """pack_order ของแต่ละคันพร้อมกันใน process แยก (worker ล้ม → แพ็กคันนั้นใน process นี้แทน)"""
+    if not groups:
+        return []
+    max_workers = min(len(groups), max_workers or SPILL_WORKERS or os.cpu_count() or 1)
+    plans: List[Optional[Dict]] = [None] * len(groups)
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(pack_order, algo_name, group, container_dims, pallet_dims, container_type,
+                                optional_check, deadline.order_until): t
+                for t, group in enumerate(groups)
+            }
+            for future, t in futures.items():
+                try:
+                    plans[t] = future.result()
+                except Exception as e:
+                    logging.error(f"[Spill] ❌ Truck #{t + 1} worker failed: {e}")
+    for t, group in enumerate(groups):
+        if plans[t] is None:
+            plans[t] = pack_order(algo_name, group, container_dims, pallet_dims, container_type, optional_check)
+    return plans
+
+
+def pack_multi(boxes: List[Box], container_dims: Tuple[int, int, int], pallet_dims: Tuple[int, int, int],
+               container_type: str, algorithm: Optional[str] = None, optional_check: str = "op2",
+               max_containers: Optional[int] = None, assign_algorithm: Optional[str] = None,
+               max_workers: Optional[int] = None) -> Dict:
+    """
+    แพ็ก boxes (เรียงตาม priority แล้ว) ลง container ขนาดเดียวกันหลายคัน: กล่องที่คันก่อนรับไม่ได้ล้นไปคันถัดไป
+    1) แบ่งกล่องให้แต่ละคันด้วย assign_algorithm (เร็ว ค่าเริ่มต้น ems) ทีละคันตามลำดับ priority
+       คันสุดท้าย (ครบ max_containers) รับกล่องที่เหลือทั้งหมด
+    2) แพ็กทุกคันด้วย algorithm พร้อมกันใน process แยก (แบ่งกล่องเสร็จแล้ว แต่ละคันไม่ขึ้นต่อกัน)
+    3) กล่องที่ algorithm วางไม่ลงในคันของตัวเอง → ลองคันถัด ๆ ไป แล้วเปิดคันใหม่ถ้ายังไม่ครบ max_containers
+       วางไม่ลงเลย = NG (Failed) ต่อท้ายคันสุดท้าย
+    คืนแผนแบบเดียวกับ pack_order: order / steps เรียงต่อกันทีละคัน + trucks = จำนวน step ของแต่ละคัน,
+    utilization = เฉลี่ยต่อคัน, truck_utilization = ต่อคัน, timed_out = คันใดคันหนึ่งชน deadline
+    """
+    start = time.perf_counter()
+    timeouts_before = timeouts()
+    algorithm = (algorithm or PLACEMENT_ALGORITHM).lower()
+    assign_algorithm = (assign_algorithm or SPILL_ASSIGN_ALGORITHM).lower()
+    max_containers = max(1, max_containers or MAX_CONTAINERS)
+
+    # 1) แบ่งกล่อง: คันละชุดที่ assign_algorithm วางลงได้
+    # assign_algorithm = algorithm → ผลตอนแบ่งคือแผนจริงของคันนั้นแล้ว (ตัด step ที่วางไม่ลงออก) ไม่ต้องแพ็กซ้ำ
+    groups: List[List[int]] = []
+    plans: List[Optional[Dict]] = []
+    remaining = list(range(len(boxes)))
+    while remaining and len(groups) < max_containers:
+        if len(groups) == max_containers - 1:
+            groups.append(remaining)
+            plans.append(None)
+            remaining = []
+            break
+        trial = pack_order(assign_algorithm, [boxes[i] for i in remaining], container_dims, pallet_dims,
+                           container_type, optional_check)
+        taken = sorted(k for k, step in zip(trial["order"], trial["steps"]) if step[5])
+        if not taken:
+            break  # คันว่างก็รับไม่ได้ → ให้ขั้นที่ 3 ลองอีกครั้งด้วย algorithm จริง
+        position = {k: n for n, k in enumerate(taken)}
+        groups.append([remaining[k] for k in taken])
+        plans.append({
+            "order": [position[k] for k, step in zip(trial["order"], trial["steps"]) if step[5]],
+            "steps": [step for step in trial["steps"] if step[5]],
+        } if assign_algorithm == algorithm else None)
+        remaining = [i for k, i in enumerate(remaining) if k not in position]
+    if not groups:
+        groups, plans, remaining = [remaining], [None], []
+    logging.info(f"[Spill] 🚚 Assigned {len(boxes)} boxes to {len(groups)} trucks with {assign_algorithm} "
+                 f"({[len(group) for group in groups]}) in {time.perf_counter() - start:.2f}s")
+
+    # 2) แพ็กทุกคันที่ยังไม่มีแผนพร้อมกัน
+    pending = [t for t, plan in enumerate(plans) if plan is None]
+    packed = _pack_trucks(algorithm, [[boxes[i] for i in groups[t]] for t in pending], container_dims,
+                          pallet_dims, container_type, optional_check, max_workers)
+    for t, plan in zip(pending, packed):
+        plans[t] = plan
+
+    # 3) replay แต่ละคัน (เฉพาะกล่องที่ลง) แล้วไล่กล่องที่ล้นตามลำดับ priority
+    trucks = []  # [(container, box index, steps)]
+    spilled = [(i, -1, None) for i in remaining]  # (box index, คันต้นทาง, step ล่าสุด)
+    for t, (group, plan) in enumerate(zip(groups, plans)):
+        container = _new_container(container_dims, pallet_dims, container_type)
+        ids, steps = [], []
+        for k, step in zip(plan["order"], plan["steps"]):
+            if step[5]:
+                apply_step(container, copy.copy(boxes[group[k]]), step)
+                ids.append(group[k])
+                steps.append(step)
+            else:
+                spilled.append((group[k], t, step))
+        trucks.append((container, ids, steps))
+
+    spill_algorithm = assign_algorithm if is_order_planner(algorithm) else algorithm
+    ng = []
+    for i, origin, step in sorted(spilled, key=lambda item: item[0]):
+        placed = False
+        for t in range(origin + 1, max_containers):
+            opened = t == len(trucks)
+            if opened:
+                trucks.append((_new_container(container_dims, pallet_dims, container_type), [], []))
+            container, ids, steps = trucks[t]
+            box = copy.copy(boxes[i])
+            before = len(container.boxes)
+            perf.begin_box()
+            result = call_placement(spill_algorithm, container, box, optional_check=optional_check)
+            perf.end_box(box.sku, result["status"])
+            step = plan_step(result, box, len(container.boxes) > before)
+            if step[5]:
+                ids.append(i)
+                steps.append(step)
+                placed = True
+                break
+            if opened:
+                trucks.pop()  # คันว่างก็วางไม่ลง → ไม่ต้องเปิดคันใหม่
+                break
+        if not placed:
+            ng.append((i, step))
+    for i, step in ng:
+        trucks[-1][1].append(i)
+        trucks[-1][2].append(step)
+
+    order, steps, sizes, truck_utilization = [], [], [], []
+    placed_count = 0
+    for container, ids, truck_steps in trucks:
+        order.extend(ids)
+        steps.extend(truck_steps)
+        sizes.append(len(ids))
+        placed_count += sum(1 for step in truck_steps if step[0] == "Confirmed")
+        truck_utilization.append(container_utilization(container))
+    elapsed = time.perf_counter() - start
+    logging.info(f"[Spill] 🚚 {len(trucks)} trucks: placed={placed_count}/{len(boxes)} NG={len(ng)} in {elapsed:.2f}s")
+    return {
+        "algorithm": algorithm,
+        "order": order,
+        "steps": steps,
+        "trucks": sizes,
+        "placed_count": placed_count,
+        "utilization": sum(truck_utilization) / len(truck_utilization),
+        "truck_utilization": truck_utilization,
+        "elapsed": elapsed,
+        "timed_out": timeouts() > timeouts_before or any(plan["timed_out"] for plan in packed),
+    }
+
+
+def pallet_dims_for(container_type: str) -> Tuple[int, int, int]:
+    """ขนาดพาเลท (width, length, height) จาก [Pallet] ตามประเภท container (1=F15, 2=F5, 3=Pallet)"""
+    type_name = CONTAINER_TYPE_NAMES.get(str(container_type))
+    if type_name is None:
+        raise ValueError(f"Unknown container type: {container_type}")
+    return (
+        int(config.get("Pallet", f"{type_name}_Width")),
+        int(config.get("Pallet", f"{type_name}_Length")),
+        int(config.get("Pallet", f"{type_name}_Height")),
+    )
+
+
+def box_utilization(box: Box, container: Container) -> float:
+    """เปอร์เซ็นต์ปริมาตรของกล่องเทียบกับพื้นที่ใช้งานของ container (สูตรเดียวกับ PackingApp)"""
+    box_volume = box.length * box.width * box.height
+    available_width = container.width - (GAP_START_X + GAP_END_X)
+    available_length = container.length - (GAP_START_Y + GAP_END_Y)
+    container_volume = available_length * available_width * container.height
+    return (box_volume / container_volume) * 100 if container_volume > 0 else 0.0
+
+
+def placement_row(box: Box, result: Dict, original_width, original_length, form_conveyor, box_wgt, percent_cube) -> list:
+    """แถวผลลัพธ์ต่อกล่อง (ตาม orderHandler.EXPORT_COLUMNS)"""
+    out = 2 if result["exceeds_end_z"] else (1 if result["status"] == "Confirmed" else 2)
+    if result["status"] == "Confirmed":
+        x, y, z = round(box.x, 2), round(box.y, 2), round(box.z, 2)
+    else:
+        x = y = z = ""
+    return [
+        box.sku,
+        y,
+        x,
+        z,
+        str(result["rotation"]),
+        percent_cube,
+        round(box_wgt, 2),
+        str(original_width),
+        str(original_length),
+        str(box.height),
+        str(box.priority),
+        str(form_conveyor),
+        str(out),
+    ]
+
+
+def pack(boxes: List[Box], container_spec: ContainerSpec, algorithm: Optional[str] = None,
+         optional_check: str = "op2", portfolio: Optional[bool] = None,
+         multi_container: Optional[bool] = None) -> Dict:
+    """
+    แพ็ก order ทั้งชุด (เหมือน PackingApp.run_packing_op2 แต่ไม่มี UI)
+    container_spec = (container_type, width, length, height) ตามที่อ่านจาก forimport.csv
+    multi_container = True → กล่องที่ล้นไปลงคันถัดไป (ดู pack_multi)
+    คืน dict: container (คันแรก), containers, algorithm, results,
+              rows (แต่ละคันมีแถว "Truck #N" นำหน้า), placed_count, failed,
+              utilization (คันเดียว = ผลรวม % Cube, หลายคัน = เฉลี่ย truck_utilization),
+              truck_utilization (container_utilization ต่อคัน เหมือน pack_multi / UI), elapsed,
+              perf (ตัวนับประสิทธิภาพของรอบนี้ ดู Service.perfHandler)
+    """
+    start = time.perf_counter()
+    perf.reset()
+    deadline.start()
+    container_type, container_width, container_length, container_height = container_spec
+    if container_length <= 0 or container_width <= 0 or container_height <= 0:
+        raise ValueError("Container dimensions must be positive numbers and greater than 0.")
+    algorithm = (algorithm or PLACEMENT_ALGORITHM).lower()
+    portfolio = PORTFOLIO_ENABLED if portfolio is None else portfolio
+    multi_container = MULTI_CONTAINER if multi_container is None else multi_container
+
+    boxes = sorted(boxes, key=lambda box: box.priority)
+    pallet_dims = pallet_dims_for(container_type)
+    container_dims = (container_length, container_width, container_height)
+
+    plan = None
+    if multi_container:
+        if portfolio:
+            logging.info("[Spill] Portfolio is not used in multi-container mode")
+        plan = pack_multi(boxes, container_dims, pallet_dims, container_type, algorithm, optional_check)
+    if plan is None and portfolio:
+        plan = run_portfolio(boxes, container_dims, pallet_dims, container_type, optional_check=optional_check)
+        if plan is not None:
+            algorithm = plan["algorithm"]
+    if plan is None and is_order_planner(algorithm):
+        plan = pack_order(algorithm, boxes, container_dims, pallet_dims, container_type, optional_check)
+
+    if plan is not None:
+        boxes = [boxes[i] for i in plan["order"]]  # ลำดับการวางตามแผน (beam อาจสลับกล่อง priority ใกล้กัน, layer วางทีละชั้น)
+    truck_sizes = plan.get("trucks", [len(boxes)]) if plan is not None else [len(boxes)]
+    containers = []
+    truck_utilization = []
+    results = []
+    rows = []
+    failed = []
+    placed_count = 0
+    cube_total = 0.0
+    i = 0
+    for truck_no, size in enumerate(truck_sizes, start=1):
+        container = _new_container(container_dims, pallet_dims, container_type)
+        containers.append(container)
+        rows.append([f"Truck #{truck_no}", "", "", "", "", "", "", "", "", "", "", "", ""])
+        for box in boxes[i:i + size]:
+            form_conveyor, box_wgt = box.cv, box.wgt
+            original_width, original_length = box.width, box.length
+            if plan is not None:
+                result = apply_step(container, box, plan["steps"][i])
+            else:
+                perf.begin_box()
+                result = call_placement(algorithm, container, box, optional_check=optional_check)
+                perf.end_box(box.sku, result["status"])
+            percent_cube = 0
+            if result["status"] == "Confirmed":
+                placed_count += 1
+                percent_cube = round(box_utilization(box, container), 2)
+                cube_total += percent_cube
+            elif result["status"] == "Failed":
+                failed.append([box.sku, result["message"]])
+            results.append(result)
+            rows.append(placement_row(box, result, original_width, original_length, form_conveyor, box_wgt,
+                                      percent_cube))
+            i += 1
+        truck_utilization.append(round(container_utilization(container), 2))
+
+    return {
+        "container": containers[0],
+        "containers": containers,
+        "algorithm": algorithm,
+        "results": results,
+        "rows": rows,
+        "placed_count": placed_count,
+        "failed": failed,
+        "utilization": (round(cube_total, 2) if len(containers) == 1
+                        else round(sum(truck_utilization) / len(truck_utilization), 2)),
+        "truck_utilization": truck_utilization,
+        "elapsed": time.perf_counter() - start,
+        "perf": perf.report(algorithm),
+    }
+
+
+def pack_file(path: str, **kwargs) -> Dict:
+    """อ่าน forimport.csv แล้วแพ็ก (kwargs ส่งต่อให้ pack)"""
+    container_spec, boxes = read_order_file(path)
+    return pack(boxes, container_spec, **kwargs)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    data_path = config.get("Paths", "data_path", fallback="Data")
+    parser = argparse.ArgumentParser(prog="python -m Service.packingEngine",
+                                     description="Pack an order file without the UI and write forexport.txt")
+    parser.add_argument("order", nargs="?", default=os.path.join(data_path, "forimport.csv"),
+                        help="order CSV (default: [Paths] data_path/forimport.csv)")
+    parser.add_argument("--out", default=None, help="export file (default: forexport.txt next to the order file)")
+    parser.add_argument("--algorithm", default=None, help=f"placement algorithm (default: {PLACEMENT_ALGORITHM})")
+    parser.add_argument("--portfolio", action="store_true", default=None, help="run the placement portfolio")
+    parser.add_argument("--multi-container", action="store_true", default=None,
+                        help=f"spill boxes that do not fit into more trucks (up to {MAX_CONTAINERS})")
+    args = parser.parse_args(argv)
+
+    try:
+        packed = pack_file(args.order, algorithm=args.algorithm, portfolio=args.portfolio,
+                           multi_container=args.multi_container)
+    except (OrderFileError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    out_path = args.out or os.path.join(os.path.dirname(os.path.abspath(args.order)), "forexport.txt")
+    row_count = write_export_file(out_path, packed["rows"])
+    perf_path = perf.write_sidecar(out_path, packed["algorithm"])
+    print(f"{packed['algorithm']}: placed {packed['placed_count']}/{len(packed['results'])} "
+          f"utilization={packed['utilization']:.2f}% in {packed['elapsed']:.3f}s -> {out_path} ({row_count} rows)")
+    if packed["perf"]["totals"]["deadline_hits"]:
+        totals = packed["perf"]["totals"]
+        print(f"deadline: {totals['deadline_hits']} boxes hit the time budget "
+              f"({totals['deadline_fallbacks']} placed by {FALLBACK_ALGORITHM})")
+    if len(packed["containers"]) > 1:
+        print("trucks: " + ", ".join(f"#{n} {u:.2f}%" for n, u in enumerate(packed["truck_utilization"], start=1)))
+    if perf_path:
+        print(f"perf report -> {perf_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import configparser
+from typing import Dict, List, Optional
+
+# ==============================
+#  ตัวนับประสิทธิภาพของการวางกล่อง (ต่อกล่อง / ต่อรอบการวาง)
+#  - ตัวนับเป็น int บน object เดียวระดับ module → hot loop แค่ `perf.xxx += 1` (ไม่มี dict lookup / I/O)
+#  - เวลาแยกตาม phase เก็บเป็นผลรวมต่อรอบ (จับเวลาเป็นช่วงใหญ่ ไม่จับในลูปผู้สมัคร)
+#  - begin_box / end_box เก็บส่วนต่างของตัวนับเป็นสถิติรายกล่อง
+#  - [Perf] SIDECAR = True → เขียน <ชื่อไฟล์ export>.perf.json คู่กับ forexport.txt
+# ==============================
+config = configparser.ConfigParser()
+config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config.ini")
+config.read(config_path, encoding="utf-8")
+
+PERF_SIDECAR = config.getboolean("Perf", "SIDECAR", fallback=True)
+PERF_SLOWEST_BOXES = config.getint("Perf", "SLOWEST_BOXES", fallback=10)
+
+COUNTERS = (
+    "candidates_generated",  # ผู้สมัครที่ Container สร้างให้ engine
+    "bounds_pruned",         # ผู้สมัครที่ตกเพราะนอกกรอบ (ก่อนเช็กชน)
+    "candidates_skipped",    # ผู้สมัครที่ไม่ต้องประเมินเพราะแพ้ผู้ชนะปัจจุบันแน่นอน (early termination)
+    "can_place_calls",       # จำนวนครั้งที่เรียก Container.can_place
+    "memo_hits",             # can_place / known_infeasible ที่ตอบจาก InfeasibilityMemo
+    "collision_pairs",       # คู่กล่องที่เทียบชนจริง (collides_with)
+    "support_scans",         # การคำนวณพื้นที่รองรับ
+    "roof_checks",           # การเช็กหลังคา (roof_is_clear)
+    "snap_iterations",       # รอบของ SNAP / compact
+    "hint_hits",             # กล่องที่วางจาก placement hint ได้เลย (ไม่ต้องค้นหาเต็ม)
+    "deadline_hits",         # กล่องที่ engine หมดเวลา (Service.deadlineHandler) → ใช้ผลที่ดีที่สุดที่เจอ / fallback
+    "deadline_fallbacks",    # กล่องที่วางด้วย FALLBACK_ALGORITHM เพราะหมดเวลา
+    "time_budget_hits",      # planner ทั้ง order ที่หมดงบเวลาของตัวเอง (เช่น BEAM_TIME_BUDGET) → เติมที่เหลือแบบ greedy
+)
+
+
+class PerfCounters:
+    __slots__ = COUNTERS + ("phase_times", "boxes", "run_start", "_box_start", "_box_base", "_box_phases")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """เริ่มรอบการวางใหม่ (ล้างตัวนับ เวลา และสถิติรายกล่อง)"""
+        for name in COUNTERS:
+            setattr(self, name, 0)
+        self.phase_times: Dict[str, float] = {}
+        self.boxes: List[Dict] = []
+        self.run_start = time.perf_counter()
+        self._box_start = None
+        self._box_base = None
+        self._box_phases = None
+
+    def totals(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in COUNTERS}
+
+    def add_time(self, phase: str, seconds: float):
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + seconds
+
+    def begin_box(self):
+        self._box_base = [getattr(self, name) for name in COUNTERS]
+        self._box_phases = dict(self.phase_times)
+        self._box_start = time.perf_counter()
+
+    def end_box(self, sku: str, status: str):
+        if self._box_start is None:
+            return
+        elapsed = time.perf_counter() - self._box_start
+        row = {"sku": str(sku), "status": status, "elapsed_ms": round(elapsed * 1000, 3)}
+        for name, base in zip(COUNTERS, self._box_base):
+            row[name] = getattr(self, name) - base
+        row["phase_ms"] = {
+            phase: round((seconds - self._box_phases.get(phase, 0.0)) * 1000, 3)
+            for phase, seconds in self.phase_times.items()
+            if seconds != self._box_phases.get(phase, 0.0)
+        }
+        self.boxes.append(row)
+        self._box_start = None
+
+    def report(self, algorithm: Optional[str] = None) -> Dict:
+        """สรุปทั้งรอบ (dict พร้อม dump เป็น JSON)"""
+        wall = time.perf_counter() - self.run_start
+        return {
+            "algorithm": algorithm,
+            "boxes": len(self.boxes),
+            "placed": sum(1 for row in self.boxes if row["status"] == "Confirmed"),
+            "wall_time_s": round(wall, 4),
+            "totals": self.totals(),
+            "phase_time_s": {phase: round(seconds, 4) for phase, seconds in self.phase_times.items()},
+            "slowest_boxes": sorted(self.boxes, key=lambda row: -row["elapsed_ms"])[:PERF_SLOWEST_BOXES],
+            "per_box": self.boxes,
+        }
+
+    def summary_text(self) -> str:
+        """ข้อความสั้นสำหรับ Summary panel"""
+        n = len(self.boxes)
+        if n:
+            box_ms = sum(row["elapsed_ms"] for row in self.boxes)
+            slowest = max(self.boxes, key=lambda row: row["elapsed_ms"])
+            head = (f"Perf: {box_ms / 1000:.2f}s for {n} boxes (avg {box_ms / n:.1f} ms/box, "
+                    f"slowest {slowest['sku']} {slowest['elapsed_ms']:.0f} ms)")
+        else:
+            # วางทั้ง order ด้วย planner (layer / beam) → ไม่มีสถิติรายกล่อง มีแต่ผลรวม
+            head = f"Perf: {time.perf_counter() - self.run_start:.2f}s (whole-order plan)"
+        lines = [
+            head,
+            f"  can_place={self.can_place_calls:,} candidates={self.candidates_generated:,} "
+            f"bounds_pruned={self.bounds_pruned:,} skipped={self.candidates_skipped:,} memo_hits={self.memo_hits:,}",
+            f"  collision_pairs={self.collision_pairs:,} support_scans={self.support_scans:,} "
+            f"roof_checks={self.roof_checks:,} snap_iter={self.snap_iterations:,} hint_hits={self.hint_hits:,}",
+        ]
+        return "\n".join(lines)
+
+    def write_sidecar(self, export_path: str, algorithm: Optional[str] = None) -> Optional[str]:
+        """เขียน report คู่กับไฟล์ export (ปิดได้ด้วย [Perf] SIDECAR = False) คืน path ที่เขียน"""
+        if not PERF_SIDECAR:
+            return None
+        path = sidecar_path(export_path)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(algorithm), f, indent=2, ensure_ascii=False)
+        return path
+
+
+def sidecar_path(export_path: str) -> str:
+    """forexport.txt → forexport.perf.json"""
+    base, _ = os.path.splitext(export_path)
+    return base + ".perf.json"
+
+
+perf = PerfCounters()
@@ -1,61 +1,51 @@
 import configparser
 import os
-from typing import List, Tuple
+import time
+from typing import Dict, List, Tuple
+import numpy as np
 from Models.Box import Box
 from Models.Container import Container
-from Service.shared_state import last_success_positions
+from Service.traceHandler import TRACE_DEBUG, TRACE_INFO, sampled, trace
+from Service.perfHandler import perf
+from Service.deadlineHandler import deadline
+from Service.emsFeature import place_box_ems
+from Service.heightmapFeature import place_box_heightmap
 
 config = configparser.ConfigParser()
 config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config.ini")
 config.read(config_path, encoding="utf-8")
 prefer_rotation_first = config.getboolean("PlaceMent", "PREFER_ROTATION_FIRST", fallback=True)
 min_support_ratio = float(config.get("Container", "required_support_ratio", fallback="0.8"))
+hybrid2_batch = config.getboolean("PlaceMent", "HYBRID2_BATCH", fallback=True)
+hint_warm_start = config.getboolean("PlaceMent", "HINT_WARM_START", fallback=False)
+HINT_TRIES = 2  # จำนวนกล่องขนาดเดียวกันล่าสุดที่ลองวางข้าง ๆ ก่อนค้นหาเต็ม
+HYBRID2_BATCH_BLOCK = 256  # จำนวนผู้สมัครขั้นต่ำต่อการคัดด้วย NumPy หนึ่งครั้ง (ขยายให้ครบระดับ Z)
 
-def has_vertical_clearance(box: Box, placed_boxes: List[Box], container_height: int) -> bool:
+def has_vertical_clearance(box: Box, container: Container, container_height: int) -> bool:
     """
     ตรวจสอบว่า:
     - ด้านบนของกล่องมีพื้นที่ว่าง 100%.
     - ด้านล่างของกล่องมีพื้นที่รองรับอย่างน้อย 75%.
     """
     # ตรวจสอบพื้นที่ด้านบน
-    box_top = box.z + box.height
-    for other in placed_boxes:
-        if (
-            other.z >= box_top and  # กล่องอื่นอยู่ด้านบน
-            not (
-                box.x + box.length <= other.x or
-                box.x >= other.x + other.length or
-                box.y + box.width <= other.y or
-                box.y >= other.y + other.width
-            )
-        ):
-            return False  # มีการบังด้านบน
+    if not container.roof_is_clear(box.x, box.y, box.x + box.length, box.y + box.width, box.z + box.height):
+        return False  # มีการบังด้านบน
 
     # ตรวจสอบพื้นที่ด้านล่าง
-    if not box.is_supported(placed_boxes, container_height):
+    if not container.is_supported(box, floor_z=container_height):
         return False  # พื้นที่ด้านล่างไม่เพียงพอ
 
     return True
 
 def place_box_in_container(container: Container, box: Box, optional_check: str = "op2"):
-    
-    def calculate_support_ratio(box: Box, placed_boxes: List[Box], pallet_height: int) -> float:
-        if box.z <= pallet_height:
-            return 1.0
-        support_area = 0
-        total_area = box.length * box.width
-        for b in placed_boxes:
-            if abs(b.z + b.height - box.z) < 1e-6:
-                overlap_x = max(0, min(box.x + box.length, b.x + b.length) - max(box.x, b.x))
-                overlap_y = max(0, min(box.y + box.width, b.y + b.width) - max(box.y, b.y))
-                support_area += overlap_x * overlap_y
-        return support_area / total_area if total_area > 0 else 0.0
 
+    # จุดที่อยู่ในเนื้อกล่องชนแน่นอน → ไม่ต้องลอง
     candidate_positions = sorted(
-        container.generate_candidate_positions(),
+        container.generate_candidate_positions(include_covered=False),
         key=lambda pos: pos[2]  # เรียงจาก Z ต่ำสุดขึ้นไป
     )
-    print(len(candidate_positions))
+    if TRACE_DEBUG:
+        trace(f"Candidate positions: {len(candidate_positions)}")
     best_position = None
     best_support = -1
     best_rotation = False
@@ -72,15 +62,16 @@ def place_box_in_container(container: Container, box: Box, optional_check: str =
             old_pos = (box.x, box.y, box.z)
             box.set_position(x, y, z)
             can_place, reason = container.can_place(box, x, y, z, optional_check)
-            
-            print(f"Can place: {can_place}, reason: {reason}")
+
+            if TRACE_DEBUG and sampled("basic.candidate"):
+                trace(f"Can place: {can_place}, reason: {reason}")
             if not can_place:
                 box.set_position(*old_pos)
                 box.length, box.width = original_length, original_width
                 continue
 
-            support_ratio = calculate_support_ratio(box, container.boxes, container.pallet_height)
-            clearance_ok = has_vertical_clearance(box, container.boxes, container.height)
+            support_ratio = container.support_ratio(box.x, box.y, box.z, box.length, box.width)
+            clearance_ok = has_vertical_clearance(box, container, container.height)
             
             if support_ratio >= min_support_ratio and clearance_ok:
                 if best_position is None or (support_ratio >= best_support and z < best_position[2]):
@@ -88,9 +79,9 @@ def place_box_in_container(container: Container, box: Box, optional_check: str =
                     best_support = support_ratio
                     best_rotation = rotation
                 box.length, box.width = original_length, original_width  # รีเซตหลังเทียบเสร็จ
-                print(f"Trying pos=({x},{y},{z}) rot={rotation} | support={support_ratio:.2f} | clearance={clearance_ok}")
-                if support_ratio >= min_support_ratio and clearance_ok:
-                    print(f"✅ Accepting this candidate (better or first)")
+                if TRACE_DEBUG and sampled("basic.accept"):
+                    trace(f"Trying pos=({x},{y},{z}) rot={rotation} | support={support_ratio:.2f} | clearance={clearance_ok}\n"
+                          f"✅ Accepting this candidate (better or first)")
     if best_position:
         x, y, z = best_position
         if best_rotation:
@@ -99,7 +90,8 @@ def place_box_in_container(container: Container, box: Box, optional_check: str =
         exceeds = box.z + box.height > container.end_z  # ตรวจสอบว่าล้นความสูงหรือไม่
         container.place_box(box)  # วางกล่องใน container
         height_note = " (⚠ exceeds container height)" if exceeds else ""
-        print(f"Chosen position: {best_position} | R: {best_rotation} | exceeds: {exceeds}")
+        if TRACE_INFO:
+            trace(f"Chosen position: {best_position} | R: {best_rotation} | exceeds: {exceeds}")
         if not exceeds:
             return {
                 "status": "Confirmed",
@@ -149,16 +141,7 @@ def place_box_in_container(container: Container, box: Box, optional_check: str =
 
 def place_box_human_like(container: Container, box: Box, optional_check: str = "op2"):
     def calculate_support_ratio(box: Box) -> float:
-        support_area = 0
-        total_area = box.length * box.width
-        if box.z <= container.pallet_height:
-            return 1.0
-        for b in container.boxes:
-            if abs(b.z + b.height - box.z) < 1e-6:
-                overlap_x = max(0, min(box.x + box.length, b.x + b.length) - max(box.x, b.x))
-                overlap_y = max(0, min(box.y + box.width, b.y + b.width) - max(box.y, b.y))
-                support_area += overlap_x * overlap_y
-        return support_area / total_area if total_area > 0 else 0.0
+        return container.support_ratio(box.x, box.y, box.z, box.length, box.width)
 
     def prioritize_nearby_positions(placed: Box) -> List[Tuple[int, int]]:
         candidates = set()
@@ -183,11 +166,11 @@ def place_box_human_like(container: Container, box: Box, optional_check: str = "
             box.set_position(x, y, container.pallet_height)
 
             can_place, reason = container.can_place(box, x, y, container.pallet_height, optional_check)
-            if can_place and has_vertical_clearance(box, container.boxes, container.height):
+            if can_place and has_vertical_clearance(box, container, container.height):
                 container.place_box(box)
                 support = calculate_support_ratio(box)
-                last_success_positions.append((x, y, container.pallet_height, rotation))
-                print(f"[HumanLike ✅] Placed FIRST {box.sku} at ({x},{y},{container.pallet_height}) R={rotation}")
+                if TRACE_INFO:
+                    trace(f"[HumanLike ✅] Placed FIRST {box.sku} at ({x},{y},{container.pallet_height}) R={rotation}")
                 return {
                     "status": "Confirmed",
                     "rotation": 0 if rotation else 1,
@@ -204,6 +187,15 @@ def place_box_human_like(container: Container, box: Box, optional_check: str = "
         if z + box.height > max_z:
             continue
         for placed in sorted(container.boxes, key=lambda b: (b.y, b.x)):
+            if deadline.expired():
+                return {
+                    "status": "Failed",
+                    "rotation": -1,
+                    "support": 0.0,
+                    "exceeds_end_z": False,
+                    "message": "Human-like deadline reached",
+                    "deadline": True,
+                }
             for x, y in prioritize_nearby_positions(placed):
                 for rotation in [True, False]:
                     if (x, y, z, rotation) in tried_positions:
@@ -221,10 +213,10 @@ def place_box_human_like(container: Container, box: Box, optional_check: str = "
                         continue
 
                     support = calculate_support_ratio(box)
-                    if support >= min_support_ratio and has_vertical_clearance(box, container.boxes, container.height):
+                    if support >= min_support_ratio and has_vertical_clearance(box, container, container.height):
                         container.place_box(box)
-                        last_success_positions.append((x, y, z, rotation))
-                        print(f"[HumanLike ✅] Placed {box.sku} at ({x},{y},{z}) R={rotation}")
+                        if TRACE_INFO:
+                            trace(f"[HumanLike ✅] Placed {box.sku} at ({x},{y},{z}) R={rotation}")
                         return {
                             "status": "Confirmed",
                             "rotation": 0 if rotation else 1,
@@ -234,7 +226,8 @@ def place_box_human_like(container: Container, box: Box, optional_check: str = "
                         }
                     box.length, box.width = original_length, original_width
 
-    print(f"[HumanLike ❌] No position found for {box.sku}")
+    if TRACE_INFO:
+        trace(f"[HumanLike ❌] No position found for {box.sku}")
     return {
         "status": "Failed",
         "rotation": -1,
@@ -245,38 +238,19 @@ def place_box_human_like(container: Container, box: Box, optional_check: str = "
     
 def place_box_hybrid(container: Container, box: Box, optional_check: str = "op2"):
     def calculate_support_ratio(box: Box) -> float:
-        if box.z <= container.pallet_height:
-            return 1.0
-        support_area = 0
-        total_area = box.length * box.width
-        for b in container.boxes:
-            if abs(b.z + b.height - box.z) < 1e-6:
-                overlap_x = max(0, min(box.x + box.length, b.x + b.length) - max(box.x, b.x))
-                overlap_y = max(0, min(box.y + box.width, b.y + b.width) - max(box.y, b.y))
-                support_area += overlap_x * overlap_y
-        return support_area / total_area if total_area > 0 else 0.0
-
-    def has_vertical_clearance(box: Box, placed_boxes: List[Box], container_height: int) -> bool:
-        box_top = box.z + box.height
-        for other in placed_boxes:
-            if (
-                other.z >= box_top and
-                not (
-                    box.x + box.length <= other.x or
-                    box.x >= other.x + other.length or
-                    box.y + box.width <= other.y or
-                    box.y >= other.y + other.width
-                )
-            ):
-                return False
-        if not box.is_supported(placed_boxes, container.pallet_height):
+        return container.support_ratio(box.x, box.y, box.z, box.length, box.width)
+
+    def has_vertical_clearance(box: Box, container: Container, container_height: int) -> bool:
+        if not container.roof_is_clear(box.x, box.y, box.x + box.length, box.y + box.width, box.z + box.height):
+            return False
+        if not container.is_supported(box):
             return False
         return True
 
     tried_positions = set()
     valid_placements = []
 
-    all_positions = container.generate_candidate_positions()
+    all_positions = container.generate_candidate_positions(include_covered=False)
     for b in container.boxes:
         for dx in [-box.length, b.length]:
             for dy in [-box.width, b.width]:
@@ -284,7 +258,11 @@ def place_box_hybrid(container: Container, box: Box, optional_check: str = "op2"
 
     candidate_positions = sorted(set(all_positions), key=lambda pos: (pos[2], pos[1], pos[0]))
 
+    timed_out = False
     for x, y, z in candidate_positions:
+        if deadline.expired():
+            timed_out = True  # หมดเวลา → เลือกจากตำแหน่งที่ผ่านแล้ว
+            break
         rotation_order = [True, False] if prefer_rotation_first else [False, True]
         for rotation in rotation_order:
             key = (x, y, z, rotation)
@@ -314,7 +292,7 @@ def place_box_hybrid(container: Container, box: Box, optional_check: str = "op2"
                 continue
 
             support_ratio = calculate_support_ratio(box)
-            clearance_ok = has_vertical_clearance(box, container.boxes, container.height)
+            clearance_ok = has_vertical_clearance(box, container, container.height)
             if not clearance_ok or support_ratio < min_support_ratio:
                 box.length, box.width = original_length, original_width
                 continue
@@ -334,25 +312,110 @@ def place_box_hybrid(container: Container, box: Box, optional_check: str = "op2"
             box.length, box.width = box.width, box.length
         box.set_position(x, y, z)
         container.place_box(box)
-        last_success_positions.append((x, y, z, rotation))
-        print(f"[Hybrid ✅] Placed {box.sku} at ({x},{y},{z}) R={rotation}")
+        if TRACE_INFO:
+            trace(f"[Hybrid ✅] Placed {box.sku} at ({x},{y},{z}) R={rotation}")
         return {
             "status": "Confirmed",
             "rotation": 0 if rotation else 1,
             "support": support_ratio,
             "exceeds_end_z": False,
-            "message": f"Placed at Z={z} with support {support_ratio:.2f}"
+            "message": f"Placed at Z={z} with support {support_ratio:.2f}" + (" (deadline reached)" if timed_out else ""),
+            "deadline": timed_out,
         }
 
-    print(f"[Hybrid ❌] No valid position found for {box.sku}")
+    if TRACE_INFO:
+        trace(f"[Hybrid ❌] No valid position found for {box.sku}")
     return {
         "status": "Failed",
         "rotation": -1,
         "support": 0.0,
         "exceeds_end_z": False,
-        "message": "No suitable position found"
+        "message": "Deadline reached" if timed_out else "No suitable position found",
+        "deadline": timed_out,
     }
     
+def _z_block_end(candidates: List[Tuple[int, int, int]], start: int, min_size: int) -> int:
+    """ปลายช่วงของ candidates (เรียง Z แล้ว) เริ่มที่ start ยาวอย่างน้อย min_size โดยไม่ตัดกลางระดับ Z"""
+    end = min(start + min_size, len(candidates))
+    while end < len(candidates) and candidates[end][2] == candidates[end - 1][2]:
+        end += 1
+    return end
+
+def _hybrid2_batch_filter(container: Container, box: Box, candidates: List[Tuple[int, int, int]],
+                          rotation_order: List[bool], chunk_size: int = 256,
+                          escape_rounds: int = 3) -> Dict[Tuple[int, int, int, bool], Tuple[int, int]]:
+    """
+    Batch mode ของ hybrid2: ประเมินผู้สมัครทุกตัว × ทุก rotation พร้อมกันด้วย NumPy
+      • กรอบพื้นที่ → หนีเงาหลังคา (ลง→ขวา→ขึ้น→ซ้าย เหมือน roof_escape_y_first ทีละรอบ)
+      • ณ ตำแหน่งหลังหนี: ชนกล่องอื่น + support area ≥ min_support_ratio
+    ตัดทิ้งเฉพาะตัวที่ scalar path ตัดทิ้งแน่นอน
+    คืน {(cx, cy, cz, rot): (x, y) หลังหนีหลังคา} ของผู้สมัครที่เหลือให้ทำ stability gate + SNAP ต่อ
+    """
+    survivors = {}
+    if not candidates:
+        return survivors
+    placed = container.placed_arrays()
+    bx0, bx1, by0, by1, bz0, bz1 = (placed[:, k] for k in range(6))
+    cand = np.array(candidates, dtype=float)
+    inf = np.inf
+
+    for rot in rotation_order:
+        L, W = (box.width, box.length) if rot else (box.length, box.width)
+        H = box.height
+        for start in range(0, len(cand), chunk_size):
+            cx, cy, cz = cand[start:start + chunk_size].T
+            alive = (
+                (cx >= container.start_x) & (cy >= container.start_y) & (cz >= container.pallet_height) &
+                (cx + L <= container.end_x) & (cy + W <= container.end_y) & (cz + H <= container.end_z)
+            )
+            perf.bounds_pruned += len(alive) - int(np.count_nonzero(alive))
+            x, y = cx.copy(), cy.copy()
+            cz_ = cz[:, None]
+            above = bz0 >= cz_ + H  # (ผู้สมัคร, กล่อง) กล่องที่อยู่สูงกว่าหลังคา
+
+            # ---- หนีเงาหลังคา (ทุกผู้สมัครพร้อมกัน ทีละรอบ) ----
+            clear = np.zeros(len(x), dtype=bool)
+            for _ in range(escape_rounds):
+                x_, y_ = x[:, None], y[:, None]
+                blk = above & (x_ + L > bx0) & (x_ < bx1) & (y_ + W > by0) & (y_ < by1)
+                clear |= alive & ~blk.any(axis=1)
+                pending = alive & ~clear
+                if not pending.any():
+                    break
+                ny = np.maximum(y, np.where(blk, by1, -inf).max(axis=1))               # ลง (Y+)
+                nx = np.maximum(x, np.where(blk, bx1, -inf).max(axis=1))               # ขวา (X+)
+                ny2 = np.minimum(y, np.where(blk, by0 - W, inf).min(axis=1))           # ขึ้น (Y−)
+                nx2 = np.minimum(x, np.where(blk, bx0 - L, inf).min(axis=1))           # ซ้าย (X−)
+                down = pending & (ny != y) & (ny + W <= container.end_y)
+                right = pending & ~down & (nx != x) & (nx + L <= container.end_x)
+                up = pending & ~down & ~right & (ny2 != y) & (ny2 >= container.start_y)
+                left = pending & ~down & ~right & ~up & (nx2 != x) & (nx2 >= container.start_x)
+                y = np.where(down, ny, np.where(up, ny2, y))
+                x = np.where(right, nx, np.where(left, nx2, x))
+                alive &= clear | down | right | up | left  # ขยับไม่ได้ = หนีไม่พ้น
+            alive &= clear  # ครบรอบแล้วยังไม่โล่ง = หนีไม่พ้น (เหมือน scalar)
+            if not alive.any():
+                continue
+
+            # ---- ณ ตำแหน่งหลังหนี: ชน + support area ----
+            x = np.floor(x).astype(float)
+            y = np.floor(y).astype(float)
+            x_, y_ = x[:, None], y[:, None]
+            overlap_xy = (x_ + L > bx0) & (x_ < bx1) & (y_ + W > by0) & (y_ < by1)
+            collides = (overlap_xy & (cz_ < bz1) & (cz_ + H > bz0)).any(axis=1)
+            area_x = np.clip(np.minimum(x_ + L, bx1) - np.maximum(x_, bx0), 0, None)
+            area_y = np.clip(np.minimum(y_ + W, by1) - np.maximum(y_, by0), 0, None)
+            on_level = np.abs(bz1 - cz_) <= 1e-6
+            support = (area_x * area_y * on_level).sum(axis=1) / (L * W)
+            support = support + (cz <= container.pallet_height)  # PALLET รองรับเต็มพื้นที่
+            # เผื่อ 1e-6 ให้ผลรวมแบบ vector ไม่ตัดตัวที่ scalar ยอมรับพอดีเส้น
+            alive &= ~collides & (support + 1e-6 >= min_support_ratio)
+
+            for i in np.flatnonzero(alive):
+                px, py, pz = candidates[start + i]
+                survivors[(px, py, pz, rot)] = (int(x[i]), int(y[i]))
+    return survivors
+
 def place_box_hybrid2(container: Container, box: Box, optional_check: str = "op2"):
     """
     Hybrid2 (Z,Y,X-first + roof-first + support-only stability + iterative SNAP):
@@ -376,31 +439,10 @@ def place_box_hybrid2(container: Container, box: Box, optional_check: str = "op2
 
     def roof_is_clear(x, y, z, bx: Box) -> bool:
         """ต้องโล่ง 100% เหนือกล่อง ณ (x,y,z)"""
-        top = z + bx.height
-        ax0, ax1 = x, x + bx.length
-        ay0, ay1 = y, y + bx.width
-        for ob in container.boxes:
-            if ob.z < top:
-                continue
-            bx0, bx1 = ob.x, ob.x + ob.length
-            by0, by1 = ob.y, ob.y + ob.width
-            if overlap_1d(ax0, ax1, bx0, bx1) and overlap_1d(ay0, ay1, by0, by1):
-                return False
-        return True
+        return container.roof_is_clear(x, y, x + bx.length, y + bx.width, z + bx.height)
 
     def blockers_above_rect(x, y, z, bx: Box):
-        top = z + bx.height
-        ax0, ax1 = x, x + bx.length
-        ay0, ay1 = y, y + bx.width
-        out = []
-        for ob in container.boxes:
-            if ob.z < top:
-                continue
-            bx0, bx1 = ob.x, ob.x + ob.length
-            by0, by1 = ob.y, ob.y + ob.width
-            if overlap_1d(ax0, ax1, bx0, bx1) and overlap_1d(ay0, ay1, by0, by1):
-                out.append(ob)
-        return out
+        return container.boxes_above(x, y, x + bx.length, y + bx.width, z + bx.height)
 
     def roof_escape_y_first(x, y, z, bx: Box, rounds: int = 3):
         """
@@ -457,39 +499,9 @@ def place_box_hybrid2(container: Container, box: Box, optional_check: str = "op2
         return None
 
     # ---------- support / stability ----------
-    def support_contacts(x, y, z, bx: Box):
-        """[(pb, area, cx, cy), ...] top=z; PALLET คิดเป็น parent ได้ด้วย"""
-        contacts = []
-        ax0, ax1 = x, x + bx.length
-        ay0, ay1 = y, y + bx.width
-        for pb in container.boxes:
-            if abs(pb.z + pb.height - z) > 1e-6:
-                continue
-            bx0, bx1 = pb.x, pb.x + pb.length
-            by0, by1 = pb.y, pb.y + pb.width
-            if overlap_1d(ax0, ax1, bx0, bx1) and overlap_1d(ay0, ay1, by0, by1):
-                ox0, ox1 = max(ax0, bx0), min(ax1, bx1)
-                oy0, oy1 = max(ay0, by0), min(ay1, by1)
-                area = max(0, ox1 - ox0) * max(0, oy1 - oy0)
-                if area > 0:
-                    cx = (ox0 + ox1) * 0.5
-                    cy = (oy0 + oy1) * 0.5
-                    contacts.append((pb, area, cx, cy))
-        if z <= container.pallet_height:
-            cx = x + bx.length * 0.5
-            cy = y + bx.width  * 0.5
-            contacts.append(("PALLET", bx.length * bx.width, cx, cy))
-        return contacts
-
     def support_ratio_and_centroid(x, y, z, bx: Box):
-        cons = support_contacts(x, y, z, bx)
-        tot = bx.length * bx.width
-        sup_area = sum(a for _, a, _, _ in cons)
-        if sup_area <= 0 or tot <= 0:
-            return 0.0, (x + bx.length * 0.5, y + bx.width * 0.5), cons
-        cx = sum(a * cx for _, a, cx, _ in cons) / sup_area
-        cy = sum(a * cy for _, a, _, cy in cons) / sup_area
-        return sup_area / tot, (cx, cy), cons
+        """support ratio + centroid รองรับ (PALLET คิดเป็นพ่อได้ด้วย) จาก container.support"""
+        return container.support_ratio_and_centroid(x, y, z, bx.length, bx.width)
 
     def requires_full_support(bx: Box) -> bool:
         slender = bx.height >= max(bx.length, bx.width) * SLENDER_TALL_RATIO
@@ -521,7 +533,7 @@ def place_box_hybrid2(container: Container, box: Box, optional_check: str = "op2
           - Centroid รองรับต้องห่างขอบ footprint (edge margin) พอสมควร
         คืนค่า: ok(bool), stability_score(float), floor(float)
         """
-        sup_ratio, sup_centroid, cons = support_ratio_and_centroid(x, y, z, bx)
+        sup_ratio, sup_centroid = support_ratio_and_centroid(x, y, z, bx)
 
         if requires_full_support(bx):
             if sup_ratio + 1e-9 < 1.0:
@@ -548,32 +560,20 @@ def place_box_hybrid2(container: Container, box: Box, optional_check: str = "op2
     # ---------- SNAP อัดชิด ----------
     def snap_compact_iterative(x, y, z, bx: Box, floor: float, max_iters: int = 8):
         def _support_ok(xx, yy):
-            s, _, _ = support_ratio_and_centroid(xx, yy, z, bx)
+            s, _ = support_ratio_and_centroid(xx, yy, z, bx)
             return s, (s + 1e-9 >= floor and s + 1e-9 >= min_support_ratio)
 
+        # ขอบที่ชนในชั้นเดียวกัน: ใช้ดัชนีขอบเรียงแล้วของ container (ผลเท่ากับไล่ทุกกล่องในชั้น)
         def _snap_up(xx, yy):
-            ax0, ax1 = xx, xx + bx.length
-            y_target = container.start_y
-            for ob in container.boxes:
-                if abs(ob.z + ob.height - z) > 1e-6: continue
-                bx0, bx1 = ob.x, ob.x + ob.length
-                if overlap_1d(ax0, ax1, bx0, bx1):
-                    y_target = max(y_target, ob.y + ob.width)
-            return min(yy, y_target)
+            return min(yy, container.snap_y_target(z, xx, xx + bx.length))
 
         def _snap_left(xx, yy):
-            ay0, ay1 = yy, yy + bx.width
-            x_target = container.start_x
-            for ob in container.boxes:
-                if abs(ob.z + ob.height - z) > 1e-6: continue
-                by0, by1 = ob.y, ob.y + ob.width
-                if overlap_1d(ay0, ay1, by0, by1):
-                    x_target = max(x_target, ob.x + ob.length)
-            return min(xx, x_target)
+            return min(xx, container.snap_x_target(z, yy, yy + bx.width))
 
         def _edge_glide(xx, yy):
             moved_local = True
             while moved_local:
+                perf.snap_iterations += 1
                 moved_local = False
                 yy2 = _snap_up(xx, yy)
                 if yy2 < yy and roof_is_clear(xx, yy2, z, bx) and container.can_place(bx, xx, yy2, z, optional_check)[0]:
@@ -589,6 +589,7 @@ def place_box_hybrid2(container: Container, box: Box, optional_check: str = "op2
         best_sup, _ = _support_ok(bx_, by_)
 
         for _ in range(max_iters):
+            perf.snap_iterations += 1
             moved = False
             y_up = _snap_up(bx_, by_)
             if y_up < by_ and roof_is_clear(bx_, y_up, z, bx) and container.can_place(bx, bx_, y_up, z, optional_check)[0]:
@@ -612,51 +613,53 @@ def place_box_hybrid2(container: Container, box: Box, optional_check: str = "op2
 
     # ---------- main ----------
     tried = set()
-    candidates = list(container.generate_candidate_positions())
-    for b in container.boxes:
-        # ขอบขวา และขอบล่าง ของกล่องที่มีอยู่ เพื่อเกิดคอลัมน์/เติมแถว
-        candidates.append((int(b.x + b.length), int(b.y),           int(b.z)))
-        candidates.append((int(b.x),            int(b.y + b.width),  int(b.z)))
-
-    # ✅ จัดเรียง Z → Y → X (น้อยสุดก่อน)
-    candidates = sorted(set(candidates), key=lambda p: (p[2], p[1], p[0]))
+    # extreme points + ขอบขวา/ขอบล่างของกล่องที่มีอยู่ (เกิดคอลัมน์/เติมแถว)
+    # ✅ container เก็บไว้เรียง Z → Y → X (น้อยสุดก่อน) อยู่แล้ว
+    candidates = container.edge_candidate_positions(include_extreme_points=True)
 
     rotation_order = [True, False] if prefer_rotation_first else [False, True]
     valids = []
-
-    for (cx, cy, cz) in candidates:
-        for rot in rotation_order:
-            key = (cx, cy, cz, rot)
-            if key in tried:
-                continue
-            tried.add(key)
-
-            L0, W0 = box.length, box.width
-            if rot:
-                box.length, box.width = W0, L0
-
+    # batch mode: คัดผู้สมัครที่แพ้แน่นอนออกด้วย NumPy ก่อน เหลือ escape/SNAP ให้ตัวที่รอด
+    # คัดทีละช่วงตามระดับ Z (ไม่ตัดกลางระดับ) → หยุดได้โดยไม่ต้องคัดผู้สมัครชั้นที่สูงกว่า
+    batch = None
+    batch_end = 0
+    batch_time = 0.0
+    best_z = None
+    timed_out = False
+    t0 = time.perf_counter()
+
+    def evaluate(cx, cy, cz, rot, escaped=None):
+        """ผู้สมัคร 1 ตัว (rotation เดียว) ผ่านทุกด่าน → tuple สำหรับเรียงผู้ชนะ, ไม่ผ่าน → None"""
+        L0, W0 = box.length, box.width
+        if rot:
+            box.length, box.width = W0, L0
+        try:
             # กรอบพื้นที่
             if (cx < container.start_x or cy < container.start_y or cz < container.pallet_height or
                 cx + box.length > container.end_x or cy + box.width > container.end_y or
                 cz + box.height > container.end_z):
-                box.length, box.width = L0, W0
-                continue
+                perf.bounds_pruned += 1
+                return None
 
-            # 1) Roof clear ก่อนเสมอ
-            escaped = roof_escape_y_first(cx, cy, cz, box, rounds=3)
+            # 1) Roof clear ก่อนเสมอ (batch หนีเงาหลังคาให้แล้ว)
+            if escaped is None:
+                escaped = roof_escape_y_first(cx, cy, cz, box, rounds=3)
             if not escaped:
-                box.length, box.width = L0, W0
-                continue
+                return None
             x, y = escaped
+            # ตำแหน่งนี้เคยพิสูจน์แล้วว่าชน/นอกกรอบกับกล่องขนาดนี้ → ข้ามได้เลย
+            if container.known_infeasible(box, x, y, cz, optional_check):
+                return None
 
             # 2) Stability gate รอบแรก (support-only; ไม่เช็กจำนวนพ่อรองรับ)
             ok_stab, stab_score, floor = stability_gate(x, y, cz, box)
             if not ok_stab or not container.can_place(box, x, y, cz, optional_check)[0]:
-                box.length, box.width = L0, W0
-                continue
+                return None
 
             # 3) SNAP อัดชิด
+            ts = time.perf_counter()
             snapped = snap_compact_iterative(x, y, cz, box, floor=floor, max_iters=8)
+            perf.add_time("hybrid2.snap", time.perf_counter() - ts)  # รวมอยู่ใน hybrid2.evaluate ด้วย
             if snapped:
                 sx, sy, _ = snapped
             else:
@@ -665,20 +668,68 @@ def place_box_hybrid2(container: Container, box: Box, optional_check: str = "op2
             # 4) Stability gate หลัง SNAP + ตรวจซ้ำ
             ok_stab2, stab_score2, _ = stability_gate(sx, sy, cz, box)
             if not ok_stab2 or not roof_is_clear(sx, sy, cz, box) or not container.can_place(box, sx, sy, cz, optional_check)[0]:
-                box.length, box.width = L0, W0
-                continue
+                return None
 
             rot_sort = 0 if rot else 1
             if prefer_rotation_first:
                 rot_sort = 1 - rot_sort
 
             # ผู้ชนะ: Z, -stability_score, Y, X
-            valids.append((cz, -stab_score2, sy, sx, rot_sort, sx, sy, rot))
+            return cz, -stab_score2, sy, sx, rot_sort, sx, sy, rot
+        finally:
             box.length, box.width = L0, W0
 
+    # warm start: ลองจุดข้างกล่องขนาดเดียวกันที่วางล่าสุดก่อน (container.hints, ระดับ Z เดียวกับกล่องใบนั้น)
+    # ได้ตำแหน่งที่ระดับ Z ต่ำสุดของผู้สมัคร → ใช้ตัวที่ดีที่สุดในกลุ่มนี้เลย ไม่ต้องค้นหาเต็ม; ไม่งั้นค้นหาเต็มตามปกติ
+    if hint_warm_start:
+        th = time.perf_counter()
+        for hx, hy, hz in container.hints.near(box.length, box.width, box.height, HINT_TRIES):
+            for rot in rotation_order:
+                found = evaluate(hx, hy, hz, rot)
+                if found is not None:
+                    valids.append(found)
+        valids.sort()
+        if valids and candidates and valids[0][0] > candidates[0][2]:
+            valids = []  # มีผู้สมัครที่ต่ำกว่ากล่องใบก่อน → ต้องค้นหาเต็ม (ไม่ทิ้งช่องว่างชั้นล่าง)
+        if valids:
+            perf.hint_hits += 1
+            perf.candidates_skipped += len(candidates)
+        perf.add_time("hybrid2.hints", time.perf_counter() - th)  # รวมอยู่ใน hybrid2.evaluate ด้วย
+
+    for idx, (cx, cy, cz) in enumerate(() if valids else candidates):
+        # ผู้ชนะเรียง Z ก่อน และ candidates เรียง Z จากน้อยไปมาก
+        # → เจอตัวที่ผ่านที่ระดับ best_z แล้ว ผู้สมัครที่ Z สูงกว่าแพ้แน่นอน
+        if best_z is not None and cz > best_z:
+            perf.candidates_skipped += len(candidates) - idx
+            break
+        if deadline.expired():
+            timed_out = True  # หมดเวลา → ใช้ตัวที่ดีที่สุดที่เจอแล้ว (ไม่มี = Failed ให้ call_placement ใช้ fallback)
+            break
+        if hybrid2_batch and idx >= batch_end:
+            tb = time.perf_counter()
+            batch_end = _z_block_end(candidates, idx, HYBRID2_BATCH_BLOCK)
+            batch = _hybrid2_batch_filter(container, box, candidates[idx:batch_end], rotation_order)
+            batch_time += time.perf_counter() - tb
+        for rot in rotation_order:
+            key = (cx, cy, cz, rot)
+            if key in tried:
+                continue
+            tried.add(key)
+            if batch is not None:
+                if key not in batch:
+                    continue
+                found = evaluate(cx, cy, cz, rot, batch[key] or False)
+            else:
+                found = evaluate(cx, cy, cz, rot)
+            if found is not None:
+                valids.append(found)
+                best_z = cz
+    perf.add_time("hybrid2.batch_filter", batch_time)
+    perf.add_time("hybrid2.evaluate", time.perf_counter() - t0 - batch_time)
+
     if not valids:
         return {"status": "Failed","rotation": -1,"support": 0.0,"exceeds_end_z": False,
-                "message": ""}
+                "message": "[Hybrid2] Deadline reached" if timed_out else "", "deadline": timed_out}
                 # "message": "[Hybrid2] No suitable position (support-only gate)"}
 
     valids.sort()
@@ -694,15 +745,15 @@ def place_box_hybrid2(container: Container, box: Box, optional_check: str = "op2
         return {"status":"Failed","rotation":-1,"support":0.0,"exceeds_end_z":False,"message":"[Hybrid2] Final collision"}
 
     container.place_box(box)
-    sup_final, _, _ = support_ratio_and_centroid(fx, fy, z, box)
-    last_success_positions.append((fx, fy, z, rot))
+    sup_final = container.support.support_ratio(len(container.boxes) - 1, box.length * box.width)
     return {
         "status":"Confirmed",
         "rotation": 0 if rot else 1,
         "support": sup_final,
         "exceeds_end_z": False,
         # "message": "[Hybrid2] Z,Y,X-first + roof-clear + support-only stability + SNAP"
-        "message": ""
+        "message": "[Hybrid2] Deadline reached: best position found so far" if timed_out else "",
+        "deadline": timed_out,
     }
 
 def place_box_hybrid3(container: Container, box: Box, optional_check: str = "op2"):
@@ -724,63 +775,19 @@ def place_box_hybrid3(container: Container, box: Box, optional_check: str = "op2
 
     def roof_is_clear(x, y, z, bx: Box) -> bool:
         """ด้านบน footprint ของ bx ที่ (x,y,z) ต้องโล่ง 100%"""
-        top = z + bx.height
-        ax0, ax1 = x, x + bx.length
-        ay0, ay1 = y, y + bx.width
-        for ob in container.boxes:
-            if ob.z < top:
-                continue  # ไม่บัง
-            bx0, bx1 = ob.x, ob.x + ob.length
-            by0, by1 = ob.y, ob.y + ob.width
-            if overlap_1d(ax0, ax1, bx0, bx1) and overlap_1d(ay0, ay1, by0, by1):
-                return False
-        return True
+        return container.roof_is_clear(x, y, x + bx.length, y + bx.width, z + bx.height)
 
     def support_ratio_at(x, y, z, bx: Box) -> float:
         """สัดส่วนพื้นที่รองรับของ bx ณ ระดับ z (ต้องอยู่บน top ของกล่องอื่น/พื้นพาเลท)"""
-        if z <= container.pallet_height:
-            return 1.0
-        tot = bx.length * bx.width
-        if tot <= 0: 
-            return 0.0
-        ax0, ax1 = x, x + bx.length
-        ay0, ay1 = y, y + bx.width
-        sup_area = 0
-        for pb in container.boxes:
-            # ใช้เฉพาะผิวบนที่ระดับ z
-            if abs(pb.z + pb.height - z) > 1e-6:
-                continue
-            bx0, bx1 = pb.x, pb.x + pb.length
-            by0, by1 = pb.y, pb.y + pb.width
-            if overlap_1d(ax0, ax1, bx0, bx1) and overlap_1d(ay0, ay1, by0, by1):
-                ox = max(0, min(ax1, bx1) - max(ax0, bx0))
-                oy = max(0, min(ay1, by1) - max(ay0, by0))
-                sup_area += ox * oy
-        return sup_area / tot
+        return container.support_ratio(x, y, z, bx.length, bx.width)
 
     def snap_up(x, y, z, bx: Box) -> int:
         """หาค่า y ชิดขึ้น (Y-) แบบ exact โดยชนขอบล่างของกล่องในชั้นเดียวกันที่ทับช่วง X"""
-        ax0, ax1 = x, x + bx.length
-        y_target = container.start_y
-        for ob in container.boxes:
-            if abs(ob.z + ob.height - z) > 1e-6:
-                continue
-            bx0, bx1 = ob.x, ob.x + ob.length
-            if overlap_1d(ax0, ax1, bx0, bx1):
-                y_target = max(y_target, ob.y + ob.width)
-        return min(y, y_target)
+        return min(y, container.snap_y_target(z, x, x + bx.length))
 
     def snap_left(x, y, z, bx: Box) -> int:
         """หาค่า x ชิดซ้าย (X-) แบบ exact โดยชนขอบขวาของกล่องในชั้นเดียวกันที่ทับช่วง Y"""
-        ay0, ay1 = y, y + bx.width
-        x_target = container.start_x
-        for ob in container.boxes:
-            if abs(ob.z + ob.height - z) > 1e-6:
-                continue
-            by0, by1 = ob.y, ob.y + ob.width
-            if overlap_1d(ay0, ay1, by0, by1):
-                x_target = max(x_target, ob.x + ob.length)
-        return min(x, x_target)
+        return min(x, container.snap_x_target(z, y, y + bx.width))
 
     def snap_compact_exact(x, y, z, bx: Box, floor: float, max_iters: int = 12):
         """
@@ -797,6 +804,8 @@ def place_box_hybrid3(container: Container, box: Box, optional_check: str = "op2
                 return None
             if nx + bx.length > container.end_x or ny + bx.width > container.end_y:
                 return None
+            if container.known_infeasible(bx, nx, ny, z, optional_check):
+                return None
             if not roof_is_clear(nx, ny, z, bx):
                 return None
             ok, _ = container.can_place(bx, nx, ny, z, optional_check)
@@ -808,6 +817,7 @@ def place_box_hybrid3(container: Container, box: Box, optional_check: str = "op2
             return int(nx), int(ny), s
 
         for _ in range(max_iters):
+            perf.snap_iterations += 1
             moved = False
             # 1) ขึ้น (Y-)
             ny = snap_up(best_x, best_y, z, bx)
@@ -825,6 +835,7 @@ def place_box_hybrid3(container: Container, box: Box, optional_check: str = "op2
                     moved = True
             # 3) edge-glide (up → left) จนสุด
             while True:
+                perf.snap_iterations += 1
                 changed = False
                 ny2 = snap_up(best_x, best_y, z, bx)
                 if ny2 < best_y:
@@ -846,20 +857,23 @@ def place_box_hybrid3(container: Container, box: Box, optional_check: str = "op2
         return best_x, best_y, best_sup
 
     # ---------- รวบรวมผู้สมัคร (ขอบคอนเทนเนอร์/ขอบกล่อง) ----------
-    candidates = set()
-    candidates.add((int(container.start_x), int(container.start_y), int(container.pallet_height)))
-    for b in container.boxes:
-        candidates.add((int(b.x + b.length), int(b.y),           int(b.z)))  # ขอบขวา
-        candidates.add((int(b.x),            int(b.y + b.width), int(b.z)))  # ขอบล่าง
-
-    # ✅ เรียงผู้สมัคร Z → Y → X เพื่อเติมชั้นและอัดมุมซ้ายบนก่อน
-    candidates = sorted(candidates, key=lambda p: (p[2], p[1], p[0]))
+    # มุมเริ่มต้น + ขอบขวา/ขอบล่างของกล่อง
+    # ✅ container เก็บไว้เรียง Z → Y → X อยู่แล้ว เพื่อเติมชั้นและอัดมุมซ้ายบนก่อน
+    candidates = container.edge_candidate_positions()
 
     rotation_order = [True, False] if prefer_rotation_first else [False, True]
     valids = []
 
     # ---------- ประเมินผู้สมัคร ----------
-    for (cx, cy, cz) in candidates:
+    best_z = None
+    t0 = time.perf_counter()
+    for idx, (cx, cy, cz) in enumerate(candidates):
+        # ผู้ชนะเรียง Z ก่อน (SNAP ไม่เปลี่ยน Z) และ candidates เรียง Z จากน้อยไปมาก
+        # → เจอตัวที่ผ่านที่ระดับ best_z แล้ว ผู้สมัครที่ Z สูงกว่าแพ้แน่นอน
+        # (ภายในระดับเดียวกันตัดด้วย Y/X ไม่ได้ เพราะ SNAP ขยับ Y/X ลดลงได้)
+        if best_z is not None and cz > best_z:
+            perf.candidates_skipped += len(candidates) - idx
+            break
         for rot in rotation_order:
             L0, W0 = box.length, box.width
             if rot:
@@ -869,6 +883,12 @@ def place_box_hybrid3(container: Container, box: Box, optional_check: str = "op2
             if (cx < container.start_x or cy < container.start_y or cz < container.pallet_height or
                 cx + box.length > container.end_x or cy + box.width > container.end_y or
                 cz + box.height > container.end_z):
+                perf.bounds_pruned += 1
+                box.length, box.width = L0, W0
+                continue
+
+            # เคยพิสูจน์แล้วว่าชน/นอกกรอบกับกล่องขนาดนี้ → ไม่ต้องเช็กหลังคาซ้ำ
+            if container.known_infeasible(box, cx, cy, cz, optional_check):
                 box.length, box.width = L0, W0
                 continue
 
@@ -890,7 +910,9 @@ def place_box_hybrid3(container: Container, box: Box, optional_check: str = "op2
                 continue
 
             # SNAP อัดชิด (ขึ้น→ซ้าย) แบบ exact
+            ts = time.perf_counter()
             sx, sy, sfin = snap_compact_exact(cx, cy, cz, box, floor=sup0, max_iters=12)
+            perf.add_time("hybrid3.snap", time.perf_counter() - ts)  # รวมอยู่ใน hybrid3.evaluate ด้วย
 
             # ตรวจรอบสุดท้าย
             if not roof_is_clear(sx, sy, cz, box):
@@ -910,7 +932,9 @@ def place_box_hybrid3(container: Container, box: Box, optional_check: str = "op2
 
             # เลือกชั้นล่าง → แถวบน → คอลัมน์ซ้าย → (ตาม rotation_pref) → support สูง
             valids.append((cz, sy, sx, rot_sort, -sfin, sx, sy, rot))
+            best_z = cz
             box.length, box.width = L0, W0
+    perf.add_time("hybrid3.evaluate", time.perf_counter() - t0)
 
     if not valids:
         return {
@@ -942,7 +966,6 @@ def place_box_hybrid3(container: Container, box: Box, optional_check: str = "op2
         }
 
     container.place_box(box)
-    last_success_positions.append((int(fx), int(fy), int(z), rot))
 
     return {
         "status": "Confirmed",
@@ -951,3 +974,22 @@ def place_box_hybrid3(container: Container, box: Box, optional_check: str = "op2
         "exceeds_end_z": False,
         "message": "[Hybrid3] Max-tight: Z,Y,X-first + roof-clear + exact SNAP (up→left)"
     }
+
+
+# map ชื่อแบบสั้น และรองรับชื่อเต็มด้วย (ใช้ร่วมกันโดย PackingApp / packingEngine / beamFeature)
+PLACEMENT_FUNCTIONS = {
+    "hybrid2": place_box_hybrid2,
+    "place_box_hybrid2": place_box_hybrid2,
+    "hybrid3": place_box_hybrid3,
+    "place_box_hybrid3": place_box_hybrid3,
+    "hybrid": place_box_hybrid,
+    "place_box_hybrid": place_box_hybrid,
+    "human": place_box_human_like,
+    "place_box_human_like": place_box_human_like,
+    "basic": place_box_in_container,
+    "place_box_in_container": place_box_in_container,
+    "ems": place_box_ems,
+    "place_box_ems": place_box_ems,
+    "heightmap": place_box_heightmap,
+    "place_box_heightmap": place_box_heightmap,
+}
@@ -0,0 +1,162 @@
+import os
+import json
+import hashlib
+import logging
+import configparser
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from Models.Box import Box
+
+# ==============================
+#  Plan cache: order เดิม + config เดิม → แผนเดิม (ไม่ต้องแพ็กใหม่)
+#  - key = sha256 ของ แถวกล่อง (ตามลำดับหลังเรียง priority; ขนาด + priority + wgt) + บรรทัด container + โหมด + อัลกอริทึม
+#          + ทุกค่าใน [Container] [Pallet] [Box] [PlaceMent] [Deadline] และ Version ของโปรแกรม
+#    (อ่านตอน import เหมือนโมดูลวางกล่องอื่น ๆ → ตรงกับค่าที่ใช้วางจริงใน process นี้)
+#  - value = แผนแบบเดียวกับ pack_order: algorithm, order, steps (PlanStep), placed_count, utilization
+#    (+ trucks ถ้าเป็นแผนหลายคันจาก pack_multi)
+#    replay ด้วย apply_step → export ได้ในไม่กี่ ms
+#  - หน่วยความจำ: LRU ไม่เกิน MEMORY_ENTRIES แผน
+#  - ดิสก์: <DIR>/<key>.json รวมกันไม่เกิน DISK_MAX_MB (ลบไฟล์ที่ใช้ล่าสุดนานที่สุดก่อน; hit = แตะ mtime)
+# ==============================
+config = configparser.ConfigParser()
+config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config.ini")
+config.read(config_path, encoding="utf-8")
+
+PLAN_CACHE_ENABLED = config.getboolean("PlanCache", "ENABLED", fallback=True)
+PLAN_CACHE_MEMORY_ENTRIES = config.getint("PlanCache", "MEMORY_ENTRIES", fallback=32)
+PLAN_CACHE_DISK_MAX_MB = config.getfloat("PlanCache", "DISK_MAX_MB", fallback=50.0)
+PLAN_CACHE_DIR = config.get("PlanCache", "DIR", fallback="").strip() or os.path.join(
+    config.get("Paths", "data_path", fallback="Data"), "plan_cache")
+
+PLAN_CACHE_FORMAT = 2  # เปลี่ยนเมื่อรูปแบบ PlanStep / แผนเปลี่ยน → key เดิมใช้ไม่ได้ทั้งหมด
+PLACEMENT_SECTIONS = ("Container", "Pallet", "Box", "PlaceMent", "Deadline")
+
+
+def placement_settings() -> Dict[str, Dict[str, str]]:
+    """ค่าทุกตัวใน config ที่มีผลต่อการวาง (gap, support ratio, BoxMargin, ALGORITHM, PREFER_ROTATION_FIRST, ...)"""
+    settings = {
+        section: {key: value.strip() for key, value in config.items(section)}
+        for section in PLACEMENT_SECTIONS if config.has_section(section)
+    }
+    settings["Version"] = config.get("AppSettings", "Version", fallback="")
+    return settings
+
+
+def plan_key(boxes: List[Box], container_spec: Tuple, algorithm: str, optional_check: str,
+             portfolio: bool) -> str:
+    """
+    key ของแผน: boxes เรียงตามลำดับที่จะวางแล้ว (ขนาดก่อนวาง + priority: beam ใช้ priority เลือกกล่องสลับ
+    + wgt: hybrid2 ให้กล่องหนักต้องรองรับเต็ม) — wgt ต้องผ่าน PackingApp.prepare_box_fields แล้ว
+    container_spec = (container_type, width, length, height) ตามบรรทัดแรกของ forimport.csv
+    """
+    content = {
+        "format": PLAN_CACHE_FORMAT,
+        "boxes": [[box.length, box.width, box.height, box.priority, float(box.wgt)] for box in boxes],
+        "container": [str(container_spec[0])] + [int(v) for v in container_spec[1:]],
+        "algorithm": algorithm,
+        "optional_check": optional_check,
+        "portfolio": bool(portfolio),
+        "config": placement_settings(),
+    }
+    text = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class PlanCache:
+    def __init__(self, directory: str = PLAN_CACHE_DIR, memory_entries: int = PLAN_CACHE_MEMORY_ENTRIES,
+                 disk_max_mb: float = PLAN_CACHE_DISK_MAX_MB, enabled: bool = PLAN_CACHE_ENABLED):
+        self.directory = directory
+        self.memory_entries = memory_entries
+        self.disk_max_bytes = int(disk_max_mb * 1024 * 1024)
+        self.enabled = enabled
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _remember(self, key: str, plan: Dict):
+        self._memory[key] = plan
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """แผนที่เคยเก็บไว้ (หน่วยความจำก่อน แล้วดิสก์) หรือ None"""
+        if not self.enabled:
+            return None
+        plan = self._memory.get(key)
+        if plan is not None:
+            self._memory.move_to_end(key)
+            return plan
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                plan = json.load(f)
+            os.utime(path)  # ใช้ล่าสุด → ถูกลบทีหลัง
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.warning(f"[PlanCache] ⚠️ Ignoring unreadable cache file {path}: {e}")
+            return None
+        plan["steps"] = [tuple(step) for step in plan["steps"]]
+        self._remember(key, plan)
+        return plan
+
+    def put(self, key: str, plan: Dict):
+        """
+        เก็บแผน (เฉพาะส่วนที่ replay ต้องใช้) ลงหน่วยความจำและดิสก์ แล้วตัดดิสก์ให้อยู่ในขนาดที่กำหนด
+        แผนที่ขึ้นกับเวลา (timed_out / portfolio cut_off) ไม่เก็บ: ผลมักแย่กว่าและจะถูก replay ตลอดไป
+        """
+        if not self.enabled or plan.get("timed_out") or plan.get("cut_off"):
+            return
+        trucks = plan.get("trucks")  # แผนหลายคัน (pack_multi): จำนวน step ต่อคัน
+        plan = {
+            "algorithm": plan["algorithm"],
+            "order": list(plan["order"]),
+            "steps": [tuple(step) for step in plan["steps"]],
+            "placed_count": plan["placed_count"],
+            "utilization": plan["utilization"],
+        }
+        if trucks is not None:
+            plan["trucks"] = list(trucks)
+        self._remember(key, plan)
+        if self.disk_max_bytes <= 0:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self._path(key) + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(plan, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self._path(key))
+            self._evict()
+        except OSError as e:
+            logging.warning(f"[PlanCache] ⚠️ Cannot write cache file: {e}")
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        self._memory.clear()
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.directory, name))
+
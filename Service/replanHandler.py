@@ -0,0 +1,69 @@
+import os
+import logging
+import configparser
+from typing import List, Optional, Tuple
+from Models.Box import Box
+
+# ==============================
+#  Prefix reuse: แก้ forimport.csv บางแถวแล้วกด Enter ใหม่ ไม่ต้องวางกล่องต้น order ซ้ำ
+#  - การวางทีละกล่องเป็น deterministic ตามลำดับ priority → กล่องก่อนแถวแรกที่ต่างจากรอบก่อน
+#    ลงตำแหน่งเดิมแน่นอน
+#  - เก็บผลรอบก่อนแบบย่อ: PlanStep ต่อกล่อง (ตำแหน่ง + ขนาดหลังหมุน + result) ไม่เก็บสำเนา Container
+#  - รอบใหม่: replay prefix ที่ตรงกันด้วย apply_step (ลงดัชนีของ Container ตามเดิม ไม่ค้นหาตำแหน่ง)
+#    แล้วค้นหาตำแหน่งจริงตั้งแต่กล่องแรกที่ต่าง
+#  - ใช้เฉพาะอัลกอริทึมทีละกล่อง (layer / beam / portfolio วางแผนทั้ง order → กล่องต้น order ขึ้นกับกล่องท้าย order)
+#  - [PlaceMent] PREFIX_REUSE = False → แพ็กใหม่ทั้ง order ทุกครั้ง
+# ==============================
+config = configparser.ConfigParser()
+config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config.ini")
+config.read(config_path, encoding="utf-8")
+
+PREFIX_REUSE = config.getboolean("PlaceMent", "PREFIX_REUSE", fallback=True)
+
+
+def box_signature(box: Box) -> Tuple[int, int, int, float]:
+    """
+    ค่าของกล่องที่มีผลต่อตำแหน่งที่วาง: ขนาด (อ่านก่อนวาง: การวางหมุน length/width ของ box)
+    + wgt (hybrid2: กล่องหนักต้องรองรับเต็ม) — อ่านหลัง PackingApp.prepare_box_fields
+    """
+    return box.length, box.width, box.height, float(box.wgt)
+
+
+class PrefixCache:
+    """
+    ผลการวางของรอบล่าสุด: run_key (อัลกอริทึม / โหมด / ขนาด container, พาเลท) + signature และ PlanStep ต่อกล่อง
+    signature เก็บเท่าจำนวน step ที่วางเสร็จจริง (รอบที่ถูก ESC กลางทางก็ใช้ต่อได้เท่าที่วางไป)
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.run_key = None
+        self.signatures: List[Tuple[int, int, int, float]] = []
+        self.steps: List[tuple] = []
+
+    def reusable(self, run_key: tuple, signatures: List[Tuple[int, int, int, float]]) -> int:
+        """จำนวนกล่องต้น order ที่ replay จากรอบก่อนได้ (0 = ต้องวางใหม่ทั้งหมด)"""
+        if not PREFIX_REUSE or run_key != self.run_key:
+            return 0
+        n = 0
+        for old, new in zip(self.signatures, signatures):
+            if old != new:
+                break
+            n += 1
+        return n
+
+    def store(self, run_key: tuple, signatures: List[Tuple[int, int, int, float]], steps: List[tuple]):
+        self.run_key = run_key
+        self.signatures = list(signatures[:len(steps)])
+        self.steps = list(steps)
+
+    def step(self, i: int) -> Optional[tuple]:
+        return self.steps[i] if i < len(self.steps) else None
+
+
+def log_reuse(tag: str, reused: int, total: int):
+    if reused:
+        logging.info(f"[{tag}]♻️ Reusing {reused}/{total} boxes from the previous run, "
+                     f"placing from box {reused + 1}")
@@ -1 +0,0 @@
-last_success_positions = []
\ No newline at end of file
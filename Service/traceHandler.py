@@ -0,0 +1,33 @@
+import configparser
+import os
+
+# ==============================
+#  Trace สำหรับ hot loop ของการวางกล่อง (Container / placeFeature)
+#  - LEVEL = off | info | debug   (ค่าเริ่มต้น off)
+#  - SAMPLE_EVERY = N  พิมพ์ทุก ๆ N ครั้งต่อ channel (1 = ทุกครั้ง)
+#  ฝั่งที่เรียกต้องเช็ก TRACE_INFO / TRACE_DEBUG ก่อนสร้างข้อความเสมอ
+#  ตอนปิด trace จึงไม่มีการ format string และไม่มี I/O ใน hot path
+# ==============================
+config = configparser.ConfigParser()
+config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config.ini")
+config.read(config_path, encoding="utf-8")
+
+TRACE_LEVELS = {"off": 0, "info": 1, "debug": 2}
+TRACE_LEVEL = TRACE_LEVELS.get(config.get("Trace", "LEVEL", fallback="off").strip().lower(), 0)
+TRACE_SAMPLE_EVERY = max(1, config.getint("Trace", "SAMPLE_EVERY", fallback=1))
+
+TRACE_INFO = TRACE_LEVEL >= TRACE_LEVELS["info"]
+TRACE_DEBUG = TRACE_LEVEL >= TRACE_LEVELS["debug"]
+
+_sample_counters = {}
+
+
+def sampled(channel: str) -> bool:
+    """นับจำนวนครั้งต่อ channel แล้วคืน True เฉพาะครั้งที่ 1, N+1, 2N+1, ..."""
+    count = _sample_counters.get(channel, 0)
+    _sample_counters[channel] = count + 1
+    return count % TRACE_SAMPLE_EVERY == 0
+
+
+def trace(message: str):
+    print(message)
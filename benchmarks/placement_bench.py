@@ -0,0 +1,218 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import platform
+import subprocess
+import configparser
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Models.Box import Box
+from Models.Container import Container
+from Models.Pallet import Pallet
+from Service.packingEngine import ORDER_PLANNERS, PLACEMENT_FUNCTIONS, box_utilization, pallet_dims_for
+from Service.heightmapFeature import discretization_note
+from Service.beamFeature import BEAM_TIME_BUDGET
+from Service.perfHandler import perf
+
+# ==============================
+#  Benchmark อัลกอริทึมวางกล่อง (ไม่มี UI)
+#  python -m benchmarks.placement_bench --sizes 10 100 1000 --out bench.json
+#  - order สังเคราะห์จาก SKU ใน [BoxColors] (ขนาดจริงจาก Data/forimport.csv ถ้ามี)
+#  - ต่อ run: wall time, จำนวนครั้ง can_place, จำนวน candidate ที่ประเมิน (จากตัวนับ perf), วางได้, utilization
+#  - container ขยายตามจำนวนกล่อง (หน้าตัด SCALED_WIDTH × SCALED_HEIGHT, ยาวพอให้กล่องทั้ง order กิน ~TARGET_FILL)
+#    → วัดความเร็วการวางจริง ไม่ใช่ความเร็วการปฏิเสธกล่องที่ไม่มีที่ (--container = ขนาดคงที่ทุก size)
+#  - ผลเป็น JSON เพื่อเทียบข้าม commit (scaling = exponent ของเวลาเทียบจำนวนกล่องต่อ engine)
+# ==============================
+config = configparser.ConfigParser()
+config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "config.ini")
+config.read(config_path, encoding="utf-8")
+
+ENGINES = ["basic", "human", "hybrid", "hybrid2", "hybrid3", "layer", "ems", "heightmap"]
+# beam ไม่อยู่ในชุด default: เวลาถูกจำกัดด้วย BEAM_TIME_BUDGET (วัดงบเวลา ไม่ใช่ความเร็ว) และขยาย beam ใน
+# process ลูก (BEAM_WORKERS) → ตัวนับ perf เห็นเฉพาะส่วนที่รันใน process นี้ — เลือกเองได้ด้วย --engines beam
+OPT_IN_ENGINES = ["beam"]
+DEFAULT_SIZES = [10, 50, 100, 500, 1000, 5000]
+SCALED_TYPE, SCALED_WIDTH, SCALED_HEIGHT = "1", 2400, 2400
+MIN_SCALED_LENGTH = 1100
+TARGET_FILL = 0.5  # ปริมาตรกล่องทั้ง order / ปริมาตร container ที่ขยายแล้ว
+
+# ขนาดจริง (width, length, height) จาก Data/forimport.csv
+KNOWN_SKU_DIMS = {
+    "C1": (210, 300, 150),
+    "C4": (355, 590, 110),
+    "C5": (295, 380, 275),
+    "C11": (200, 300, 85),
+    "C13": (290, 640, 315),
+    "C19": (310, 370, 150),
+    "C22": (260, 630, 290),
+}
+
+
+def sku_catalog() -> Dict[str, Tuple[int, int, int]]:
+    """SKU ทั้งหมดใน [BoxColors] → (width, length, height); SKU ที่ไม่รู้ขนาดสุ่มแบบคงที่ตามชื่อ"""
+    skus = [k.upper() for k in config["BoxColors"]] if config.has_section("BoxColors") else list(KNOWN_SKU_DIMS)
+    catalog = {}
+    for sku in skus:
+        if sku in KNOWN_SKU_DIMS:
+            catalog[sku] = KNOWN_SKU_DIMS[sku]
+        else:
+            rnd = random.Random(sku)
+            catalog[sku] = (rnd.randrange(180, 400, 5), rnd.randrange(200, 650, 5), rnd.randrange(80, 320, 5))
+    return catalog
+
+
+def synthetic_order(size: int, seed: int = 0) -> List[Box]:
+    """order สุ่มแบบ deterministic ขนาด size กล่อง (priority 1..size, CV 1-3)"""
+    rnd = random.Random(seed)
+    catalog = sku_catalog()
+    skus = sorted(catalog)
+    boxes = []
+    for priority in range(1, size + 1):
+        sku = rnd.choice(skus)
+        width, length, height = catalog[sku]
+        boxes.append(Box(length=length, width=width, height=height, sku=sku, priority=priority,
+                         cv=str(rnd.randint(1, 3)), wgt=float(rnd.randint(1, 20))))
+    return boxes
+
+
+def scaled_container(boxes: List[Box]) -> Tuple[str, int, int, int]:
+    """container ที่ยาวพอให้ปริมาตรกล่องทั้ง order เป็น TARGET_FILL (ปัดขึ้นทีละ 100 มม.)"""
+    volume = sum(box.length * box.width * box.height for box in boxes)
+    length = math.ceil(volume / (SCALED_WIDTH * SCALED_HEIGHT * TARGET_FILL) / 100) * 100
+    return SCALED_TYPE, SCALED_WIDTH, max(MIN_SCALED_LENGTH, length), SCALED_HEIGHT
+
+
+def run_once(engine: str, boxes: List[Box], container_spec: Tuple[str, int, int, int],
+             time_limit: Optional[float] = None) -> Dict:
+    container_type, container_width, container_length, container_height = container_spec
+    p_width, p_length, p_height = pallet_dims_for(container_type)
+    pallet = Pallet(width=p_width, length=p_length, height=p_height)
+    container = Container(container_length, container_width, container_height, "blue", pallet,
+                          ContainerType=container_type)
+    perf.reset()
+    placed = 0
+    utilization = 0.0
+    processed = 0
+    truncated = False
+    start = time.perf_counter()
+    size = len(boxes)
+    if engine in ORDER_PLANNERS:
+        # วางแผนทั้ง order ในครั้งเดียว (time_limit ใช้ไม่ได้)
+        order, steps = ORDER_PLANNERS[engine](container, boxes, "op2")
+        processed = len(boxes)
+        for i, step in zip(order, steps):
+            if step[0] == "Confirmed":
+                placed += 1
+                utilization += box_utilization(boxes[i], container)
+        boxes = []
+    place = PLACEMENT_FUNCTIONS.get(engine)
+    for box in boxes:
+        result = place(container, box, optional_check="op2")
+        processed += 1
+        if result["status"] == "Confirmed":
+            placed += 1
+            utilization += box_utilization(box, container)
+        if time_limit is not None and time.perf_counter() - start > time_limit:
+            truncated = processed < len(boxes)
+            break
+    wall = time.perf_counter() - start
+
+    run = {
+        "engine": engine,
+        "size": size,
+        "processed": processed,
+        "truncated": truncated,
+        "wall_time_s": round(wall, 6),
+        "per_box_ms": round(wall * 1000 / max(1, processed), 4),
+        "container": list(container_spec),
+        "can_place_calls": perf.can_place_calls,
+        "candidates": perf.candidates_generated,
+        "counters": perf.totals(),
+        "placed": placed,
+        "utilization": round(utilization, 2),
+    }
+    if engine == "heightmap":
+        run["discretization"] = discretization_note()  # ผลของ heightmap เสียช่องว่างจาก grid ได้ ระบุไว้ในรายงาน
+    if engine == "beam":
+        run["time_budget_s"] = BEAM_TIME_BUDGET  # ตัวนับไม่รวม process ลูกของ beam
+    return run
+
+
+def scaling_curves(runs: List[Dict]) -> Dict[str, Dict]:
+    """ต่อ engine: ขนาด/เวลา และ exponent k ของ wall_time ≈ c·n^k (least squares บน log-log)"""
+    curves = {}
+    for engine in dict.fromkeys(run["engine"] for run in runs):
+        points = sorted((run["size"], run["wall_time_s"]) for run in runs
+                        if run["engine"] == engine and not run["truncated"])
+        curve = {"sizes": [n for n, _ in points], "wall_time_s": [t for _, t in points], "exponent": None}
+        logs = [(math.log(n), math.log(t)) for n, t in points if n > 0 and t > 0]
+        if len(logs) >= 2:
+            mean_x = sum(x for x, _ in logs) / len(logs)
+            mean_y = sum(y for _, y in logs) / len(logs)
+            var_x = sum((x - mean_x) ** 2 for x, _ in logs)
+            if var_x > 0:
+                curve["exponent"] = round(sum((x - mean_x) * (y - mean_y) for x, y in logs) / var_x, 3)
+        curves[engine] = curve
+    return curves
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(config_path),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.placement_bench",
+                                     description="Time the placement algorithms on synthetic orders")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--engines", nargs="+", default=ENGINES, choices=ENGINES + OPT_IN_ENGINES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--container", type=int, nargs=4, metavar=("TYPE", "WIDTH", "LENGTH", "HEIGHT"),
+                        default=None, help="fixed container spec as in forimport.csv "
+                                           "(default: scale the container length with the order size)")
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="stop a run after this many seconds (run is marked truncated)")
+    parser.add_argument("--out", default=None, help="JSON output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    fixed_spec = (str(args.container[0]), *args.container[1:]) if args.container else None
+    runs = []
+    for size in args.sizes:
+        for engine in args.engines:
+            boxes = synthetic_order(size, seed=args.seed)
+            container_spec = fixed_spec or scaled_container(boxes)
+            run = run_once(engine, boxes, container_spec, time_limit=args.time_limit)
+            runs.append(run)
+            print(f"{engine:>8} n={size:<5} {run['wall_time_s']:>9.3f}s placed={run['placed']:<4} "
+                  f"can_place={run['can_place_calls']:<8} candidates={run['candidates']}"
+                  f"{' (truncated)' if run['truncated'] else ''}", file=sys.stderr)
+
+    report = {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "container": list(fixed_spec) if fixed_spec else "scaled",
+        "runs": runs,
+        "scaling": scaling_curves(runs),
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Models.Box import Box
+
+# ==============================
+#  ข้อมูลร่วมของ test: พาเลท F15 (container type 1 ตาม forimport.csv) + order 16 กล่องคงที่
+# ==============================
+CONTAINER_DIMS = (1100, 1100, 940)
+PALLET_DIMS = (1100, 1100, 140)
+# (width, length, height) จาก forimport.csv × 2 → 16 กล่อง, priority ละ 4 กล่อง
+SKU_DIMS = [(355, 590, 110), (295, 380, 275), (290, 640, 315), (260, 630, 290),
+            (310, 370, 150), (210, 300, 150), (200, 300, 85), (195, 220, 155)]
+
+
+@pytest.fixture
+def container_dims():
+    return CONTAINER_DIMS
+
+
+@pytest.fixture
+def pallet_dims():
+    return PALLET_DIMS
+
+
+@pytest.fixture
+def fixed_order():
+    """สร้าง order คงที่ชุดใหม่ทุกครั้งที่เรียก (engine แก้ตำแหน่ง / การหมุนของ Box ที่ส่งเข้าไป)"""
+    def make():
+        return [Box(length=l, width=w, height=h, sku=f"C{i}", priority=i // 4, cv=1, wgt=1)
+                for i, (w, l, h) in enumerate(SKU_DIMS * 2)]
+    return make
@@ -0,0 +1,76 @@
+import io
+import contextlib
+
+import pytest
+
+from Models.Box import REQUIRED_SUPPORT_RATIO
+from Service.packingEngine import pack_order, _new_container
+
+# ==============================
+#  engine ที่วางกล่องเอง (ไม่ใช่ hybrid เดิม): ตรวจผลจากเรขาคณิตของแผนตรง ๆ
+#  - อยู่ในกรอบ container, ไม่ทับกัน, วางบนพาเลทหรือมีผิวรองรับ >= required_support_ratio
+#  - ลำดับโหลด (plan["order"]): กล่องที่โหลดทีหลังต้องไม่อยู่ใต้กล่องที่โหลดก่อน
+# ==============================
+ENGINES = ["ems", "heightmap", "layer"]
+
+
+@pytest.fixture
+def container(container_dims, pallet_dims):
+    return _new_container(container_dims, pallet_dims, "1")
+
+
+@pytest.fixture
+def placed_cuboids(fixed_order, container_dims, pallet_dims):
+    """แพ็ก order คงที่ด้วย algorithm → [(x, y, z, length, width, height)] ตามลำดับโหลด"""
+    def pack(algorithm):
+        boxes = fixed_order()
+        with contextlib.redirect_stdout(io.StringIO()):
+            plan = pack_order(algorithm, boxes, container_dims, pallet_dims, "1")
+        return [(s[6], s[7], s[8], s[9], s[10], boxes[i].height)
+                for i, s in zip(plan["order"], plan["steps"]) if s[5]]
+    return pack
+
+
+def overlap(a0, a1, b0, b1):
+    return max(0.0, min(a1, b1) - max(a0, b0))
+
+
+@pytest.mark.parametrize("algorithm", ENGINES)
+def test_placements_inside_container(algorithm, container, placed_cuboids):
+    cuboids = placed_cuboids(algorithm)
+    assert cuboids
+    for x, y, z, l, w, h in cuboids:
+        assert container.start_x <= x and x + l <= container.end_x
+        assert container.start_y <= y and y + w <= container.end_y
+        assert container.pallet_height <= z and z + h <= container.end_z
+
+
+@pytest.mark.parametrize("algorithm", ENGINES)
+def test_placements_do_not_overlap(algorithm, placed_cuboids):
+    cuboids = placed_cuboids(algorithm)
+    for k, (x, y, z, l, w, h) in enumerate(cuboids):
+        for bx, by, bz, bl, bw, bh in cuboids[k + 1:]:
+            volume = overlap(x, x + l, bx, bx + bl) * overlap(y, y + w, by, by + bw) * overlap(z, z + h, bz, bz + bh)
+            assert volume == 0, f"box at {(x, y, z)} overlaps box at {(bx, by, bz)}"
+
+
+@pytest.mark.parametrize("algorithm", ENGINES)
+def test_placements_are_supported(algorithm, container, placed_cuboids):
+    cuboids = placed_cuboids(algorithm)
+    for x, y, z, l, w, h in cuboids:
+        if abs(z - container.pallet_height) < 1e-6:
+            continue  # วางบนพาเลท
+        supported = sum(
+            overlap(x, x + l, bx, bx + bl) * overlap(y, y + w, by, by + bw)
+            for bx, by, bz, bl, bw, bh in cuboids if abs(bz + bh - z) < 1e-6
+        )
+        assert supported >= REQUIRED_SUPPORT_RATIO * l * w - 1e-6, f"box at {(x, y, z)} is not supported"
+
+
+@pytest.mark.parametrize("algorithm", ENGINES)
+def test_loading_sequence_builds_bottom_up(algorithm, placed_cuboids):
+    cuboids = placed_cuboids(algorithm)
+    for k, (x, y, z, l, w, h) in enumerate(cuboids):
+        for bx, by, bz, bl, bw, bh in cuboids[k + 1:]:
+            below = bz + bh <= z + 1e-6 and overlap(x, x + l, bx, bx + bl) * overlap(y, y + w, by, by + bw) > 0
+            assert not below, f"box loaded at {(bx, by, bz)} goes under earlier box at {(x, y, z)}"
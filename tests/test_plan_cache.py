@@ -0,0 +1,63 @@
+import io
+import copy
+import contextlib
+
+import pytest
+
+from Service.deadlineHandler import deadline
+from Service.packingEngine import apply_step, pack_order, _new_container
+from Service.planCacheHandler import PlanCache, plan_key
+
+# ==============================
+#  Plan cache: key ตาม order + config, hit แล้ว replay ได้ตำแหน่งเดียวกับการแพ็กใหม่
+#  แผนที่ชน deadline ถูกติด timed_out (UI ไม่เก็บลง cache)
+# ==============================
+@pytest.fixture
+def container_spec(container_dims):
+    return ("1", *container_dims)
+
+
+@pytest.fixture
+def pack(container_dims, pallet_dims):
+    def run(algorithm, boxes):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return pack_order(algorithm, boxes, container_dims, pallet_dims, "1")
+    return run
+
+
+def test_plan_key_is_stable_for_same_order(fixed_order, container_spec):
+    assert plan_key(fixed_order(), container_spec, "hybrid2", "op2", False) == \
+        plan_key(fixed_order(), container_spec, "hybrid2", "op2", False)
+
+
+def test_plan_key_changes_with_box_weight(fixed_order, container_spec):
+    boxes = fixed_order()
+    key = plan_key(boxes, container_spec, "hybrid2", "op2", False)
+    boxes[3].wgt = 40
+    assert plan_key(boxes, container_spec, "hybrid2", "op2", False) != key
+
+
+def test_cache_hit_replays_fresh_plan(tmp_path, fixed_order, container_spec, container_dims, pallet_dims, pack):
+    boxes = fixed_order()
+    key = plan_key(boxes, container_spec, "hybrid2", "op2", False)
+    PlanCache(directory=str(tmp_path), enabled=True).put(key, pack("hybrid2", boxes))
+
+    # cache ใหม่ → อ่านจากดิสก์ (ผ่าน JSON) แล้ว replay ลง container ใหม่
+    cached = PlanCache(directory=str(tmp_path), enabled=True).get(key)
+    fresh = pack("hybrid2", fixed_order())
+    assert cached is not None
+    assert cached["order"] == fresh["order"]
+    assert cached["steps"] == fresh["steps"]
+
+    container = _new_container(container_dims, pallet_dims, "1")
+    replayed = [copy.copy(boxes[i]) for i in cached["order"]]
+    for box, step in zip(replayed, cached["steps"]):
+        apply_step(container, box, step)
+    expected = [(s[6], s[7], s[8], s[9], s[10]) for s in fresh["steps"] if s[5]]
+    assert [(b.x, b.y, b.z, b.length, b.width) for b in container.boxes] == expected
+
+
+def test_plan_hitting_deadline_is_marked_timed_out(monkeypatch, fixed_order, pack):
+    assert not pack("hybrid2", fixed_order())["timed_out"]
+    monkeypatch.setattr(deadline, "box_budget", 1e-9)
+    assert pack("hybrid2", fixed_order())["timed_out"]